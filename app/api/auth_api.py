@@ -6,18 +6,19 @@ from app.models import User, Project
 from app.schemas import auth_schema as auth_schema
 from app.db.database import get_db
 from app.services import auth_service as auth_service
+from app.core.principal_cache import principal_cache
 
 router = APIRouter()
 
 @router.post("/register")
 # Endpoint for new user registration
-def register(user: auth_schema.UserCreate, db: Session = Depends(get_db)):
-    return auth_service.register_user(user, db)
+async def register(user: auth_schema.UserCreate, db: Session = Depends(get_db)):
+    return await auth_service.register_user(user, db)
 
 @router.post("/token")
 # Endpoint to login and receive JWT access token
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    return auth_service.login_user(form_data, db)
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+    return await auth_service.login_user(form_data, db)
 
 @router.get("/users/me", response_model=auth_schema.UserMe)
 # Returns current user info based on the access token
@@ -34,5 +35,6 @@ def delete_current_user(user=Depends(auth_service.get_current_user), db: Session
             raise HTTPException(status_code=400, detail="User is owner of one or more projects and cannot be deleted.")
         db.delete(db_user)
         db.commit()
+        principal_cache.invalidate_user(user.id)
         return {"message": "User deleted"}
     raise HTTPException(status_code=404, detail="User not found")
\ No newline at end of file
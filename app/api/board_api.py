@@ -1,38 +1,62 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import insert, literal, select, update
 from sqlalchemy.orm import Session
 from app.db.database import get_db
-from app.models import Project
 from app.schemas import board_schema as board_schema
 from app.models.board_model import Board
+from app.models.project_model import Project
 from app.services.auth_service import get_current_user
+from app.services import permission_service, project_copy_service
+from app.services.task_service import commit_detached
+from app.core import http_cache
+from app.models.enums_model import ProjectRole
 
 router = APIRouter()
 
 @router.post("/", response_model=board_schema.BoardOut)
-def create(board: board_schema.BoardCreate, db: Session = Depends(get_db)):
-    obj = Board(**board.model_dump())
-    db.add(obj)
-    db.commit()
-    db.refresh(obj)
+# Creates a board; the INSERT ... SELECT checks the editor role itself (see the mutation section of task_service)
+def create(board: board_schema.BoardCreate, db: Session = Depends(get_db), user=Depends(get_current_user)):
+    values = board.model_dump()
+    source = select(*(literal(value, Board.__table__.c[name].type) for name, value in values.items())).where(
+        permission_service.project_access_clause(user.id, board.project_id, ProjectRole.editor)
+    )
+    obj = db.scalar(insert(Board).from_select(list(values), source).returning(Board))
+    if obj is None:
+        if db.scalar(select(Project.id).where(Project.id == board.project_id)) is None:
+            raise HTTPException(status_code=404, detail="Project not found")
+        raise HTTPException(status_code=403, detail="Access denied")
+    commit_detached(db, obj)
+    http_cache.bump_project_versions([obj.project_id])
     return obj
 
 @router.get("/", response_model=list[board_schema.BoardOut])
 def get_all(db: Session = Depends(get_db)):
     return db.query(Board).all()
 
+@router.post("/{board_id}/duplicate", response_model=board_schema.BoardDuplicateResult)
+# Copies the board with its tasks (and their comments if requested) within its project,
+# set-based in the database (see app/services/project_copy_service.py)
+def duplicate_board(board_id: int, name: str | None = None, include_comments: bool = False,
+                    db: Session = Depends(get_db), user=Depends(get_current_user)):
+    return project_copy_service.duplicate_board(board_id, db, user, name, include_comments)
+
 @router.put("/{board_id}", response_model=board_schema.BoardOut)
-# Rename a board
+# Rename a board; the UPDATE checks the editor role itself (see the mutation section of task_service)
 def rename_board(board_id: int, board: board_schema.BoardCreate, db: Session = Depends(get_db), user=Depends(get_current_user)):
-    board_obj = db.query(Board).filter(Board.id == board_id).first()
-    if not board_obj:
-        raise HTTPException(status_code=404, detail="Board not found")
-
-    # Zugriff prüfen
-    project = db.query(Project).filter(Project.id == board_obj.project_id).first()
-    if user not in project.members:
+    board_obj = db.scalar(
+        update(Board)
+        .where(Board.id == board_id,
+               permission_service.project_access_clause(user.id, Board.project_id, ProjectRole.editor))
+        .values(name=board.name)
+        .returning(Board)
+        .execution_options(synchronize_session=False)
+    )
+    if board_obj is None:
+        if db.scalar(select(Board.id).where(Board.id == board_id)) is None:
+            raise HTTPException(status_code=404, detail="Board not found")
+        # Zugriff prüfen
         raise HTTPException(status_code=403, detail="Access denied")
 
-    board_obj.name = board.name
-    db.commit()
-    db.refresh(board_obj)
+    commit_detached(db, board_obj)
+    http_cache.bump_project_versions([board_obj.project_id])
     return board_obj
\ No newline at end of file
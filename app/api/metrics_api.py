@@ -0,0 +1,31 @@
+# Prometheus scrape endpoint: per-route request metrics (app/core/request_metrics.py) plus
+# the stats of the connection pools, caches, WebSocket manager and event publisher.
+# Not authenticated like the API routes, restrict access to it at the proxy.
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core import http_cache, request_metrics
+from app.core.events import event_publisher
+from app.core.metrics import render_histogram, render_stats, render_value
+from app.core.principal_cache import principal_cache
+from app.core.websocket import manager
+from app.db.database import pool_stats, pool_wait
+
+router = APIRouter()
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics():
+    lines = request_metrics.render()
+    lines.append("# TYPE db_pool_wait_seconds histogram")
+    for pool, histogram in pool_wait.items():
+        lines.extend(render_histogram("db_pool_wait_seconds", histogram, {"pool": pool}))
+    lines.append("# TYPE task_events_published_total counter")
+    lines.append(render_value("task_events_published_total", event_publisher.events_published))
+    lines.append("# TYPE task_event_batches_published_total counter")
+    lines.append(render_value("task_event_batches_published_total", event_publisher.batches_published))
+    lines.extend(render_stats("db_pool", {key: value for key, value in pool_stats().items() if key != "checkout_wait"}))
+    lines.extend(render_stats("principal_cache", principal_cache.stats()))
+    lines.extend(render_stats("http_response_cache", http_cache.stats()))
+    lines.extend(render_stats("websocket", manager.stats()))
+    return "\n".join(lines) + "\n"
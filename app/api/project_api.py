@@ -1,29 +1,59 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+from sqlalchemy import delete, select
 from sqlalchemy.orm import Session
 
 from app.models import Project, ProjectRole, project_members, User
+from app.models.task_model import TaskTombstone
 from app.schemas import project_schema as project_schema, ProjectOut, ProjectCreate
-from app.db.database import get_db
+from app.schemas import transfer_schema as transfer_schema
+from app.schemas import sync_schema as sync_schema
+from app.db.database import get_db, get_read_db
 from app.services.auth_service import get_current_user
 from app.services.project_service import create_project, get_all_projects, add_member
+from app.core.principal_cache import Principal, principal_cache
+from app.services import permission_service, project_copy_service, project_transfer_service, stats_service, sync_service
+from app.core import http_cache
 
 router = APIRouter()
 
+# Serializers for the ETag endpoints, which return ready-made responses
+PROJECT = TypeAdapter(project_schema.ProjectOut)
+PROJECT_LIST = TypeAdapter(list[project_schema.ProjectOut])
+
 @router.post("/", response_model=ProjectOut)
-def create(project: ProjectCreate, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+def create(project: ProjectCreate, db: Session = Depends(get_db), user: Principal = Depends(get_current_user)):
     return create_project(project, db, user)
 
 @router.get("/", response_model=list[project_schema.ProjectOut])
-def list_all(db: Session = Depends(get_db)):
+def list_all(db: Session = Depends(get_read_db)):
     return get_all_projects(db)
 
 @router.get("/me", response_model=list[project_schema.ProjectOut])
 # Returns all projects where the user is owner or member
-def get_my_projects(db: Session = Depends(get_db), user=Depends(get_current_user)):
-    owned = db.query(Project).filter(Project.owner_id == user.id)
-    member_of = db.query(Project).join(Project.members).filter(User.id == user.id)
-    all_projects = owned.union(member_of)
-    return all_projects.all()
+def get_my_projects(request: Request, db: Session = Depends(get_db), user=Depends(get_current_user)):
+    def load(headers: dict):
+        owned = db.query(Project).filter(Project.owner_id == user.id)
+        member_of = db.query(Project).join(Project.members).filter(User.id == user.id)
+        all_projects = owned.union(member_of)
+        return all_projects.all()
+
+    etag = http_cache.make_etag(user.project_ids, "projects_me", user.id)
+    return http_cache.respond(request, etag, load, PROJECT_LIST)
+
+@router.post("/import", response_model=transfer_schema.ProjectImportResult)
+# Creates a new project owned by the caller from an NDJSON export (see GET /{project_id}/export).
+# The body is parsed as it arrives and written in batches, so its size is not limited by memory.
+async def import_project(request: Request, name: str | None = None, user: Principal = Depends(get_current_user)):
+    return await project_transfer_service.import_project(request.stream(), user, name)
+
+@router.post("/{project_id}/duplicate", response_model=project_schema.ProjectDuplicateResult)
+# Copies the project with its members, boards and tasks (and their comments if requested) into a
+# new project owned by the caller, set-based in the database (see app/services/project_copy_service.py)
+def duplicate_project(project_id: int, name: str | None = None, include_comments: bool = False,
+                      db: Session = Depends(get_db), user: Principal = Depends(get_current_user)):
+    return project_copy_service.duplicate_project(project_id, db, user, name, include_comments)
 
 @router.post("/{project_id}/members")
 def add_project_member(
@@ -41,12 +71,19 @@ def change_role(project_id: int, user_id: int, role: ProjectRole, db: Session =
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
+    permission_service.require_role(db, user, project_id, ProjectRole.owner, "Only the owner can change roles")
+    if user_id == project.owner_id:
+        raise HTTPException(status_code=400, detail="The owner's role cannot be changed")
+
     stmt = project_members.update().where(
         (project_members.c.user_id == user_id) &
         (project_members.c.project_id == project_id)
     ).values(role=role)
     db.execute(stmt)
     db.commit()
+    permission_service.forget(db)
+    http_cache.bump_project_versions([project_id])
+    principal_cache.invalidate_user(user_id)
     return {"message": f"User role updated to {role.value}"}
 
 @router.get("/{project_id}/members", response_model=list[str])
@@ -56,10 +93,13 @@ def list_project_members(project_id: int, db: Session = Depends(get_db), user=De
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
-    if user not in project.members:
-        raise HTTPException(status_code=403, detail="No access to this project")
+    permission_service.require_role(db, user, project.id, ProjectRole.viewer)
 
-    return [member.username for member in project.members]
+    return list(db.scalars(
+        select(User.username)
+        .join(project_members, project_members.c.user_id == User.id)
+        .where(project_members.c.project_id == project_id)
+    ))
 
 @router.post("/{project_id}/leave")
 # Allows a user to leave a project (unless they are the owner)
@@ -71,24 +111,65 @@ def leave_project(project_id: int, db: Session = Depends(get_db), user=Depends(g
     if project.owner_id == user.id:
         raise HTTPException(status_code=400, detail="Owner cannot leave the project")
 
-    if user not in project.members:
+    if project.id not in user.project_ids:
         raise HTTPException(status_code=400, detail="You are not a member of this project")
 
-    project.members.remove(user)
+    db.execute(project_members.delete().where(
+        (project_members.c.user_id == user.id) &
+        (project_members.c.project_id == project_id)
+    ))
     db.commit()
+    http_cache.bump_project_versions([project_id])
+    principal_cache.invalidate_user(user.id)
     return {"detail": "You have left the project"}
 
 @router.get("/{project_id}", response_model=project_schema.ProjectOut)
 # Get details of a specific project
-def get_project(project_id: int, db: Session = Depends(get_db), user=Depends(get_current_user)):
+def get_project(project_id: int, request: Request, db: Session = Depends(get_db), user=Depends(get_current_user)):
     project = db.query(Project).filter(Project.id == project_id).first()
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
-    if user not in project.members:
-        raise HTTPException(status_code=403, detail="Access denied")
+    permission_service.require_role(db, user, project.id, ProjectRole.viewer, "Access denied")
+
+    etag = http_cache.make_etag([project_id], "project", project_id)
+    return http_cache.respond(request, etag, lambda headers: project, PROJECT)
+
+@router.get("/{project_id}/export")
+# Streams the project with its members, boards, tasks and comments as NDJSON
+def export_project(project_id: int, db: Session = Depends(get_db), user=Depends(get_current_user)):
+    project = db.get(Project, project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    permission_service.require_role(db, user, project_id, ProjectRole.viewer, "Access denied")
+
+    return StreamingResponse(
+        project_transfer_service.export_project(project_id), media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="project-{project_id}.ndjson"'}
+    )
+
+@router.get("/{project_id}/stats", response_model=project_schema.ProjectStats)
+# Task counts per status, board, priority and assignee plus overdue tasks, from
+# incrementally maintained counters (see app/services/stats_service.py)
+def get_project_stats(project_id: int, db: Session = Depends(get_db), user=Depends(get_current_user)):
+    project = db.get(Project, project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    permission_service.require_role(db, user, project_id, ProjectRole.viewer, "Access denied")
+    return stats_service.project_stats(db, project_id)
+
+@router.get("/{project_id}/changes", response_model=sync_schema.ProjectChanges)
+# Tasks and comments changed and tasks removed since a version, for offline and mobile
+# clients (see app/schemas/sync_schema.py). since=0 returns the whole project.
+def get_project_changes(project_id: int, since: int = 0, db: Session = Depends(get_db), user=Depends(get_current_user)):
+    project = db.get(Project, project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
 
-    return project
+    permission_service.require_role(db, user, project_id, ProjectRole.viewer, "Access denied")
+    return sync_service.project_changes(db, project_id, since)
 
 @router.delete("/{project_id}")
 # Only owner can delete a project
@@ -97,10 +178,14 @@ def delete_project(project_id: int, db: Session = Depends(get_db), user=Depends(
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
-    if project.owner_id != user.id:
-        raise HTTPException(status_code=403, detail="Only the owner can delete this project")
+    permission_service.require_role(db, user, project.id, ProjectRole.owner, "Only the owner can delete this project")
 
+    member_ids = list(db.scalars(select(project_members.c.user_id).where(project_members.c.project_id == project_id)))
     db.delete(project)
+    db.execute(delete(TaskTombstone).where(TaskTombstone.project_id == project_id))
     db.commit()
+    http_cache.bump_project_versions([project_id])
+    stats_service.forget_project(project_id)
+    principal_cache.invalidate_users(member_ids)
     return {"detail": "Project deleted"}
 
@@ -0,0 +1,45 @@
+# Async versions of the hot project routes, registered in front of project_api when DB_ASYNC is enabled.
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Project, User
+from app.schemas import project_schema as project_schema
+from app.db.database import get_async_db
+from app.services.auth_service import get_current_user_async
+from app.core.principal_cache import Principal
+from app.core import http_cache
+from app.api.project_api import PROJECT, PROJECT_LIST
+from starlette.concurrency import run_in_threadpool
+
+router = APIRouter()
+
+@router.get("/me", response_model=list[project_schema.ProjectOut])
+# Returns all projects where the user is owner or member
+async def get_my_projects(request: Request, db: AsyncSession = Depends(get_async_db),
+                          user: Principal = Depends(get_current_user_async)):
+    async def load(headers: dict):
+        owned = select(Project).where(Project.owner_id == user.id)
+        member_of = select(Project).join(Project.members).where(User.id == user.id)
+        stmt = select(Project).from_statement(owned.union(member_of))
+        return (await db.scalars(stmt)).all()
+
+    etag = await run_in_threadpool(http_cache.make_etag, user.project_ids, "projects_me", user.id)
+    return await http_cache.respond_async(request, etag, load, PROJECT_LIST)
+
+@router.get("/{project_id}", response_model=project_schema.ProjectOut)
+async def get_project(project_id: int, request: Request, db: AsyncSession = Depends(get_async_db),
+                      user: Principal = Depends(get_current_user_async)):
+    project = await db.get(Project, project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    if project.id not in user.project_ids:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    async def load(headers: dict):
+        return project
+
+    etag = await run_in_threadpool(http_cache.make_etag, [project_id], "project", project_id)
+    return await http_cache.respond_async(request, etag, load, PROJECT)
@@ -1,22 +1,39 @@
-from fastapi import APIRouter, Depends, Query, Body, HTTPException
+from fastapi import APIRouter, Depends, Query, Body, HTTPException, Request
+from pydantic import TypeAdapter
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from app.models import Project, User, Board
+from app.models import Board, ProjectRole
 from app.models.task_model import TaskComment, Task
 from app.schemas import task_schema as task_schema
 from app.services import task_service as task_service
-from app.services.auth_service import get_current_user
-from app.db.database import get_db
+from app.services import permission_service
+from app.core import http_cache
+from app.core.row_json import RowEncoder
+from app.services.auth_service import get_current_user, get_scope_user
+from app.core.principal_cache import Principal
+from app.db.database import get_db, get_read_db, uses_replica
 
 router = APIRouter()
 
+# Serializers for the ETag endpoints, which return ready-made responses.
+# Task lists are selected as TaskOut row tuples and encoded without per-row validation.
+TASK_ROWS = RowEncoder(task_schema.TaskOut)
+COMMENT_LIST = TypeAdapter(list[task_schema.TaskCommentOut])
+
 @router.post("/", response_model=task_schema.TaskOut)
 def create(task: task_schema.TaskCreate, db: Session = Depends(get_db), user=Depends(get_current_user)):
     return task_service.create_task(task, db, user)
 
 @router.get("/", response_model=list[task_schema.TaskOut])
-# Retrieves tasks with optional filters and pagination
+# Retrieves tasks with optional filters and pagination.
+# pagination=cursor (or passing a cursor) switches to keyset pagination: the cursor
+# for the next page is returned in the X-Next-Cursor header, absent on the last page.
+# scope=mine (requires a token) limits the list to projects the caller is a member of.
+# total=exact|estimate adds the number of matching tasks as X-Total-Count.
+# Responses carry an ETag, If-None-Match is answered with 304 (see app/core/http_cache.py).
 def get_all(
+        request: Request,
         completed: bool | None = None,
         project_id: int | None = None,
         board_id: int | None = None,
@@ -27,9 +44,37 @@ def get_all(
         limit: int = Query(20, ge=1, le=100),
         offset: int = Query(0, ge=0),
         search: str | None = None,
-        db: Session = Depends(get_db)
+        pagination: str = Query("offset", pattern="^(offset|cursor)$"),
+        cursor: str | None = None,
+        scope: str = Query("all", pattern="^(all|mine)$"),
+        total: str | None = Query(None, pattern="^(exact|estimate)$"),
+        db: Session = Depends(get_read_db),
+        user: Principal | None = Depends(get_scope_user)
 ):
-    return task_service.query_tasks(db, completed, project_id, board_id, priority, assigned_user_id, sort_by, sort_order, limit, offset, search)
+    visible_to = task_service.visible_to(scope, user)
+
+    def load(headers: dict):
+        if total:
+            headers["X-Total-Count"] = str(task_service.count_tasks(
+                db, completed, project_id, board_id, priority, assigned_user_id, search, visible_to, total == "estimate"
+            ))
+        if pagination == "cursor" or cursor:
+            tasks, next_cursor = task_service.query_tasks_page(
+                db, completed, project_id, board_id, priority, assigned_user_id, sort_by, sort_order, limit, cursor,
+                search, visible_to, as_rows=True
+            )
+            if next_cursor:
+                headers["X-Next-Cursor"] = next_cursor
+            return tasks
+        return task_service.query_tasks(db, completed, project_id, board_id, priority, assigned_user_id, sort_by,
+                                        sort_order, limit, offset, search, visible_to, as_rows=True)
+
+    etag = None
+    # Replicas may lag behind the version counters, their results are never tagged
+    if not uses_replica(db):
+        etag = http_cache.make_etag(task_service.list_version_projects(project_id, visible_to, user),
+                                    "tasks", visible_to, sorted(request.query_params.multi_items()))
+    return http_cache.respond(request, etag, load, TASK_ROWS)
 
 @router.patch("/{task_id}", response_model=task_schema.TaskOut)
 # Partially update task fields (e.g., change title or status)
@@ -55,7 +100,7 @@ def delete(task_id: int, db: Session = Depends(get_db), user=Depends(get_current
 # Returns all tasks due today for the logged-in user
 def get_today_reminders(
         db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        user: Principal = Depends(get_current_user)
 ):
     return task_service.get_tasks_due_today(db, user)
 
@@ -82,70 +127,37 @@ def upload_attachment(task_id: int, file: UploadFile = File(...), db: Session =
 
 @router.get("/{task_id}/comments", response_model=list[task_schema.TaskCommentOut])
 # Returns all comments for a given task
-def get_task_comments(task_id: int, db: Session = Depends(get_db), user=Depends(get_current_user)):
+def get_task_comments(task_id: int, request: Request, db: Session = Depends(get_read_db), user=Depends(get_current_user)):
     task = db.query(Task).filter(Task.id == task_id).first()
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
 
-    if task.project_id not in [p.id for p in user.projects]:
+    if not task_service.has_task_access(task, user, db, ProjectRole.viewer):
         raise HTTPException(status_code=403, detail="No access to this task")
 
-    return db.query(TaskComment).filter(TaskComment.task_id == task_id).all()
+    etag = None if uses_replica(db) else http_cache.make_etag([task.project_id], "comments", task_id)
+    return http_cache.respond(request, etag, lambda headers: db.query(TaskComment).filter(TaskComment.task_id == task_id).all(),
+                              COMMENT_LIST)
 
 @router.put("/{task_id}/assign/{user_id}")
 # Assigns a task to a user within the same project
 def assign_task(task_id: int, user_id: int, db: Session = Depends(get_db), user=Depends(get_current_user)):
-    task = db.query(Task).filter(Task.id == task_id).first()
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-
-    project = db.query(Project).filter(Project.id == task.project_id).first()
-    if not project or user not in project.members:
-        raise HTTPException(status_code=403, detail="No access to this project")
-
-    target_user = db.query(User).filter(User.id == user_id).first()
-    if not target_user or target_user not in project.members:
-        raise HTTPException(status_code=400, detail="Target user is not a project member")
-
-    task.assigned_user_id = user_id
-    db.commit()
-    db.refresh(task)
-    return task
+    return task_service.assign_task(task_id, user_id, db, user)
 
 @router.get("/board/{board_id}", response_model=list[task_schema.TaskOut])
 # Retrieves all tasks associated with a specific board
-def get_tasks_by_board(board_id: int, db: Session = Depends(get_db), user=Depends(get_current_user)):
+def get_tasks_by_board(board_id: int, request: Request, db: Session = Depends(get_db), user=Depends(get_current_user)):
     board = db.query(Board).filter(Board.id == board_id).first()
     if not board:
         raise HTTPException(status_code=404, detail="Board not found")
 
-    project = db.query(Project).filter(Project.id == board.project_id).first()
-    if not project or user not in project.members:
-        raise HTTPException(status_code=403, detail="No access to this board")
+    permission_service.require_role(db, user, board.project_id, ProjectRole.viewer, "No access to this board")
 
-    return db.query(Task).filter(Task.board_id == board_id).all()
+    etag = http_cache.make_etag([board.project_id], "board_tasks", board_id)
+    rows = select(*task_service.TASK_OUT_COLUMNS).where(Task.board_id == board_id)
+    return http_cache.respond(request, etag, lambda headers: db.execute(rows).all(), TASK_ROWS)
 
 @router.post("/{task_id}/duplicate", response_model=task_schema.TaskOut)
 # Duplicates an existing task
 def duplicate_task(task_id: int, db: Session = Depends(get_db), user=Depends(get_current_user)):
-    original = db.query(Task).filter(Task.id == task_id).first()
-    if not original:
-        raise HTTPException(status_code=404, detail="Task not found")
-
-    project = db.query(Project).filter(Project.id == original.project_id).first()
-    if user not in project.members:
-        raise HTTPException(status_code=403, detail="No access to task")
-
-    copy = Task(
-        title=original.title + " (Copy)",
-        description=original.description,
-        due_date=original.due_date,
-        project_id=original.project_id,
-        board_id=original.board_id,
-        priority=original.priority,
-        assigned_user_id=original.assigned_user_id
-    )
-    db.add(copy)
-    db.commit()
-    db.refresh(copy)
-    return copy
+    return task_service.duplicate_task(task_id, db, user)
@@ -0,0 +1,105 @@
+# Async versions of the hot task routes, registered in front of task_api when DB_ASYNC is enabled.
+# Routes not listed here keep being served by the sync router.
+
+from fastapi import APIRouter, Depends, Query, Body, HTTPException, Request
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Board, ProjectRole
+from app.schemas import task_schema as task_schema
+from app.services import task_service_async as task_service, permission_service
+from app.services.auth_service import get_current_user_async, get_scope_user_async
+from app.services import task_service as sync_task_service
+from app.core.principal_cache import Principal
+from app.db.database import get_async_db
+from app.core import http_cache
+from app.api.task_api import TASK_ROWS
+
+router = APIRouter()
+
+@router.post("/", response_model=task_schema.TaskOut)
+async def create(task: task_schema.TaskCreate, db: AsyncSession = Depends(get_async_db),
+                 user: Principal = Depends(get_current_user_async)):
+    return await task_service.create_task(task, db, user)
+
+@router.get("/", response_model=list[task_schema.TaskOut])
+# Same parameters, pagination modes and ETags as task_api.get_all
+async def get_all(
+        request: Request,
+        completed: bool | None = None,
+        project_id: int | None = None,
+        board_id: int | None = None,
+        priority: str | None = None,
+        assigned_user_id: int | None = None,
+        sort_by: str | None = Query(None, pattern="^(due_date|priority|created_at)$"),
+        sort_order: str = Query("asc", pattern="^(asc|desc)$"),
+        limit: int = Query(20, ge=1, le=100),
+        offset: int = Query(0, ge=0),
+        search: str | None = None,
+        pagination: str = Query("offset", pattern="^(offset|cursor)$"),
+        cursor: str | None = None,
+        scope: str = Query("all", pattern="^(all|mine)$"),
+        total: str | None = Query(None, pattern="^(exact|estimate)$"),
+        db: AsyncSession = Depends(get_async_db),
+        user: Principal | None = Depends(get_scope_user_async)
+):
+    visible_to = sync_task_service.visible_to(scope, user)
+
+    async def load(headers: dict):
+        if total:
+            headers["X-Total-Count"] = str(await task_service.count_tasks(
+                db, completed, project_id, board_id, priority, assigned_user_id, search, visible_to, total == "estimate"
+            ))
+        if pagination == "cursor" or cursor:
+            tasks, next_cursor = await task_service.query_tasks_page(
+                db, completed, project_id, board_id, priority, assigned_user_id, sort_by, sort_order, limit, cursor,
+                search, visible_to, as_rows=True
+            )
+            if next_cursor:
+                headers["X-Next-Cursor"] = next_cursor
+            return tasks
+        return await task_service.query_tasks(db, completed, project_id, board_id, priority, assigned_user_id,
+                                              sort_by, sort_order, limit, offset, search, visible_to,
+                                              as_rows=True)
+
+    etag = await run_in_threadpool(
+        http_cache.make_etag, sync_task_service.list_version_projects(project_id, visible_to, user),
+        "tasks", visible_to, sorted(request.query_params.multi_items())
+    )
+    return await http_cache.respond_async(request, etag, load, TASK_ROWS)
+
+@router.patch("/{task_id}", response_model=task_schema.TaskOut)
+async def patch(task_id: int, fields: dict = Body(...), db: AsyncSession = Depends(get_async_db),
+                user: Principal = Depends(get_current_user_async)):
+    return await task_service.update_task_partial(task_id, fields, db, user)
+
+@router.put("/{task_id}/toggle")
+async def toggle_done(task_id: int, db: AsyncSession = Depends(get_async_db),
+                      user: Principal = Depends(get_current_user_async)):
+    return await task_service.toggle_completion(task_id, db, user)
+
+@router.delete("/{task_id}")
+async def delete(task_id: int, db: AsyncSession = Depends(get_async_db),
+                 user: Principal = Depends(get_current_user_async)):
+    return await task_service.delete_task(task_id, db, user)
+
+@router.get("/reminders/today", response_model=list[task_schema.TaskOut])
+async def get_today_reminders(db: AsyncSession = Depends(get_async_db),
+                              user: Principal = Depends(get_current_user_async)):
+    return await task_service.get_tasks_due_today(db, user)
+
+@router.get("/board/{board_id}", response_model=list[task_schema.TaskOut])
+async def get_tasks_by_board(board_id: int, request: Request, db: AsyncSession = Depends(get_async_db),
+                             user: Principal = Depends(get_current_user_async)):
+    board = await db.get(Board, board_id)
+    if not board:
+        raise HTTPException(status_code=404, detail="Board not found")
+
+    if not await permission_service.has_role_async(db, user, board.project_id, ProjectRole.viewer):
+        raise HTTPException(status_code=403, detail="No access to this board")
+
+    async def load(headers: dict):
+        return await task_service.get_task_rows_by_board(board_id, db)
+
+    etag = await run_in_threadpool(http_cache.make_etag, [board.project_id], "board_tasks", board_id)
+    return await http_cache.respond_async(request, etag, load, TASK_ROWS)
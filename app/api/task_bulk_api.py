@@ -0,0 +1,33 @@
+# Bulk task endpoints, registered before the task routers so /tasks/bulk
+# isn't matched by /tasks/{task_id}. See app/services/task_bulk_service.py.
+
+from fastapi import APIRouter, Depends, Body
+from sqlalchemy.orm import Session
+
+from app.schemas import task_schema as task_schema
+from app.services import task_bulk_service
+from app.services.auth_service import get_current_user
+from app.core.principal_cache import Principal
+from app.db.database import get_db
+
+router = APIRouter()
+
+@router.post("", response_model=task_schema.BulkResult)
+# Creates a list of tasks (TaskCreate items)
+def bulk_create(items: list[dict] = Body(...), db: Session = Depends(get_db), user: Principal = Depends(get_current_user)):
+    return task_bulk_service.create_tasks(items, db, user)
+
+@router.patch("", response_model=task_schema.BulkResult)
+# Partially updates tasks, items are {"id": ..., "fields": {...}}
+def bulk_patch(items: list[dict] = Body(...), db: Session = Depends(get_db), user: Principal = Depends(get_current_user)):
+    return task_bulk_service.update_tasks(items, db, user)
+
+@router.delete("", response_model=task_schema.BulkResult)
+# Deletes the tasks with the given ids
+def bulk_delete(task_ids: list[int] = Body(...), db: Session = Depends(get_db), user: Principal = Depends(get_current_user)):
+    return task_bulk_service.delete_tasks(task_ids, db, user)
+
+@router.post("/move", response_model=task_schema.BulkResult)
+# Moves tasks to another board of the same project
+def bulk_move(move: task_schema.TaskBulkMove, db: Session = Depends(get_db), user: Principal = Depends(get_current_user)):
+    return task_bulk_service.move_tasks(move, db, user)
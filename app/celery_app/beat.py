@@ -11,13 +11,25 @@ celery_app.conf.beat_schedule_filename = "beat-data/celerybeat-schedule"
 
 # Tasks aus reminder importieren
 celery_app.autodiscover_tasks([
-    "app.services.reminders"
-])
+    "app.services"
+], related_name="reminders_service")
+celery_app.autodiscover_tasks([
+    "app.services"
+], related_name="stats_service")
 
-# This daily Celery beat task ensures users get timely notifications for due tasks.2
+# The frequent tick ensures users get timely notifications for due tasks, it only touches
+# tasks that became due since the previous tick. The daily rebuild repairs the due index.
 celery_app.conf.beat_schedule = {
-    "daily_reminder": {
-        "task": "app.services.reminders.send_reminders",
+    "reminder_tick": {
+        "task": "app.services.reminders_service.send_due_reminders",
+        "schedule": settings.REMINDER_TICK_SECONDS,
+    },
+    "reminder_index_rebuild": {
+        "task": "app.services.reminders_service.rebuild_reminder_index",
         "schedule": crontab(hour=7, minute=0),
-    }
+    },
+    "project_stats_reconcile": {
+        "task": "app.services.stats_service.reconcile_project_stats",
+        "schedule": settings.STATS_RECONCILE_SECONDS,
+    },
 }
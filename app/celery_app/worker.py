@@ -10,7 +10,10 @@ celery_app = Celery(
     backend=settings.CELERY_RESULT_BACKEND
 )
 
-# Autodiscovery for tasks in services.reminders_service
+# Autodiscovery for tasks in services.reminders_service and services.stats_service
 celery_app.autodiscover_tasks([
-    "app.services.reminders"
-])
+    "app.services"
+], related_name="reminders_service")
+celery_app.autodiscover_tasks([
+    "app.services"
+], related_name="stats_service")
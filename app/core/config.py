@@ -14,6 +14,62 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     CELERY_BROKER_URL: str
     CELERY_RESULT_BACKEND: str
+    # Principal cache for token verification (see app/core/principal_cache.py)
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+    # Dedicated bcrypt executor, keeps password hashing off the request thread pool
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_USE_PROCESSES: bool = False
+    PASSWORD_HASH_MAX_PENDING: int = 32
+    # Text search configuration for the tasks tsvector (PostgreSQL only)
+    SEARCH_TEXT_CONFIG: str = "simple"
+    # WebSocket outbound queue per connection and what to do when it is full
+    # (drop_oldest, coalesce or disconnect)
+    WS_SEND_QUEUE_SIZE: int = 256
+    WS_SLOW_CONSUMER_POLICY: str = "drop_oldest"
+    # Task change events are micro-batched per project (0 publishes immediately)
+    EVENT_BATCH_WINDOW_MS: int = 50
+    EVENT_BATCH_MAX_SIZE: int = 500
+    # Events kept per project for replay on WebSocket reconnect
+    EVENT_LOG_SIZE: int = 1000
+    # Reconnects that missed more events than this get a resync instead of a replay
+    WS_REPLAY_MAX_EVENTS: int = 500
+    # Reminder run: rows per streamed batch and number of project-range shards
+    REMINDER_BATCH_SIZE: int = 1000
+    REMINDER_SHARDS: int = 1
+    REMINDER_TICK_SECONDS: int = 60
+    # Interval of the job that repairs drifted per-project stats counters
+    STATS_RECONCILE_SECONDS: int = 3600
+    # Connection pool of every engine (pool_recycle -1 disables recycling)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: int = 30
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    # Per-statement timeout on PostgreSQL, 0 disables it
+    DB_STATEMENT_TIMEOUT_MS: int = 0
+    # Comma separated read replica URLs for read-only endpoints, and how long a client keeps
+    # reading from the primary after a write (read-your-writes)
+    DATABASE_REPLICA_URLS: str = ""
+    DB_READ_STICKY_SECONDS: int = 5
+    # Maximum number of items per /tasks/bulk request
+    TASK_BULK_MAX_ITEMS: int = 5000
+    # Rows per server-side cursor fetch (export) and per transaction (import) of project transfers
+    PROJECT_TRANSFER_BATCH_SIZE: int = 1000
+    # How long X-Total-Count values of task lists are reused
+    TASK_COUNT_CACHE_SECONDS: int = 15
+    # Shared response cache for the ETag endpoints: off, local (in-process LRU) or redis
+    # (in-process LRU in front of Redis)
+    HTTP_RESPONSE_CACHE: str = "off"
+    HTTP_RESPONSE_CACHE_SECONDS: int = 60
+    HTTP_RESPONSE_CACHE_MAX_ENTRIES: int = 1024
+    # Serve the hot task/project routes with the async engine (see app/db/database.py)
+    DB_ASYNC: bool = False
+    # Per-route request metrics on /metrics, and requests slower than this are logged
+    # with their most expensive SQL statements
+    REQUEST_METRICS: bool = True
+    SLOW_REQUEST_SECONDS: float = 1.0
+    SLOW_REQUEST_LOG_STATEMENTS: int = 5
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,207 @@
+# Structured task change events for real-time clients.
+# Every task mutation emits a typed event carrying the changed fields. Events are buffered
+# per project for a short window and published as one compact JSON batch on the
+# project's Redis channel:
+#   {"type": "batch", "project_id": 1, "events": [
+#       {"seq": 41, "type": "task.updated", "project_id": 1, "task_id": 7, "ts": "...", "data": {"completed": true}}
+#   ]}
+# "seq" increases monotonically per project (a Redis counter shared by all processes).
+# Sequence assignment, publish and appending to the project's bounded event log (a Redis
+# Stream with entry ids "<seq>-0", used to replay missed events on reconnect) happen in
+# one Lua script, so batches of a project are published in seq order even with several
+# API workers.
+
+import enum
+import json
+import logging
+import threading
+import time
+from datetime import date, datetime, timezone
+
+import redis
+
+from app.core.config import settings
+from app.core.redis_subscriber import project_channel
+from app.core.request_metrics import count_events
+
+logger = logging.getLogger(__name__)
+
+TASK_CREATED = "task.created"
+TASK_UPDATED = "task.updated"
+TASK_DELETED = "task.deleted"
+TASK_COMMENTED = "task.commented"
+TASK_REMINDER = "task.reminder"
+
+# Fields of a task that are part of created/updated events
+TASK_EVENT_FIELDS = (
+    "id", "title", "description", "due_date", "completed", "project_id",
+    "board_id", "priority", "assigned_user_id", "created_at",
+)
+
+# KEYS[1] = sequence counter, KEYS[2] = channel, KEYS[3] = event log stream
+# ARGV[1] = batch prefix, ARGV[2] = event log length, ARGV[3..] = event bodies without their opening brace
+_PUBLISH_BATCH_LUA = """
+local count = #ARGV - 2
+local last = redis.call('INCRBY', KEYS[1], count)
+local first = last - count + 1
+local parts = {}
+for i = 1, count do
+    local seq = first + i - 1
+    parts[i] = '{"seq":' .. seq .. ',' .. ARGV[i + 2]
+    redis.call('XADD', KEYS[3], 'MAXLEN', '~', ARGV[2], seq .. '-0', 'e', parts[i])
+end
+redis.call('PUBLISH', KEYS[2], ARGV[1] .. table.concat(parts, ',') .. ']}')
+return last
+"""
+
+
+def sequence_key(project_id: int) -> str:
+    return f"task_events:seq:{project_id}"
+
+
+def event_log_key(project_id: int) -> str:
+    return f"task_events:log:{project_id}"
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    raise TypeError(f"Not JSON serializable: {type(value).__name__}")
+
+
+def dumps(value) -> str:
+    return json.dumps(value, separators=(",", ":"), default=_json_default)
+
+
+def task_snapshot(task) -> dict:
+    return {field: getattr(task, field) for field in TASK_EVENT_FIELDS}
+
+
+class EventPublisher:
+    def __init__(self, redis_client, window_ms: int = 50, max_batch: int = 500, log_size: int = 1000):
+        self.redis_client = redis_client
+        self.log_size = log_size
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self._publish_script = redis_client.register_script(_PUBLISH_BATCH_LUA)
+        # project id -> encoded event bodies waiting for the next flush
+        self._pending: dict[int, list[str]] = {}
+        self._condition = threading.Condition()
+        self._flusher: threading.Thread | None = None
+        self.events_published = 0
+        self.batches_published = 0
+
+    def emit(self, event_type: str, project_id: int, task_id: int | None = None, data: dict | None = None):
+        body = self.encode(event_type, project_id, task_id, data)
+        count_events(1)
+        if self.window <= 0:
+            self.publish_bodies({project_id: [body]})
+            return
+        with self._condition:
+            batch = self._pending.setdefault(project_id, [])
+            batch.append(body)
+            self._ensure_flusher()
+            if len(self._pending) == 1 and len(batch) == 1 or len(batch) >= self.max_batch:
+                self._condition.notify()
+
+    # Several events at once (bulk endpoints): each project's events are queued together
+    # and go out as one batch with consecutive sequence numbers
+    def emit_many(self, items: list[tuple[str, int, int | None, dict | None]]):
+        bodies: dict[int, list[str]] = {}
+        for event_type, project_id, task_id, data in items:
+            bodies.setdefault(project_id, []).append(self.encode(event_type, project_id, task_id, data))
+        if not bodies:
+            return
+        count_events(len(items))
+        if self.window <= 0:
+            self.publish_bodies(bodies)
+            return
+        with self._condition:
+            for project_id, project_bodies in bodies.items():
+                self._pending.setdefault(project_id, []).extend(project_bodies)
+            self._ensure_flusher()
+            self._condition.notify()
+
+    @staticmethod
+    def encode(event_type: str, project_id: int, task_id: int | None = None, data: dict | None = None) -> str:
+        event = {
+            "type": event_type,
+            "project_id": project_id,
+            "task_id": task_id,
+            "ts": datetime.now(timezone.utc),
+            "data": data or {},
+        }
+        return dumps(event)[1:]  # the Lua script prepends '{"seq":N,'
+
+    def flush(self):
+        # Publishes everything buffered right away (e.g. at the end of a Celery task)
+        with self._condition:
+            pending, self._pending = self._pending, {}
+        if pending:
+            self.publish_bodies(pending)
+
+    # Publishes encoded events (see encode) of several projects in one pipelined round trip
+    # Returns the projects whose events were all published
+    def publish_bodies(self, pending: dict[int, list[str]]) -> set[int]:
+        pipe = self.redis_client.pipeline(transaction=False)
+        chunks = []
+        for project_id, bodies in pending.items():
+            prefix = f'{{"type":"batch","project_id":{project_id},"events":['
+            for start in range(0, len(bodies), self.max_batch):
+                chunk = bodies[start:start + self.max_batch]
+                self._publish_script(
+                    keys=[sequence_key(project_id), project_channel(project_id), event_log_key(project_id)],
+                    args=[prefix, self.log_size, *chunk],
+                    client=pipe,
+                )
+                chunks.append((project_id, len(chunk)))
+
+        try:
+            results = pipe.execute(raise_on_error=False)
+        except Exception as e:
+            logger.error(f"Publishing task events failed: {e}")
+            return set()
+
+        published, failed = 0, set()
+        for (project_id, count), result in zip(chunks, results):
+            if isinstance(result, Exception):
+                logger.error(f"Publishing {count} task events for project {project_id} failed: {result}")
+                failed.add(project_id)
+                continue
+            published += count
+            self.batches_published += 1
+        self.events_published += published
+        return set(pending) - failed
+
+    def _ensure_flusher(self):
+        # Caller holds the condition
+        if self._flusher is None or not self._flusher.is_alive():
+            self._flusher = threading.Thread(target=self._flush_loop, name="event-flusher", daemon=True)
+            self._flusher.start()
+
+    def _flush_loop(self):
+        while True:
+            with self._condition:
+                while not self._pending:
+                    self._condition.wait()
+                # Collect more events during the window unless a batch is already full
+                deadline = time.monotonic() + self.window
+                while not self._batch_full():
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+            self.flush()
+
+    def _batch_full(self) -> bool:
+        return any(len(bodies) >= self.max_batch for bodies in self._pending.values())
+
+
+event_publisher = EventPublisher(
+    redis.Redis.from_url(settings.REDIS_URL),
+    window_ms=settings.EVENT_BATCH_WINDOW_MS,
+    max_batch=settings.EVENT_BATCH_MAX_SIZE,
+    log_size=settings.EVENT_LOG_SIZE,
+)
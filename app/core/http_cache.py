@@ -0,0 +1,173 @@
+# HTTP caching for the polled read endpoints.
+# Every project has a version counter in Redis that is bumped after each committed mutation
+# of its tasks, comments, boards, members or the project itself (plus one global counter for
+# lists that span all projects). Responses carry a weak ETag derived from the versions they
+# depend on and the query parameters, so a poll with a matching If-None-Match is answered
+# with 304 from a single Redis MGET, without running the list query.
+# Optionally (HTTP_RESPONSE_CACHE) serialized bodies are cached under their ETag:
+#   local - in-process LRU
+#   redis - in-process LRU in front of a shared Redis tier
+# A bumped version changes the ETag, so stale entries are never hit and just expire.
+# If Redis is unavailable responses are served without ETag and cache.
+
+import hashlib
+import json
+import logging
+from typing import Callable
+
+import redis
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.row_json import RowEncoder
+from app.core.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+redis_client = redis.Redis.from_url(settings.REDIS_URL)
+
+GLOBAL_VERSION_KEY = "project_version:all"
+_RESPONSE_KEY_PREFIX = "http_cache:"
+
+RESPONSE_CACHE_MODES = ("off", "local", "redis")
+if settings.HTTP_RESPONSE_CACHE not in RESPONSE_CACHE_MODES:
+    raise ValueError(f"Unknown HTTP_RESPONSE_CACHE mode: {settings.HTTP_RESPONSE_CACHE}")
+
+_local_responses = TTLCache(settings.HTTP_RESPONSE_CACHE_SECONDS, settings.HTTP_RESPONSE_CACHE_MAX_ENTRIES)
+
+
+def version_key(project_id: int) -> str:
+    return f"project_version:{project_id}"
+
+
+# Call after the commit of every mutation that changes what the cached endpoints return
+def bump_project_versions(project_ids):
+    pipe = redis_client.pipeline(transaction=False)
+    for project_id in {project_id for project_id in project_ids if project_id is not None}:
+        pipe.incr(version_key(project_id))
+    pipe.incr(GLOBAL_VERSION_KEY)
+    try:
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.error(f"Bumping project versions failed, ETags may be stale: {e}")
+
+
+# Weak ETag over the versions of the given projects (None: the global version) and the
+# remaining parts (endpoint name, parameters, caller). None if Redis can't be reached.
+def make_etag(project_ids, *parts) -> str | None:
+    keys = [GLOBAL_VERSION_KEY] if project_ids is None else [version_key(project_id) for project_id in sorted(project_ids)]
+    try:
+        versions = redis_client.mget(keys) if keys else []
+    except redis.RedisError as e:
+        logger.warning(f"Reading project versions failed, responding without ETag: {e}")
+        return None
+    versions = [int(version or 0) for version in versions]
+    digest = hashlib.blake2b(repr((keys, versions, parts)).encode(), digest_size=16).hexdigest()
+    return f'W/"{digest}"'
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Weak comparison, the W/ prefix is ignored
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in header.split(","))
+
+
+def _cached_response(etag: str) -> bytes | None:
+    if settings.HTTP_RESPONSE_CACHE == "off":
+        return None
+    entry = _local_responses.get(etag)
+    if entry is None and settings.HTTP_RESPONSE_CACHE == "redis":
+        try:
+            entry = redis_client.get(_RESPONSE_KEY_PREFIX + etag)
+        except redis.RedisError:
+            entry = None
+        if entry is not None:
+            _local_responses.set(etag, entry)
+    return entry
+
+
+def _store_response(etag: str, entry: bytes):
+    if settings.HTTP_RESPONSE_CACHE == "off":
+        return
+    _local_responses.set(etag, entry)
+    if settings.HTTP_RESPONSE_CACHE == "redis":
+        try:
+            redis_client.set(_RESPONSE_KEY_PREFIX + etag, entry, ex=settings.HTTP_RESPONSE_CACHE_SECONDS)
+        except redis.RedisError as e:
+            logger.warning(f"Storing cached response failed: {e}")
+
+
+# Cache entry: response headers as one JSON line, followed by the body
+def _encode_entry(headers: dict, body: bytes) -> bytes:
+    return json.dumps(headers).encode() + b"\n" + body
+
+
+def _decode_entry(entry: bytes) -> tuple[dict, bytes]:
+    headers, body = entry.split(b"\n", 1)
+    return json.loads(headers), body
+
+
+def _serialize(adapter: TypeAdapter | RowEncoder, content) -> bytes:
+    if isinstance(adapter, RowEncoder):
+        return adapter.encode(content)
+    return adapter.dump_json(adapter.validate_python(content, from_attributes=True))
+
+
+def _json_response(etag: str, headers: dict, body: bytes) -> Response:
+    return Response(content=body, media_type="application/json", headers={**headers, "ETag": etag})
+
+
+def not_modified_response(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
+
+
+# Serves a GET endpoint with ETag/304 and the optional response cache.
+# load(headers) returns the content and may add response headers (e.g. X-Next-Cursor);
+# adapter serializes the content like the endpoint's response_model: a TypeAdapter for ORM
+# objects or a RowEncoder for row tuples (see app/core/row_json.py).
+def respond(request: Request, etag: str | None, load: Callable[[dict], object], adapter: TypeAdapter | RowEncoder):
+    if etag is None:
+        headers: dict = {}
+        return Response(content=_serialize(adapter, load(headers)), media_type="application/json", headers=headers)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+
+    entry = _cached_response(etag)
+    if entry is not None:
+        headers, body = _decode_entry(entry)
+        return _json_response(etag, headers, body)
+
+    headers = {}
+    body = _serialize(adapter, load(headers))
+    _store_response(etag, _encode_entry(headers, body))
+    return _json_response(etag, headers, body)
+
+
+# Async counterpart of respond for the DB_ASYNC routes: load is a coroutine function,
+# Redis access runs on the thread pool
+async def respond_async(request: Request, etag: str | None, load, adapter: TypeAdapter | RowEncoder):
+    if etag is None:
+        headers: dict = {}
+        return Response(content=_serialize(adapter, await load(headers)), media_type="application/json", headers=headers)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+
+    entry = await run_in_threadpool(_cached_response, etag)
+    if entry is not None:
+        headers, body = _decode_entry(entry)
+        return _json_response(etag, headers, body)
+
+    headers = {}
+    body = _serialize(adapter, await load(headers))
+    await run_in_threadpool(_store_response, etag, _encode_entry(headers, body))
+    return _json_response(etag, headers, body)
+
+
+def stats() -> dict:
+    return {"mode": settings.HTTP_RESPONSE_CACHE, "local": _local_responses.stats()}
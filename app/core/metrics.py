@@ -0,0 +1,100 @@
+# Lightweight in-process metrics primitives (no external dependency).
+# Histograms use fixed cumulative buckets so observing a value is O(number of buckets).
+
+import threading
+
+# Latency buckets in seconds
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        with self._lock:
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self.counts[i] += 1
+                    break
+            else:
+                self.counts[-1] += 1
+            self.count += 1
+            self.sum += value
+            if value > self.max:
+                self.max = value
+
+    def quantile(self, q: float) -> float:
+        # Upper bound of the bucket containing the q-quantile (good enough for dashboards)
+        with self._lock:
+            if not self.count:
+                return 0.0
+            target = q * self.count
+            seen = 0
+            for i, bound in enumerate(self.buckets):
+                seen += self.counts[i]
+                if seen >= target:
+                    return bound
+            return self.max
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            cumulative, buckets = 0, {}
+            for bound, count in zip(self.buckets, self.counts):
+                cumulative += count
+                buckets[bound] = cumulative
+            return {
+                "count": self.count,
+                "sum": self.sum,
+                "max": self.max,
+                "buckets": buckets,
+            }
+
+
+# Prometheus text exposition format
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def render_histogram(name: str, histogram: Histogram, labels: dict | None = None) -> list[str]:
+    labels = labels or {}
+    snapshot = histogram.snapshot()
+    lines = [f"{name}_bucket{_labels({**labels, 'le': bound})} {count}" for bound, count in snapshot["buckets"].items()]
+    lines.append(f"{name}_bucket{_labels({**labels, 'le': '+Inf'})} {snapshot['count']}")
+    lines.append(f"{name}_sum{_labels(labels)} {snapshot['sum']}")
+    lines.append(f"{name}_count{_labels(labels)} {snapshot['count']}")
+    return lines
+
+
+def render_value(name: str, value, labels: dict | None = None) -> str:
+    return f"{name}{_labels(labels or {})} {value}"
+
+
+# Flattens the numeric values of a (nested) stats dict into gauges named prefix_key[_subkey...]
+def render_stats(prefix: str, stats) -> list[str]:
+    if isinstance(stats, bool):
+        return [render_value(prefix, int(stats))]
+    if isinstance(stats, (int, float)):
+        return [render_value(prefix, stats)]
+    if isinstance(stats, dict):
+        items = stats.items()
+    elif isinstance(stats, (list, tuple)):
+        items = enumerate(stats)
+    else:
+        return []
+    lines = []
+    for key, value in items:
+        lines.extend(render_stats(f"{prefix}_{key}", value))
+    return lines
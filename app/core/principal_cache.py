@@ -0,0 +1,116 @@
+# The principal cache keeps the result of token verification in memory so that
+# authenticated requests don't need a joined User/project_members query each time.
+# Entries expire after a bounded TTL (never later than the token itself) and the
+# cache is capped in size with LRU eviction.
+# NOTE: The cache is per process. Invalidations only reach the local worker,
+# other workers pick up membership changes once their entry expires.
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from app.core.config import settings
+
+
+@dataclass(frozen=True)
+class Principal:
+    # Lightweight, session-independent view of the authenticated user
+    id: int
+    username: str
+    role: str
+    project_ids: frozenset[int] = field(default_factory=frozenset)
+
+
+class PrincipalCache:
+    def __init__(self, ttl_seconds: int, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        # token -> (principal, expires_at)
+        self._entries: OrderedDict[str, tuple[Principal, float]] = OrderedDict()
+        # user id -> tokens, used to invalidate every session of a user at once
+        self._tokens_by_user: dict[int, set[str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, token: str) -> Principal | None:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self.misses += 1
+                return None
+            principal, expires_at = entry
+            if expires_at <= now:
+                self._remove(token)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return principal
+
+    def set(self, token: str, principal: Principal, token_exp: float | None = None):
+        # token_exp is the JWT "exp" claim (unix time), entries never outlive the token
+        ttl = self.ttl_seconds
+        if token_exp is not None:
+            ttl = min(ttl, token_exp - time.time())
+        if ttl <= 0:
+            return
+        with self._lock:
+            if token in self._entries:
+                self._remove(token)
+            self._entries[token] = (principal, time.monotonic() + ttl)
+            self._tokens_by_user.setdefault(principal.id, set()).add(token)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate_user(self, user_id: int):
+        # Drops all cached sessions of a user, e.g. after a membership or role change
+        with self._lock:
+            for token in list(self._tokens_by_user.get(user_id, ())):
+                self._remove(token)
+                self.invalidations += 1
+
+    def invalidate_users(self, user_ids):
+        for user_id in user_ids:
+            self.invalidate_user(user_id)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_user.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def _remove(self, token: str):
+        # Caller must hold the lock
+        entry = self._entries.pop(token, None)
+        if entry is None:
+            return
+        user_id = entry[0].id
+        tokens = self._tokens_by_user.get(user_id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[user_id]
+
+
+principal_cache = PrincipalCache(
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    max_entries=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+)
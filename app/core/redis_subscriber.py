@@ -0,0 +1,103 @@
+# One asyncio Redis Pub/Sub subscriber per process, shared by all WebSocket connections.
+# A project's channel is subscribed when its first local socket connects and unsubscribed
+# when the last one leaves, so Redis connections grow with active projects, not with clients.
+# Incoming messages are dispatched to the ConnectionManager of this process.
+
+import asyncio
+import logging
+
+import redis.asyncio as aioredis
+
+from app.core.websocket_manager import ConnectionManager
+
+CHANNEL_PREFIX = "task_updates:"
+
+logger = logging.getLogger(__name__)
+
+
+def project_channel(project_id: int) -> str:
+    return f"{CHANNEL_PREFIX}{project_id}"
+
+
+class RedisSubscriber:
+    def __init__(self, redis_url: str, manager: ConnectionManager):
+        self.redis_url = redis_url
+        self.manager = manager
+        self._redis: aioredis.Redis | None = None
+        self._pubsub = None
+        self._reader: asyncio.Task | None = None
+        # project id -> number of local sockets interested in it
+        self._refcounts: dict[int, int] = {}
+        self._lock = asyncio.Lock()
+
+    async def subscribe(self, project_id: int):
+        async with self._lock:
+            count = self._refcounts.get(project_id, 0)
+            self._refcounts[project_id] = count + 1
+            if count:
+                return
+            if self._pubsub is None:
+                self._pubsub = self.client().pubsub(ignore_subscribe_messages=True)
+            try:
+                await self._pubsub.subscribe(project_channel(project_id))
+            except BaseException:
+                # Not subscribed after all, the next subscriber of the project tries again
+                self._refcounts.pop(project_id, None)
+                raise
+            if self._reader is None or self._reader.done():
+                self._reader = asyncio.create_task(self._read_loop())
+
+    async def unsubscribe(self, project_id: int):
+        async with self._lock:
+            count = self._refcounts.get(project_id, 0)
+            if count > 1:
+                self._refcounts[project_id] = count - 1
+                return
+            self._refcounts.pop(project_id, None)
+            if count and self._pubsub is not None:
+                await self._pubsub.unsubscribe(project_channel(project_id))
+
+    def client(self) -> aioredis.Redis:
+        if self._redis is None:
+            self._redis = aioredis.Redis.from_url(self.redis_url)
+        return self._redis
+
+    def subscribed_projects(self) -> set[int]:
+        return set(self._refcounts)
+
+    async def close(self):
+        if self._reader is not None:
+            self._reader.cancel()
+            self._reader = None
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+            self._pubsub = None
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+        self._refcounts.clear()
+
+    async def _read_loop(self):
+        # Runs as long as at least one channel is subscribed, reconnecting after Redis errors
+        while self._refcounts:
+            try:
+                message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Redis subscriber error: {e}")
+                await asyncio.sleep(1)
+                continue
+            if message is None or message["type"] != "message":
+                continue
+            try:
+                await self._dispatch(message["channel"], message["data"])
+            except Exception as e:
+                logger.error(f"WebSocket dispatch error: {e}")
+
+    async def _dispatch(self, channel: bytes, data: bytes):
+        try:
+            project_id = int(channel.decode()[len(CHANNEL_PREFIX):])
+        except ValueError:
+            return
+        await self.manager.broadcast(project_id, data.decode())
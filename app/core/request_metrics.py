@@ -0,0 +1,144 @@
+# Request-level performance metrics, exposed in Prometheus text format on /metrics.
+# The middleware in app/main.py opens a RequestStats per request in a context variable
+# (shared with the thread pool running sync endpoints). SQLAlchemy cursor events of every
+# engine (instrument_engine) add the statement count and time, EventPublisher adds the task
+# events it queued for publishing. Per route (method and path template) we keep:
+#   - a latency histogram (time until the response starts, streamed bodies are not included)
+#   - a histogram of SQL statements per request, which makes N+1 patterns visible
+#   - total SQL time, task events and responses by status
+# Requests slower than SLOW_REQUEST_SECONDS are logged with their most expensive statements.
+# The cost per SQL statement is two perf_counter calls and one append.
+
+import logging
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.core.metrics import Histogram, render_histogram, render_value
+
+logger = logging.getLogger(__name__)
+
+# Statements per request
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200, 500)
+# Statements kept per request for the slow request log
+_MAX_RECORDED_STATEMENTS = 500
+# Requests that matched no route share one label, so unknown paths can't grow the registry
+_UNMATCHED_ROUTE = "unmatched"
+
+
+class RequestStats:
+    __slots__ = ("sql_count", "sql_seconds", "statements", "events")
+
+    def __init__(self):
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+        self.statements: list[tuple[str, float]] = []
+        self.events = 0
+
+
+class RouteMetrics:
+    def __init__(self):
+        self.latency = Histogram()
+        self.statements = Histogram(STATEMENT_BUCKETS)
+        self.sql_seconds = 0.0
+        self.events = 0
+        self.responses: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def observe(self, stats: RequestStats, status: int, seconds: float):
+        self.latency.observe(seconds)
+        self.statements.observe(stats.sql_count)
+        with self._lock:
+            self.sql_seconds += stats.sql_seconds
+            self.events += stats.events
+            self.responses[status] += 1
+
+
+_current: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+_routes: dict[tuple[str, str], RouteMetrics] = {}
+_routes_lock = threading.Lock()
+
+
+def start_request():
+    stats = RequestStats()
+    return stats, _current.set(stats)
+
+
+def finish_request(stats: RequestStats, token, method: str, route: str | None, status: int, seconds: float):
+    _current.reset(token)
+    key = (method, route or _UNMATCHED_ROUTE)
+    metrics = _routes.get(key)
+    if metrics is None:
+        with _routes_lock:
+            metrics = _routes.setdefault(key, RouteMetrics())
+    metrics.observe(stats, status, seconds)
+    if seconds >= settings.SLOW_REQUEST_SECONDS:
+        _log_slow_request(stats, key, status, seconds)
+
+
+def count_events(count: int):
+    stats = _current.get()
+    if stats is not None:
+        stats.events += count
+
+
+def instrument_engine(engine: Engine):
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if _current.get() is not None:
+            context._metrics_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        stats = _current.get()
+        started = getattr(context, "_metrics_started", None)
+        if stats is None or started is None:
+            return
+        seconds = time.perf_counter() - started
+        stats.sql_count += 1
+        stats.sql_seconds += seconds
+        if len(stats.statements) < _MAX_RECORDED_STATEMENTS:
+            stats.statements.append((statement, seconds))
+
+
+# Statements are grouped by their text, so an N+1 pattern shows up as one entry with a high count
+def _log_slow_request(stats: RequestStats, key: tuple[str, str], status: int, seconds: float):
+    grouped: dict[str, list] = {}
+    for statement, statement_seconds in stats.statements:
+        entry = grouped.setdefault(statement, [0, 0.0])
+        entry[0] += 1
+        entry[1] += statement_seconds
+    expensive = sorted(grouped.items(), key=lambda item: item[1][1], reverse=True)[:settings.SLOW_REQUEST_LOG_STATEMENTS]
+    details = "".join(
+        f"\n  {count}x {total * 1000:.1f} ms: {' '.join(statement.split())[:500]}"
+        for statement, (count, total) in expensive
+    )
+    logger.warning(
+        f"Slow request {key[0]} {key[1]} -> {status}: {seconds * 1000:.1f} ms, "
+        f"{stats.sql_count} SQL statements in {stats.sql_seconds * 1000:.1f} ms{details}"
+    )
+
+
+def render() -> list[str]:
+    routes = sorted(_routes.items())
+    lines = []
+    for name, attribute in (("http_request_duration_seconds", "latency"), ("http_request_sql_statements", "statements")):
+        lines.append(f"# TYPE {name} histogram")
+        for (method, route), metrics in routes:
+            lines.extend(render_histogram(name, getattr(metrics, attribute), {"method": method, "route": route}))
+    for name, attribute in (("http_request_sql_seconds_total", "sql_seconds"), ("http_request_task_events_total", "events")):
+        lines.append(f"# TYPE {name} counter")
+        lines.extend(render_value(name, getattr(metrics, attribute), {"method": method, "route": route})
+                     for (method, route), metrics in routes)
+    lines.append("# TYPE http_responses_total counter")
+    for (method, route), metrics in routes:
+        with metrics._lock:
+            responses = sorted(metrics.responses.items())
+        lines.extend(render_value("http_responses_total", count, {"method": method, "route": route, "status": status})
+                     for status, count in responses)
+    return lines
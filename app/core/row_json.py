@@ -0,0 +1,20 @@
+# Fast JSON path for list responses.
+# Validating every ORM object against the response model (from_attributes) and dumping it
+# again dominates the CPU time of a 100-row page. List endpoints instead select only the
+# columns of the output schema as row tuples (in schema field order) and encode them with
+# orjson. The bytes are identical to TypeAdapter(list[schema]).dump_json: compact separators,
+# fields in schema order, UTF-8 strings, ISO datetimes with "Z" for UTC (OPT_UTC_Z).
+# Only for schemas whose fields are plain column values (str, int, bool, datetime, None),
+# rows are neither validated nor coerced.
+
+import orjson
+from pydantic import BaseModel
+
+
+class RowEncoder:
+    def __init__(self, schema: type[BaseModel]):
+        self.fields = tuple(schema.model_fields)
+
+    def encode(self, rows) -> bytes:
+        fields = self.fields
+        return orjson.dumps([dict(zip(fields, row)) for row in rows], option=orjson.OPT_UTC_Z)
@@ -1,6 +1,9 @@
 from passlib.context import CryptContext
 from jose import jwt
 from datetime import datetime, timedelta, timezone
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+import asyncio
+import threading
 from app.core.config import settings
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -16,3 +19,56 @@ def create_access_token(data: dict, expires_delta: timedelta = None) -> str:
     expire = datetime.now(timezone.utc) + (expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
+# bcrypt is CPU-bound and deliberately slow. Running it on a small dedicated executor
+# keeps a login storm from occupying the thread pool that serves every other route.
+# Work beyond PASSWORD_HASH_MAX_PENDING is rejected instead of queued indefinitely.
+class PasswordHashingBusy(Exception):
+    pass
+
+_hash_executor: Executor | None = None
+_hash_executor_lock = threading.Lock()
+_hash_pending = 0
+
+def get_hash_executor() -> Executor:
+    global _hash_executor
+    with _hash_executor_lock:
+        if _hash_executor is None:
+            if settings.PASSWORD_HASH_USE_PROCESSES:
+                # Process pool spreads hashing across cores (bcrypt releases the GIL only partly)
+                _hash_executor = ProcessPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS)
+            else:
+                _hash_executor = ThreadPoolExecutor(
+                    max_workers=settings.PASSWORD_HASH_WORKERS,
+                    thread_name_prefix="password-hash",
+                )
+        return _hash_executor
+
+def shutdown_hash_executor():
+    global _hash_executor
+    with _hash_executor_lock:
+        if _hash_executor is not None:
+            _hash_executor.shutdown(wait=False, cancel_futures=True)
+            _hash_executor = None
+
+async def _run_hashing(func, *args):
+    # The counter is only touched from the event loop thread, so no lock is needed
+    global _hash_pending
+    if _hash_pending >= settings.PASSWORD_HASH_MAX_PENDING:
+        raise PasswordHashingBusy()
+    _hash_pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_hash_executor(), func, *args)
+    finally:
+        _hash_pending -= 1
+
+async def hash_password_async(password: str) -> str:
+    return await _run_hashing(hash_password, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_hashing(verify_password, plain_password, hashed_password)
+
+def hash_queue_depth() -> int:
+    return _hash_pending
@@ -3,39 +3,65 @@
 # This would allow sending private updates (e.g., assigned tasks) only to relevant users.
 
 
-from fastapi import WebSocket
-import asyncio
+from fastapi import WebSocket, WebSocketDisconnect
 import logging
-import redis
 from app.core.config import settings
+from app.core.events import event_log_key, sequence_key
 from app.core.websocket_manager import ConnectionManager
+from app.core.redis_subscriber import RedisSubscriber
 
-manager = ConnectionManager()
-redis_client = redis.Redis.from_url(settings.REDIS_URL)
+manager = ConnectionManager(settings.WS_SEND_QUEUE_SIZE, settings.WS_SLOW_CONSUMER_POLICY)
+# Shared per-process Redis subscriber, fans task updates out to the local sockets of a project
+subscriber = RedisSubscriber(settings.REDIS_URL, manager)
 
-# This function sets up a Redis-based listener inside a coroutine loop.
-# It enables real-time task updates across all clients subscribed to a project.
-async def websocket_endpoint(websocket: WebSocket, user_id: int, project_id: int):
+# Real-time task updates across all clients subscribed to a project.
+# Redis messages are received by the shared subscriber, this coroutine only handles the client side.
+# Reconnecting clients pass ?last_seen=<seq> and first get the events they missed, or a
+# {"type": "resync"} message when the gap is no longer in the event log.
+async def websocket_endpoint(websocket: WebSocket, user_id: int, project_id: int, last_seen: int | None = None):
     # Handles WebSocket connection for real-time updates in a project
-    await manager.connect(websocket, project_id)
-    pubsub = redis_client.pubsub()
-    pubsub.subscribe(f"task_updates:{project_id}")
-
-    async def listen_to_redis():
-        # Listens for Redis Pub/Sub messages published by task updates or reminders.
-        # This keeps the client UI in sync without needing polling.
-        for message in pubsub.listen():
-            if message['type'] == 'message':
-                await websocket.send_text(message['data'].decode())
-
-    redis_task = asyncio.create_task(listen_to_redis())
+    await manager.connect(websocket, project_id, paused=last_seen is not None)
+    subscribed = False
     try:
+        await subscriber.subscribe(project_id)
+        subscribed = True
+        if last_seen is not None:
+            # Live events are already queued for this socket (subscribed above), the client
+            # ignores duplicates by seq, so nothing published in between can get lost.
+            await websocket.send_text(await replay_events(project_id, last_seen))
+            manager.resume(websocket)
         while True:
             client_message = await websocket.receive_text()
             await manager.broadcast(project_id, f"Client {user_id}: {client_message}")
+    except WebSocketDisconnect:
+        pass
     except Exception as e:
         logging.error(f"WebSocket error: {e}")
     finally:
-        redis_task.cancel()
         manager.disconnect(websocket)
-        pubsub.close()
+        # A failed subscribe holds no reference to release
+        if subscribed:
+            await subscriber.unsubscribe(project_id)
+
+# Builds the replay message for a client that has seen events up to last_seen
+async def replay_events(project_id: int, last_seen: int) -> str:
+    redis_client = subscriber.client()
+    latest = int(await redis_client.get(sequence_key(project_id)) or 0)
+    resync = f'{{"type":"resync","project_id":{project_id},"seq":{latest}}}'
+    if last_seen > latest:
+        return resync
+
+    limit = settings.WS_REPLAY_MAX_EVENTS
+    entries = await redis_client.xrange(event_log_key(project_id), min=f"{last_seen + 1}-0", max="+", count=limit + 1)
+    missed = latest - last_seen
+    if missed > limit:
+        return resync
+    # The beginning of the gap was already trimmed from the log
+    if missed and (len(entries) < missed or entries[0][0].decode() != f"{last_seen + 1}-0"):
+        return resync
+
+    events = ",".join(fields[b"e"].decode() for _, fields in entries[:missed])
+    return f'{{"type":"batch","project_id":{project_id},"replay":true,"events":[{events}]}}'
+
+async def close_subscriber():
+    await subscriber.close()
@@ -1,27 +1,150 @@
 # ConnectionManager keeps track of WebSocket connections grouped by project.
 # In a future update, support for per-user or per-board channels could be added.
+# Every connection gets a bounded outbound queue drained by its own writer task, so a
+# broadcast only enqueues and one slow client can't delay the rest of the project.
+# When a queue is full the slow-consumer policy decides what happens:
+#   drop_oldest - discard the oldest queued message
+#   coalesce    - collapse the backlog into the newest message (client should resync)
+#   disconnect  - close the slow connection
 
-from fastapi import WebSocket
+import asyncio
+import logging
+import time
 from collections import defaultdict
-from typing import List
+
+from fastapi import WebSocket
+
+from app.core.metrics import Histogram
+
+SLOW_CONSUMER_POLICIES = ("drop_oldest", "coalesce", "disconnect")
+
+logger = logging.getLogger(__name__)
+
+
+class _Connection:
+    def __init__(self, websocket: WebSocket, queue_size: int):
+        self.websocket = websocket
+        self.queue: asyncio.Queue[tuple[float, str]] = asyncio.Queue(maxsize=queue_size)
+        # Reverse index: projects this socket is registered for
+        self.project_ids: set[int] = set()
+        self.writer: asyncio.Task | None = None
+
 
 class ConnectionManager:
-    def __init__(self):
+    def __init__(self, queue_size: int = 256, slow_consumer_policy: str = "drop_oldest"):
+        if slow_consumer_policy not in SLOW_CONSUMER_POLICIES:
+            raise ValueError(f"Unknown slow consumer policy: {slow_consumer_policy}")
+        self.queue_size = queue_size
+        self.slow_consumer_policy = slow_consumer_policy
         # Store connections per project
-        self.active_connections: dict[int, List[WebSocket]] = defaultdict(list)
+        self.active_connections: dict[int, set[WebSocket]] = defaultdict(set)
+        self._connections: dict[WebSocket, _Connection] = {}
+        # Time from enqueue to completed send, and time to enqueue one broadcast
+        self.delivery_latency = Histogram()
+        self.broadcast_latency = Histogram()
+        self.messages_sent = 0
+        self.messages_dropped = 0
+        self.slow_disconnects = 0
 
-    async def connect(self, websocket: WebSocket, project_id: int):
-        await websocket.accept()
-        self.active_connections[project_id].append(websocket)
+    # With paused=True broadcasts are queued but not sent until resume(), which lets the
+    # caller send replayed messages directly before any live message goes out.
+    async def connect(self, websocket: WebSocket, project_id: int, paused: bool = False):
+        connection = self._connections.get(websocket)
+        if connection is None:
+            await websocket.accept()
+            connection = _Connection(websocket, self.queue_size)
+            self._connections[websocket] = connection
+            if not paused:
+                self.resume(websocket)
+        connection.project_ids.add(project_id)
+        self.active_connections[project_id].add(websocket)
+
+    def resume(self, websocket: WebSocket):
+        connection = self._connections.get(websocket)
+        if connection is not None and connection.writer is None:
+            connection.writer = asyncio.create_task(self._write_loop(connection))
 
     def disconnect(self, websocket: WebSocket):
-        # Remove from all projects (can be optimized)
-        for conns in self.active_connections.values():
-            if websocket in conns:
-                conns.remove(websocket)
+        # Remove from all projects of this socket via the reverse index
+        connection = self._connections.pop(websocket, None)
+        if connection is None:
+            return
+        for project_id in connection.project_ids:
+            conns = self.active_connections.get(project_id)
+            if conns is None:
+                continue
+            conns.discard(websocket)
+            if not conns:
+                del self.active_connections[project_id]
+        if connection.writer is not None and connection.writer is not asyncio.current_task():
+            connection.writer.cancel()
 
     async def broadcast(self, project_id: int, message: str):
-        for connection in self.active_connections.get(project_id, []):
-            await connection.send_text(message)
+        started = time.perf_counter()
+        for websocket in list(self.active_connections.get(project_id, ())):
+            connection = self._connections.get(websocket)
+            if connection is not None:
+                self._enqueue(connection, started, message)
+        self.broadcast_latency.observe(time.perf_counter() - started)
+
+    def connection_count(self, project_id: int | None = None) -> int:
+        if project_id is None:
+            return len(self._connections)
+        return len(self.active_connections.get(project_id, ()))
+
+    def stats(self) -> dict:
+        return {
+            "connections": len(self._connections),
+            "projects": len(self.active_connections),
+            "messages_sent": self.messages_sent,
+            "messages_dropped": self.messages_dropped,
+            "slow_disconnects": self.slow_disconnects,
+            "broadcast_p99_seconds": self.broadcast_latency.quantile(0.99),
+            "delivery_p99_seconds": self.delivery_latency.quantile(0.99),
+        }
+
+    def _enqueue(self, connection: _Connection, enqueued_at: float, message: str):
+        queue = connection.queue
+        if not queue.full():
+            queue.put_nowait((enqueued_at, message))
+            return
+
+        if self.slow_consumer_policy == "disconnect":
+            self.slow_disconnects += 1
+            self.messages_dropped += queue.qsize()
+            self.disconnect(connection.websocket)
+            # 1013: try again later
+            asyncio.create_task(self._close(connection.websocket, code=1013))
+            return
+
+        if self.slow_consumer_policy == "coalesce":
+            while not queue.empty():
+                queue.get_nowait()
+                self.messages_dropped += 1
+        else:
+            queue.get_nowait()
+            self.messages_dropped += 1
+        queue.put_nowait((enqueued_at, message))
+
+    async def _write_loop(self, connection: _Connection):
+        websocket = connection.websocket
+        try:
+            while True:
+                enqueued_at, message = await connection.queue.get()
+                await websocket.send_text(message)
+                self.messages_sent += 1
+                self.delivery_latency.observe(time.perf_counter() - enqueued_at)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.warning(f"WebSocket send failed, dropping connection: {e}")
+            self.disconnect(websocket)
+
+    @staticmethod
+    async def _close(websocket: WebSocket, code: int):
+        try:
+            await websocket.close(code=code)
+        except Exception:
+            pass
 
 manager = ConnectionManager()
@@ -0,0 +1,44 @@
+# Change versions for delta sync (see app/services/sync_service.py).
+# Every write of a task, comment or tombstone stamps the row with a version, and a sync
+# returns the rows with version >= the watermark the client received last time.
+# The watermark must never pass a version that is still to be committed:
+#   - PostgreSQL (13+) stamps rows with the id of the writing transaction. The watermark is
+#     the oldest transaction still running when the sync starts, so a transaction that
+#     commits after a sync is always picked up by the next one.
+#   - SQLite serializes writers: a row gets the version counter plus one, and the watermark is
+#     the next version to be written. Triggers raise the counter to every version written
+#     (migration 6), so deleting rows never hands out a version again.
+
+from sqlalchemy import BigInteger
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+_NEXT_VERSION = "(SELECT value + 1 FROM change_version)"
+
+
+# Version of a row written now, used as default and onupdate of the version columns
+class next_change_version(FunctionElement):
+    type = BigInteger()
+    inherit_cache = True
+
+
+# Versions of rows committed after this point are at least this
+class change_watermark(FunctionElement):
+    type = BigInteger()
+    inherit_cache = True
+
+
+@compiles(next_change_version)
+@compiles(change_watermark)
+def _compile_next_version(element, compiler, **kw):
+    return _NEXT_VERSION
+
+
+@compiles(next_change_version, "postgresql")
+def _compile_transaction_id(element, compiler, **kw):
+    return "pg_current_xact_id()::text::bigint"
+
+
+@compiles(change_watermark, "postgresql")
+def _compile_snapshot_xmin(element, compiler, **kw):
+    return "pg_snapshot_xmin(pg_current_snapshot())::text::bigint"
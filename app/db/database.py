@@ -1,21 +1,181 @@
 # SessionLocal is created once per request using dependency injection.
 # This avoids global sessions and ensures proper DB connection management.
+# With DB_ASYNC the hot routes use an AsyncSession instead (get_async_db). The async
+# engine is created on first use, so the async driver (asyncpg/aiosqlite) is only
+# required when async mode is enabled.
+# Read-only endpoints use get_read_db, which spreads sessions over DATABASE_REPLICA_URLS.
+# After a successful write a client is pinned to the primary for DB_READ_STICKY_SECONDS
+# (marker in Redis, keyed by its credentials), so it always reads its own writes.
 
+import hashlib
+import itertools
+import logging
 import os
-from typing import Any, Generator
+import time
+from typing import Any, AsyncGenerator, Generator
 
+import redis
+from fastapi import Request
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core.config import settings
+from app.core.metrics import Histogram
+from app.core.request_metrics import instrument_engine
+
+logger = logging.getLogger(__name__)
+
+# Time spent waiting for a pooled connection (including opening a new one)
+pool_wait = {"primary": Histogram(), "replica": Histogram()}
+
+def _timed_pool_class(base, histogram: Histogram):
+    class TimedPool(base):
+        def _do_get(self):
+            started = time.perf_counter()
+            try:
+                return super()._do_get()
+            finally:
+                histogram.observe(time.perf_counter() - started)
+    return TimedPool
+
+def engine_options(url: str, histogram: Histogram, is_async: bool = False) -> dict:
+    url = make_url(url)
+    # In-memory SQLite lives in a single connection, there is no pool to tune
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return {}
+
+    options = {
+        "poolclass": _timed_pool_class(AsyncAdaptedQueuePool if is_async else QueuePool, histogram),
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+    }
+    timeout = settings.DB_STATEMENT_TIMEOUT_MS
+    if timeout and url.get_backend_name() == "postgresql":
+        if is_async:
+            options["connect_args"] = {"server_settings": {"statement_timeout": str(timeout)}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={timeout}"}
+    return options
 
 DATABASE_URL = os.getenv("DATABASE_URL")
-engine = create_engine(DATABASE_URL)
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL, pool_wait["primary"]))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+REPLICA_URLS = [url.strip() for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+replica_engines: list[Engine] = [
+    create_engine(url, **engine_options(url, pool_wait["replica"])) for url in REPLICA_URLS
+]
+_replica_sessions = itertools.cycle(
+    [sessionmaker(autocommit=False, autoflush=False, bind=replica) for replica in replica_engines]
+)
+_sticky_redis: redis.Redis | None = None
+
+if settings.REQUEST_METRICS:
+    for instrumented in (engine, *replica_engines):
+        instrument_engine(instrumented)
+
+# Async driver per sync dialect, used when DATABASE_ASYNC_URL is not set
+_ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+_async_engine: AsyncEngine | None = None
+AsyncSessionLocal: async_sessionmaker[AsyncSession] | None = None
+
 def get_db() -> Generator[Session, Any, None]:
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+# Session for read-only endpoints: a replica unless there is none or the client wrote recently
+def get_read_db(request: Request) -> Generator[Session, Any, None]:
+    factory = SessionLocal
+    if replica_engines and not reads_pinned_to_primary(request):
+        factory = next(_replica_sessions)
+    db = factory()
+    try:
+        yield db
+    finally:
+        db.close()
+
+def uses_replica(db: Session) -> bool:
+    return db.get_bind() is not engine
+
+def _sticky_key(request: Request) -> str:
+    client = request.headers.get("authorization") or (request.client.host if request.client else "")
+    return "db:read_primary:" + hashlib.sha256(client.encode()).hexdigest()[:32]
+
+def _sticky_client() -> redis.Redis:
+    global _sticky_redis
+    if _sticky_redis is None:
+        _sticky_redis = redis.Redis.from_url(settings.REDIS_URL)
+    return _sticky_redis
+
+def pin_reads_to_primary(request: Request):
+    try:
+        _sticky_client().set(_sticky_key(request), 1, ex=settings.DB_READ_STICKY_SECONDS)
+    except redis.RedisError as e:
+        logger.warning(f"Could not pin reads to the primary: {e}")
+
+def reads_pinned_to_primary(request: Request) -> bool:
+    try:
+        return bool(_sticky_client().exists(_sticky_key(request)))
+    except redis.RedisError:
+        # Without the marker a replica could serve stale data, the primary is always safe
+        return True
+
+def pool_stats() -> dict:
+    def describe(pool_engine) -> dict:
+        pool = pool_engine.pool
+        if not isinstance(pool, QueuePool):
+            return {"pool": type(pool).__name__}
+        return {"size": pool.size(), "checked_out": pool.checkedout(), "overflow": pool.overflow()}
+
+    return {
+        "primary": describe(engine),
+        "replicas": [describe(replica) for replica in replica_engines],
+        "async": describe(_async_engine.sync_engine) if _async_engine is not None else None,
+        "checkout_wait": {
+            role: {"p50_seconds": histogram.quantile(0.5), "p99_seconds": histogram.quantile(0.99),
+                   "max_seconds": histogram.max, "count": histogram.count}
+            for role, histogram in pool_wait.items()
+        },
+    }
+
+def async_database_url() -> str:
+    explicit = os.getenv("DATABASE_ASYNC_URL")
+    if explicit:
+        return explicit
+    url = make_url(DATABASE_URL)
+    driver = _ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None:
+        raise RuntimeError(f"No async driver known for {url.get_backend_name()}, set DATABASE_ASYNC_URL")
+    return url.set(drivername=f"{url.get_backend_name()}+{driver}").render_as_string(hide_password=False)
+
+def get_async_engine() -> AsyncEngine:
+    global _async_engine, AsyncSessionLocal
+    if _async_engine is None:
+        url = async_database_url()
+        _async_engine = create_async_engine(url, **engine_options(url, pool_wait["primary"], is_async=True))
+        if settings.REQUEST_METRICS:
+            instrument_engine(_async_engine.sync_engine)
+        # expire_on_commit=False: attributes stay readable after commit without implicit IO
+        AsyncSessionLocal = async_sessionmaker(_async_engine, autoflush=False, expire_on_commit=False)
+    return _async_engine
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    get_async_engine()
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def dispose_async_engine():
+    if _async_engine is not None:
+        await _async_engine.dispose()
@@ -0,0 +1,187 @@
+# Minimal versioned schema migrations.
+# Each migration runs once, in order, and its version is recorded in the schema_migrations
+# table. New schema changes are appended to MIGRATIONS; applied entries must never be edited.
+# Migrations are written to be idempotent (checkfirst / inspector checks) because a fresh
+# database gets the full current model schema from the baseline migration. Later migrations
+# spell out the columns and indexes they add rather than reading them from the models, which
+# describe the newest schema and may not match an older database yet.
+
+import logging
+from datetime import datetime, timezone
+
+from sqlalchemy import (
+    BigInteger, Boolean, Column, DateTime, Index, Integer, MetaData, String, Table, Text, false, inspect, text,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.engine import Connection, Engine
+
+from app.db.database import Base
+
+logger = logging.getLogger(__name__)
+
+_migration_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations", _migration_metadata,
+    Column("version", Integer, primary_key=True),
+    Column("description", String),
+    Column("applied_at", DateTime),
+)
+
+# Arbitrary constant so concurrently starting workers don't migrate at the same time (Postgres only)
+_ADVISORY_LOCK_ID = 72_460_001
+
+
+def _baseline(conn: Connection):
+    # Creates every table/index that doesn't exist yet (former create_all in app/main.py)
+    import app.models  # noqa: F401  registers all models on Base.metadata
+    import app.models.task_model  # noqa: F401  TaskComment isn't re-exported
+    Base.metadata.create_all(bind=conn)
+
+
+def _task_query_indexes(conn: Connection):
+    # Composite/partial indexes for task filters and membership lookups on existing databases
+    metadata = MetaData()
+    tasks = Table(
+        "tasks", metadata,
+        Column("project_id", Integer), Column("completed", Boolean), Column("due_date", DateTime),
+        Column("created_at", DateTime), Column("board_id", Integer), Column("assigned_user_id", Integer),
+    )
+    comments = Table("task_comments", metadata, Column("task_id", Integer))
+    members = Table("project_members", metadata, Column("user_id", Integer), Column("project_id", Integer))
+    _create_indexes(
+        conn,
+        Index("ix_tasks_project_completed_due", tasks.c.project_id, tasks.c.completed, tasks.c.due_date),
+        Index("ix_tasks_project_created", tasks.c.project_id, tasks.c.created_at),
+        Index("ix_tasks_board_id", tasks.c.board_id),
+        Index("ix_tasks_assigned_completed", tasks.c.assigned_user_id, tasks.c.completed),
+        Index("ix_tasks_open_due_date", tasks.c.due_date,
+              postgresql_where=tasks.c.completed == false(), sqlite_where=tasks.c.completed == false()),
+        Index("ix_task_comments_task_id", comments.c.task_id),
+        Index("ix_project_members_user_project", members.c.user_id, members.c.project_id),
+        Index("ix_project_members_project_user", members.c.project_id, members.c.user_id),
+    )
+
+
+def _task_search_vector(conn: Connection):
+    # tsvector column + GIN index for full-text search, backfilled for existing tasks
+    tasks = Table("tasks", MetaData(), Column("search_vector", TSVECTOR().with_variant(Text(), "sqlite")))
+    add_column_if_missing(conn, "tasks", tasks.c.search_vector)
+    if conn.dialect.name != "postgresql":
+        return
+    from app.services.search_service import backfill_search_vectors
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_tasks_search_vector ON tasks USING gin (search_vector)"))
+    backfill_search_vectors(conn)
+
+
+def _task_reminder_sent_at(conn: Connection):
+    tasks = Table("tasks", MetaData(), Column("reminder_sent_at", DateTime(timezone=True)))
+    add_column_if_missing(conn, "tasks", tasks.c.reminder_sent_at)
+
+
+def _change_versions(conn: Connection):
+    # Versions, modification time and tombstones for delta sync; existing rows get version 0
+    metadata = MetaData()
+    version = lambda: Column("version", BigInteger, server_default="0")
+    tasks = Table("tasks", metadata, Column("updated_at", DateTime), version())
+    comments = Table("task_comments", metadata, version())
+    tombstones = Table(
+        "task_tombstones", metadata,
+        Column("id", Integer, primary_key=True),
+        Column("project_id", Integer, nullable=False),
+        Column("task_id", Integer, nullable=False),
+        Column("removed_at", DateTime),
+        version(),
+    )
+    add_column_if_missing(conn, "tasks", tasks.c.updated_at)
+    add_column_if_missing(conn, "tasks", tasks.c.version)
+    add_column_if_missing(conn, "task_comments", comments.c.version)
+    tombstones.create(bind=conn, checkfirst=True)
+    _create_indexes(
+        conn,
+        Index("ix_tasks_version", tasks.c.version),
+        Index("ix_task_comments_version", comments.c.version),
+        Index("ix_task_tombstones_version", tombstones.c.version),
+    )
+
+
+def _change_version_counter(conn: Connection):
+    # SQLite only: the high-water mark of change versions (see app/db/change_versions.py), kept
+    # by triggers on the versioned tables so deleting rows never lowers it
+    if conn.dialect.name != "sqlite":
+        return
+    conn.execute(text("CREATE TABLE IF NOT EXISTS change_version (value BIGINT NOT NULL)"))
+    if conn.execute(text("SELECT count(*) FROM change_version")).scalar() == 0:
+        conn.execute(text(
+            "INSERT INTO change_version (value) SELECT max("
+            "coalesce((SELECT max(version) FROM tasks), 0), "
+            "coalesce((SELECT max(version) FROM task_comments), 0), "
+            "coalesce((SELECT max(version) FROM task_tombstones), 0))"
+        ))
+    bump = "BEGIN UPDATE change_version SET value = max(value, coalesce(NEW.version, 0)); END"
+    for table in ("tasks", "task_comments", "task_tombstones"):
+        conn.execute(text(f"CREATE TRIGGER IF NOT EXISTS {table}_version_insert AFTER INSERT ON {table} {bump}"))
+        conn.execute(text(f"CREATE TRIGGER IF NOT EXISTS {table}_version_update AFTER UPDATE OF version ON {table} {bump}"))
+
+
+def _member_roles(conn: Connection):
+    # Roles are enforced since this version. Membership rows stored before carry the old column
+    # default (viewer), which can't be told apart from a viewer role set on purpose, so only the
+    # owners' own rows are corrected. Members who should keep editing need the editor role
+    # again: PUT /projects/{project_id}/members/{user_id}/role by the owner.
+    conn.execute(text(
+        "UPDATE project_members SET role = 'owner' WHERE role = 'viewer' AND user_id = "
+        "(SELECT owner_id FROM projects WHERE projects.id = project_members.project_id)"
+    ))
+
+
+MIGRATIONS = [
+    (1, "baseline schema", _baseline),
+    (2, "indexes for task queries and project membership", _task_query_indexes),
+    (3, "full-text search vector for tasks", _task_search_vector),
+    (4, "reminder delivery timestamp for tasks", _task_reminder_sent_at),
+    (5, "change versions and tombstones for delta sync", _change_versions),
+    (6, "change version counter on SQLite", _change_version_counter),
+    (7, "owner role for the owners' membership rows", _member_roles),
+]
+
+
+# Indexes of a migration are spelled out there, the models may change them later
+def _create_indexes(conn: Connection, *indexes: Index):
+    for index in indexes:
+        index.create(bind=conn, checkfirst=True)
+
+
+def add_column_if_missing(conn: Connection, table_name: str, column: Column):
+    # Helper for migrations that add columns; on fresh databases the baseline already created them
+    existing = {c["name"] for c in inspect(conn).get_columns(table_name)}
+    if column.name in existing:
+        return
+    column_type = column.type.compile(dialect=conn.dialect)
+    ddl = f"ALTER TABLE {table_name} ADD COLUMN {column.name} {column_type}"
+    if column.server_default is not None:
+        ddl += f" DEFAULT {column.server_default.arg}"
+    conn.execute(text(ddl))
+
+
+def current_version(conn: Connection) -> int:
+    _migration_metadata.create_all(bind=conn)
+    version = conn.execute(text("SELECT MAX(version) FROM schema_migrations")).scalar()
+    return version or 0
+
+
+def run_migrations(engine: Engine):
+    with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            conn.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": _ADVISORY_LOCK_ID})
+
+        applied = current_version(conn)
+        for version, description, migrate in MIGRATIONS:
+            if version <= applied:
+                continue
+            logger.info("Applying migration %s: %s", version, description)
+            migrate(conn)
+            conn.execute(schema_migrations.insert().values(
+                version=version,
+                description=description,
+                applied_at=datetime.now(timezone.utc),
+            ))
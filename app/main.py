@@ -1,13 +1,26 @@
-from fastapi import FastAPI
+import time
+
+from fastapi import FastAPI, Request
+from starlette.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from app.db.database import Base, engine
-from app.api import auth_api, user_api, project_api, board_api, task_api
-from app.core.websocket import websocket_endpoint
+from app.db.database import engine, dispose_async_engine, replica_engines, pin_reads_to_primary
+from app.db.migrations import run_migrations
+from app.api import auth_api, user_api, project_api, board_api, task_api, task_bulk_api, project_api_async, task_api_async, metrics_api
+from app.core.config import settings
+from app.core.websocket import websocket_endpoint, close_subscriber
+from app.core.security import shutdown_hash_executor
+from app.core.events import event_publisher
+from app.core import request_metrics
 
 #Base.metadata.drop_all(bind=engine) # clear database
-Base.metadata.create_all(bind=engine)
+# Versioned migrations replace the former Base.metadata.create_all (see app/db/migrations.py)
+run_migrations(engine)
 
 app = FastAPI(title="Todo API")
+app.add_event_handler("shutdown", shutdown_hash_executor)
+app.add_event_handler("shutdown", close_subscriber)
+app.add_event_handler("shutdown", event_publisher.flush)
+app.add_event_handler("shutdown", dispose_async_engine)
 
 # CORS (für Frontend-Zugriff)
 app.add_middleware(
@@ -16,14 +29,47 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count", "ETag"],
 )
 
+# Read-your-writes: after a successful write the client reads from the primary for a while
+@app.middleware("http")
+async def pin_reads_after_writes(request: Request, call_next):
+    response = await call_next(request)
+    if replica_engines and request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+        await run_in_threadpool(pin_reads_to_primary, request)
+    return response
+
+# Per-route latency, SQL statements and task events (see app/core/request_metrics.py).
+# Registered last so it is the outermost middleware; streamed bodies are not included in the time.
+if settings.REQUEST_METRICS:
+    @app.middleware("http")
+    async def record_request_metrics(request: Request, call_next):
+        stats, token = request_metrics.start_request()
+        started = time.perf_counter()
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            route = request.scope.get("route")
+            request_metrics.finish_request(stats, token, request.method, getattr(route, "path", None), status,
+                                           time.perf_counter() - started)
+
 # register api routes
+app.include_router(task_bulk_api.router, prefix="/tasks/bulk", tags=["Tasks"])
+# In async mode the hot task/project routes are served by the async routers, registered first
+# so they take precedence over the sync routes with the same path
+if settings.DB_ASYNC:
+    app.include_router(project_api_async.router, prefix="/projects", tags=["Projects"])
+    app.include_router(task_api_async.router, prefix="/tasks", tags=["Tasks"])
 app.include_router(auth_api.router, prefix="/auth", tags=["Auth"])
 app.include_router(user_api.router, prefix="/users", tags=["Users"])
 app.include_router(project_api.router, prefix="/projects", tags=["Projects"])
 app.include_router(board_api.router, prefix="/boards", tags=["Boards"])
 app.include_router(task_api.router, prefix="/tasks", tags=["Tasks"])
+app.include_router(metrics_api.router)
 
 # webSocket endpoint
 app.add_api_websocket_route("/ws/{user_id}/{project_id}", websocket_endpoint)
@@ -1,10 +1,8 @@
-# NOTE: The current implementation only supports adding/removing users as members.
-# Role-based access control (RBAC) with owner/editor/viewer roles is modeled,
-# but not yet enforced in route-level authorization.
-# TODO: Add permission checks in API endpoints based on member roles.
+# Projects and their members. Every member has a role (owner/editor/viewer), enforced by
+# app/services/permission_service.py; the project's owner_id always has the owner role.
 
 
-from sqlalchemy import Column, Integer, String, ForeignKey, Table
+from sqlalchemy import Column, Integer, String, ForeignKey, Table, Index
 from sqlalchemy.orm import relationship
 from app.db.database import Base
 from sqlalchemy import Enum as SQLAEnum
@@ -15,8 +13,11 @@ project_members = Table(
     "project_members", Base.metadata,
     Column("user_id", Integer, ForeignKey("users.id")),
     Column("project_id", Integer, ForeignKey("projects.id")),
-    # The RBAC system allows fine-grained permissions but is not yet enforced in route logic
-    Column("role", SQLAEnum(ProjectRole), default=ProjectRole.viewer)
+    # Enforced by permission_service; rows from before that kept the old default (see migration 7)
+    Column("role", SQLAEnum(ProjectRole), default=ProjectRole.viewer),
+    # Membership is looked up from both sides (user -> projects, project -> members)
+    Index("ix_project_members_user_project", "user_id", "project_id"),
+    Index("ix_project_members_project_user", "project_id", "user_id"),
 )
 
 class Project(Base):
@@ -1,9 +1,19 @@
 from datetime import datetime, timezone
-from sqlalchemy import Column, Integer, String, ForeignKey, Boolean, DateTime
-from sqlalchemy.orm import relationship
+from sqlalchemy import BigInteger, Column, Integer, String, ForeignKey, Boolean, DateTime, Index, false
+from sqlalchemy import Text
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 
+from app.db.change_versions import next_change_version
 from app.db.database import Base
 
+def _now():
+    return datetime.now(timezone.utc)
+
+# Change version of a row for delta sync (app/db/change_versions.py); 0 for rows written before
+def _version_column():
+    return Column(BigInteger, server_default="0", default=next_change_version(), onupdate=next_change_version())
+
 class Task(Base):
     __tablename__ = "tasks"
 
@@ -17,16 +27,61 @@ class Task(Base):
     priority = Column(String, default="medium")
     assigned_user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     created_at = Column(DateTime, default=datetime.now(timezone.utc))
+    # Set once the due reminder went out, reset when the due date changes or the task is reopened
+    reminder_sent_at = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime, nullable=True, default=_now, onupdate=_now)
+    version = _version_column()
     comments = relationship("TaskComment", back_populates="task", cascade="all, delete-orphan")
+    # Full-text search document (title, description, comments), maintained by search_service.
+    # Deferred so regular task loads don't fetch it; plain text column outside PostgreSQL.
+    search_vector = deferred(Column(TSVECTOR().with_variant(Text(), "sqlite")))
+
+    # Indexes follow the filter/sort patterns of query_tasks, get_tasks_due_today,
+    # get_tasks_by_board and the reminder scan (see app/db/migrations.py)
+    __table_args__ = (
+        Index("ix_tasks_project_completed_due", "project_id", "completed", "due_date"),
+        Index("ix_tasks_project_created", "project_id", "created_at"),
+        Index("ix_tasks_board_id", "board_id"),
+        Index("ix_tasks_assigned_completed", "assigned_user_id", "completed"),
+        # Delta sync reads the rows changed since a version
+        Index("ix_tasks_version", "version"),
+        # Partial index: only open tasks are ever looked up by due date
+        Index(
+            "ix_tasks_open_due_date", "due_date",
+            postgresql_where=completed == false(),
+            sqlite_where=completed == false(),
+        ),
+    )
 
 
 class TaskComment(Base):
     __tablename__ = "task_comments"
 
     id = Column(Integer, primary_key=True)
-    task_id = Column(Integer, ForeignKey("tasks.id", ondelete="CASCADE"))
+    task_id = Column(Integer, ForeignKey("tasks.id", ondelete="CASCADE"), index=True)
     task = relationship("Task", back_populates="comments")
     user_id = Column(Integer, ForeignKey("users.id"))
     content = Column(String)
     created_at = Column(DateTime, default=datetime.now(timezone.utc))
+    version = _version_column()
+
+    __table_args__ = (
+        Index("ix_task_comments_version", "version"),
+    )
+
+
+# A task that was deleted or moved to another project, so clients syncing project_id drop it.
+# Comments go with their task and get no tombstones of their own.
+class TaskTombstone(Base):
+    __tablename__ = "task_tombstones"
+
+    id = Column(Integer, primary_key=True)
+    project_id = Column(Integer, nullable=False)
+    task_id = Column(Integer, nullable=False)
+    removed_at = Column(DateTime, default=_now)
+    version = _version_column()
+
+    __table_args__ = (
+        Index("ix_task_tombstones_version", "version"),
+    )
 
@@ -3,5 +3,7 @@ from .project_schema import *
 from .task_schema import *
 from .board_schema import *
 from .auth_schema import *
+from .transfer_schema import *
+from .sync_schema import *
 
-__all__ = ["user_schema", "project_schema", "task_schema", "board_schema", "auth_schema"]
+__all__ = ["user_schema", "project_schema", "task_schema", "board_schema", "auth_schema", "transfer_schema", "sync_schema"]
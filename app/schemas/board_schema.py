@@ -14,3 +14,9 @@ class BoardOut(BoardCreate):
 
     class Config:
         from_attributes = True
+
+# Result of POST /boards/{board_id}/duplicate: the new board and the number of copied rows
+class BoardDuplicateResult(BaseModel):
+    board_id: int
+    tasks: int
+    comments: int
@@ -1,4 +1,5 @@
 from pydantic import BaseModel
+from app.models.enums_model import ProjectRole
 
 class ProjectCreate(BaseModel):
     name: str
@@ -11,3 +12,23 @@ class ProjectOut(ProjectCreate):
 
 class ProjectMemberAdd(BaseModel):
     user_id: int
+    # Members could edit tasks before roles were enforced, so editor stays the default
+    role: ProjectRole = ProjectRole.editor
+
+# Task counts of a project; the by_* maps are keyed by id/name, "none" for tasks without one
+class ProjectStats(BaseModel):
+    total: int
+    completed: int
+    open: int
+    overdue: int
+    by_board: dict[str, int]
+    by_priority: dict[str, int]
+    by_assignee: dict[str, int]
+
+# Result of POST /projects/{project_id}/duplicate: the new project and the number of copied rows
+class ProjectDuplicateResult(BaseModel):
+    project_id: int
+    members: int
+    boards: int
+    tasks: int
+    comments: int
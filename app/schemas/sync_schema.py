@@ -0,0 +1,23 @@
+# Delta sync (GET /projects/{project_id}/changes?since=<version>).
+# A client stores `version` of the response and passes it as `since` next time. Applying a
+# response: drop the deleted tasks (and their comments) first, then upsert tasks and comments.
+# Rows may be sent again by the next sync, upserting them is idempotent.
+
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel
+from app.schemas.task_schema import TaskCommentOut, TaskOut
+
+class TaskChange(TaskOut):
+    updated_at: Optional[datetime] = None
+    version: int
+
+class TaskCommentChange(TaskCommentOut):
+    task_id: int
+    version: int
+
+class ProjectChanges(BaseModel):
+    version: int
+    tasks: list[TaskChange]
+    comments: list[TaskCommentChange]
+    deleted_task_ids: list[int]
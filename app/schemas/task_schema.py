@@ -3,7 +3,7 @@
 
 from datetime import datetime
 from typing import Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, create_model
 
 class TaskCreate(BaseModel):
     title: str
@@ -29,4 +29,34 @@ class TaskCommentOut(BaseModel):
     created_at: datetime
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+# Bulk endpoints (/tasks/bulk): items are validated one by one, so a bad item
+# only fails itself and is reported in the per-item results
+class TaskBulkUpdate(BaseModel):
+    id: int
+    fields: dict
+
+# The fields an item may change: those of TaskCreate and completed, typed as in TaskCreate.
+# Only the fields sent are set (model_dump(exclude_unset=True)); unknown fields fail the item.
+TaskFieldsUpdate = create_model(
+    "TaskFieldsUpdate",
+    __config__=ConfigDict(extra="forbid"),
+    completed=(bool, None),
+    **{name: (field.annotation, None) for name, field in TaskCreate.model_fields.items()},
+)
+
+class TaskBulkMove(BaseModel):
+    task_ids: list[int]
+    board_id: Optional[int] = None
+
+class BulkItemResult(BaseModel):
+    index: int
+    id: Optional[int] = None
+    ok: bool
+    detail: Optional[str] = None
+
+class BulkResult(BaseModel):
+    succeeded: int
+    failed: int
+    results: list[BulkItemResult]
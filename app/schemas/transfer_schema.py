@@ -0,0 +1,56 @@
+# Lines of the NDJSON project export/import format (one JSON object per line, told apart by `type`).
+# A file starts with the project line, followed by members, boards, then every task directly
+# followed by its comments. Ids are those of the exporting database; user ids refer to its users.
+
+from datetime import datetime
+from typing import Annotated, Literal, Optional, Union
+from pydantic import BaseModel, Field, TypeAdapter
+from app.models.enums_model import ProjectRole
+
+EXPORT_FORMAT_VERSION = 1
+
+class ProjectLine(BaseModel):
+    type: Literal["project"] = "project"
+    version: int = EXPORT_FORMAT_VERSION
+    name: str
+
+class MemberLine(BaseModel):
+    type: Literal["member"] = "member"
+    user_id: int
+    role: ProjectRole
+
+class BoardLine(BaseModel):
+    type: Literal["board"] = "board"
+    id: int
+    name: str
+    created_at: Optional[datetime] = None
+
+class TaskLine(BaseModel):
+    type: Literal["task"] = "task"
+    id: int
+    title: str
+    description: Optional[str] = None
+    due_date: Optional[datetime] = None
+    completed: bool = False
+    board_id: Optional[int] = None
+    priority: Optional[str] = "medium"
+    assigned_user_id: Optional[int] = None
+    created_at: Optional[datetime] = None
+
+class CommentLine(BaseModel):
+    type: Literal["comment"] = "comment"
+    task_id: int
+    user_id: Optional[int] = None
+    content: str
+    created_at: Optional[datetime] = None
+
+TRANSFER_LINE = TypeAdapter(Annotated[
+    Union[ProjectLine, MemberLine, BoardLine, TaskLine, CommentLine], Field(discriminator="type")
+])
+
+class ProjectImportResult(BaseModel):
+    project_id: int
+    members: int
+    boards: int
+    tasks: int
+    comments: int
@@ -2,46 +2,120 @@
 # This could be added using libraries such as PyOTP and QR code generation (e.g. using qrcode).
 # 2FA tokens would be verified during login alongside the password.
 
-from typing import Type
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from starlette.concurrency import run_in_threadpool
 from jose import jwt, JWTError
-from sqlalchemy.orm import Session, joinedload
-from app.db.database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, selectinload
+from app.db.database import get_db, get_async_db
 from app.models.user_model import User
 from app.core.config import settings
-from app.core.security import verify_password, hash_password, create_access_token
+from app.core.security import (
+    verify_password_async, hash_password_async, create_access_token, PasswordHashingBusy
+)
+from app.core.principal_cache import Principal, principal_cache
 from app.schemas.user_schema import UserCreate
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token", auto_error=False)
 
 # Decodes the JWT and retrieves the current authenticated user.
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> Type[User]:
+# Verified tokens are cached as a Principal (id, role, project ids) so repeated
+# requests with the same token skip the joined user/membership query.
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> Principal:
+    username, payload = _decode_token(token)
+    principal = principal_cache.get(token)
+    if principal is not None and principal.username == username:
+        return principal
+
+    user = db.query(User).options(joinedload(User.projects)).filter(User.username == username).first()
+    return _cache_principal(token, payload, user)
+
+# Same as get_current_user for the async routes (DB_ASYNC), a cache miss is loaded via the AsyncSession
+async def get_current_user_async(token: str = Depends(oauth2_scheme),
+                                 db: AsyncSession = Depends(get_async_db)) -> Principal:
+    username, payload = _decode_token(token)
+    principal = principal_cache.get(token)
+    if principal is not None and principal.username == username:
+        return principal
+
+    result = await db.execute(select(User).options(selectinload(User.projects)).where(User.username == username))
+    return _cache_principal(token, payload, result.scalars().first())
+
+# The caller of a list route with scope=mine (see task_service.visible_to). With scope=all the
+# token is not looked at, so a list that works anonymously doesn't fail on an expired token.
+def get_scope_user(scope: str = "all", token: str | None = Depends(optional_oauth2_scheme),
+                   db: Session = Depends(get_db)) -> Principal | None:
+    if scope != "mine" or token is None:
+        return None
+    return get_current_user(token, db)
+
+async def get_scope_user_async(scope: str = "all", token: str | None = Depends(optional_oauth2_scheme),
+                               db: AsyncSession = Depends(get_async_db)) -> Principal | None:
+    if scope != "mine" or token is None:
+        return None
+    return await get_current_user_async(token, db)
+
+def _decode_token(token: str) -> tuple[str, dict]:
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise HTTPException(status_code=401, detail="Invalid token")
-        user = db.query(User).options(joinedload(User.projects)).filter(User.username == username).first()
-        if user is None:
-            raise HTTPException(status_code=401, detail="User not found")
-        return user
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-def register_user(user: UserCreate, db: Session):
-    if db.query(User).filter(User.username == user.username).first():
+    username: str = payload.get("sub")
+    if username is None:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    return username, payload
+
+def _cache_principal(token: str, payload: dict, user: User | None) -> Principal:
+    if user is None:
+        raise HTTPException(status_code=401, detail="User not found")
+
+    principal = Principal(
+        id=user.id,
+        username=user.username,
+        role=user.role,
+        project_ids=frozenset(p.id for p in user.projects),
+    )
+    principal_cache.set(token, principal, payload.get("exp"))
+    return principal
+
+# Registration and login are async: database access runs on the regular thread pool,
+# bcrypt runs on the dedicated hashing executor. When that executor is saturated
+# the request is rejected with 503 instead of stalling the server.
+async def register_user(user: UserCreate, db: Session):
+    if await run_in_threadpool(_get_user_by_username, db, user.username):
         raise HTTPException(status_code=400, detail="Username already exists")
-    hashed_pw = hash_password(user.password)
+    hashed_pw = await _hash_or_reject(user.password)
     new_user = User(username=user.username, hashed_password=hashed_pw, role=user.role)
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await run_in_threadpool(_save_user, db, new_user)
     return {"username": new_user.username, "role": new_user.role}
 
-def login_user(form_data: OAuth2PasswordRequestForm, db: Session):
-    user = db.query(User).filter(User.username == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+async def login_user(form_data: OAuth2PasswordRequestForm, db: Session):
+    user = await run_in_threadpool(_get_user_by_username, db, form_data.username)
+    if not user or not await _verify_or_reject(form_data.password, user.hashed_password):
         raise HTTPException(status_code=400, detail="Invalid credentials")
     token = create_access_token({"sub": user.username, "role": user.role})
     return {"access_token": token, "token_type": "bearer"}
+
+def _get_user_by_username(db: Session, username: str) -> User | None:
+    return db.query(User).filter(User.username == username).first()
+
+def _save_user(db: Session, user: User):
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+
+async def _hash_or_reject(password: str) -> str:
+    try:
+        return await hash_password_async(password)
+    except PasswordHashingBusy:
+        raise HTTPException(status_code=503, detail="Server busy, please retry", headers={"Retry-After": "1"})
+
+async def _verify_or_reject(password: str, hashed_password: str) -> bool:
+    try:
+        return await verify_password_async(password, hashed_password)
+    except PasswordHashingBusy:
+        raise HTTPException(status_code=503, detail="Server busy, please retry", headers={"Retry-After": "1"})
@@ -0,0 +1,134 @@
+# Central project authorization.
+# A user's role in a project is resolved with one indexed lookup (project primary key plus
+# the (user_id, project_id) index of project_members) instead of loading project.members.
+# The project owner always has the owner role; members have the role stored on their
+# membership row. Roles are ordered viewer < editor < owner:
+#   viewer - read the project, its boards, tasks and comments
+#   editor - create, change and delete tasks, comment, rename boards
+#   owner  - manage members and roles, delete the project
+# Resolved roles are memoized in Session.info, i.e. for the duration of one request.
+
+from fastapi import HTTPException
+from sqlalchemy import and_, exists, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.core.principal_cache import Principal
+from app.models.enums_model import ProjectRole
+from app.models.project_model import Project, project_members
+
+ROLE_LEVELS = {ProjectRole.viewer: 1, ProjectRole.editor: 2, ProjectRole.owner: 3}
+
+# Session.info key of the per-request memo: (user_id, project_id) -> role or None
+_MEMO_KEY = "project_roles"
+
+def _roles_statement(user_id: int, project_ids):
+    return (
+        select(Project.id, Project.owner_id, project_members.c.role)
+        .outerjoin(project_members, and_(
+            project_members.c.project_id == Project.id,
+            project_members.c.user_id == user_id,
+        ))
+        .where(Project.id.in_(project_ids))
+    )
+
+def _collect(rows, user_id: int, project_ids, memo: dict) -> dict[int, ProjectRole | None]:
+    roles: dict[int, ProjectRole | None] = dict.fromkeys(project_ids)
+    for project_id, owner_id, role in rows:
+        if owner_id == user_id:
+            role = ProjectRole.owner
+        if role is not None and (roles[project_id] is None or ROLE_LEVELS[role] > ROLE_LEVELS[roles[project_id]]):
+            roles[project_id] = role
+    for project_id, role in roles.items():
+        memo[(user_id, project_id)] = role
+    return roles
+
+def _split_memo(db, user_id: int, project_ids) -> tuple[dict, dict, list[int]]:
+    memo = db.info.setdefault(_MEMO_KEY, {})
+    known, missing = {}, []
+    for project_id in set(project_ids):
+        if (user_id, project_id) in memo:
+            known[project_id] = memo[(user_id, project_id)]
+        else:
+            missing.append(project_id)
+    return memo, known, missing
+
+# Roles of a user in several projects with one query. None: no access or no such project.
+def project_roles(db: Session, user_id: int, project_ids) -> dict[int, ProjectRole | None]:
+    memo, known, missing = _split_memo(db, user_id, project_ids)
+    if missing:
+        known.update(_collect(db.execute(_roles_statement(user_id, missing)), user_id, missing, memo))
+    return known
+
+def project_role(db: Session, user_id: int, project_id: int) -> ProjectRole | None:
+    return project_roles(db, user_id, [project_id])[project_id]
+
+async def project_roles_async(db: AsyncSession, user_id: int, project_ids) -> dict[int, ProjectRole | None]:
+    memo, known, missing = _split_memo(db, user_id, project_ids)
+    if missing:
+        rows = await db.execute(_roles_statement(user_id, missing))
+        known.update(_collect(rows, user_id, missing, memo))
+    return known
+
+async def project_role_async(db: AsyncSession, user_id: int, project_id: int) -> ProjectRole | None:
+    return (await project_roles_async(db, user_id, [project_id]))[project_id]
+
+def at_least(role: ProjectRole | None, minimum: ProjectRole) -> bool:
+    return role is not None and ROLE_LEVELS[role] >= ROLE_LEVELS[minimum]
+
+# Membership itself is known from the principal, so read access needs no query
+def _known_viewer(user: Principal, project_id: int, minimum: ProjectRole) -> bool:
+    return minimum == ProjectRole.viewer and project_id in user.project_ids
+
+def has_role(db: Session, user: Principal, project_id: int, minimum: ProjectRole) -> bool:
+    return _known_viewer(user, project_id, minimum) or at_least(project_role(db, user.id, project_id), minimum)
+
+async def has_role_async(db: AsyncSession, user: Principal, project_id: int, minimum: ProjectRole) -> bool:
+    if _known_viewer(user, project_id, minimum):
+        return True
+    return at_least(await project_role_async(db, user.id, project_id), minimum)
+
+def require_role(db: Session, user: Principal, project_id: int, minimum: ProjectRole,
+                 detail: str = "No access to this project"):
+    if not has_role(db, user, project_id, minimum):
+        raise HTTPException(status_code=403, detail=detail)
+
+# Projects among project_ids in which the user has at least the given role
+def projects_with_role(db: Session, user: Principal, project_ids, minimum: ProjectRole) -> set[int]:
+    return {
+        project_id for project_id, role in project_roles(db, user.id, project_ids).items()
+        if at_least(role, minimum)
+    }
+
+# The assignee of a task may edit it even without editor rights in the project
+def _assignee_allowed(task, user: Principal, minimum: ProjectRole) -> bool:
+    return task.assigned_user_id == user.id and ROLE_LEVELS[minimum] <= ROLE_LEVELS[ProjectRole.editor]
+
+def can_access_task(db: Session, user: Principal, task, minimum: ProjectRole) -> bool:
+    return _assignee_allowed(task, user, minimum) or has_role(db, user, task.project_id, minimum)
+
+async def can_access_task_async(db: AsyncSession, user: Principal, task, minimum: ProjectRole) -> bool:
+    return _assignee_allowed(task, user, minimum) or await has_role_async(db, user, task.project_id, minimum)
+
+# SQL counterparts of has_role/can_access_task for writes that check access in the statement
+# itself (UPDATE/INSERT ... WHERE <clause>), see the mutation section of task_service.
+# project_id is the column (or value) holding the project of the written row.
+def project_access_clause(user_id: int, project_id, minimum: ProjectRole):
+    roles = [role for role, level in ROLE_LEVELS.items() if level >= ROLE_LEVELS[minimum]]
+    return or_(
+        exists().where(Project.id == project_id, Project.owner_id == user_id),
+        exists().where(
+            project_members.c.project_id == project_id,
+            project_members.c.user_id == user_id,
+            project_members.c.role.in_(roles),
+        ),
+    )
+
+def task_access_clause(user: Principal, task, minimum: ProjectRole = ProjectRole.editor):
+    clause = project_access_clause(user.id, task.project_id, minimum)
+    if ROLE_LEVELS[minimum] <= ROLE_LEVELS[ProjectRole.editor]:
+        clause = or_(task.assigned_user_id == user.id, clause)
+    return clause
+
+# Drops memoized roles after memberships or roles were changed within the request
+def forget(db: Session | AsyncSession):
+    db.info.pop(_MEMO_KEY, None)
@@ -0,0 +1,160 @@
+# Server-side duplication of whole boards and projects (templates).
+# Rows are copied with INSERT ... SELECT inside one transaction, so the number of statements
+# doesn't depend on the size of the copy. Old ids are mapped to new ones in the database: the
+# new ids are allocated up front into a temporary old_id -> new_id table, which the copies of
+# tasks (and their boards and comments) are then joined against.
+# Copied tasks keep their state, board, priority and assignee; they get a new created_at and
+# no reminder_sent_at. Comments are copied with their author and date when requested.
+
+from datetime import datetime, timezone
+
+from fastapi import HTTPException
+from sqlalchemy import Column, Integer, MetaData, Table, case, delete, func, insert, literal, select
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateTable
+
+from app.core.config import settings
+from app.core.principal_cache import Principal, principal_cache
+from app.core import events, http_cache
+from app.core.events import event_publisher
+from app.models import Board, Project, ProjectRole, project_members
+from app.models.task_model import Task, TaskComment
+from app.services import permission_service, reminders_service, search_service, stats_service
+
+# Temporary tables live per connection and are created on first use. Their rows are removed
+# before each copy commits (and with the transaction if it fails).
+_id_maps = MetaData()
+
+def _id_map(name: str) -> Table:
+    return Table(
+        name, _id_maps,
+        Column("old_id", Integer, primary_key=True, autoincrement=False),
+        Column("new_id", Integer, nullable=False),
+        prefixes=["TEMPORARY"],
+    )
+
+_BOARD_IDS = _id_map("copied_board_ids")
+_TASK_IDS = _id_map("copied_task_ids")
+
+_TASK_FIELDS = ("title", "description", "due_date", "completed", "priority", "assigned_user_id")
+
+# Copies a project with its boards, tasks (optionally comments) and members into a new project
+# owned by the caller. Reading the project is enough, as for an export; the previous owner
+# becomes an editor of the copy.
+def duplicate_project(project_id: int, db: Session, user: Principal, name: str | None = None,
+                      include_comments: bool = False) -> dict:
+    project = db.get(Project, project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    permission_service.require_role(db, user, project_id, ProjectRole.viewer, "Access denied")
+
+    now = datetime.now(timezone.utc)
+    # The first write of the transaction, on SQLite it takes the write lock before ids are allocated
+    new_project_id = db.scalar(
+        insert(Project).values(name=name or f"{project.name} (Copy)", owner_id=user.id).returning(Project.id)
+    )
+    db.execute(insert(project_members).values(user_id=user.id, project_id=new_project_id, role=ProjectRole.owner))
+    member_ids = db.scalars(
+        insert(project_members).from_select(
+            ["user_id", "project_id", "role"],
+            select(
+                project_members.c.user_id,
+                literal(new_project_id),
+                case((project_members.c.role == ProjectRole.owner, literal(ProjectRole.editor, project_members.c.role.type)),
+                     else_=project_members.c.role),
+            ).where(project_members.c.project_id == project_id, project_members.c.user_id != user.id),
+        ).returning(project_members.c.user_id)
+    ).all()
+
+    _create_id_maps(db)
+    boards = _map_ids(db, _BOARD_IDS, Board, Board.project_id == project_id)
+    db.execute(insert(Board).from_select(
+        ["id", "name", "project_id", "created_at"],
+        select(_BOARD_IDS.c.new_id, Board.name, literal(new_project_id), literal(now, Board.created_at.type))
+        .select_from(Board).join(_BOARD_IDS, _BOARD_IDS.c.old_id == Board.id),
+    ))
+    board_id = select(_BOARD_IDS.c.new_id).where(_BOARD_IDS.c.old_id == Task.board_id).scalar_subquery()
+    tasks, comments = _copy_tasks(db, Task.project_id == project_id, new_project_id, board_id, now, include_comments)
+    _finish(db, Task.project_id == new_project_id)
+
+    http_cache.bump_project_versions([new_project_id])
+    principal_cache.invalidate_users([user.id, *member_ids])
+    return {"project_id": new_project_id, "members": len(member_ids), "boards": boards,
+            "tasks": tasks, "comments": comments}
+
+# Copies a board with its tasks (optionally comments) within its project; needs the editor role.
+# Clients of the project receive a task.created event per copied task.
+def duplicate_board(board_id: int, db: Session, user: Principal, name: str | None = None,
+                    include_comments: bool = False) -> dict:
+    board = db.get(Board, board_id)
+    if not board:
+        raise HTTPException(status_code=404, detail="Board not found")
+    permission_service.require_role(db, user, board.project_id, ProjectRole.editor, "Access denied")
+
+    now = datetime.now(timezone.utc)
+    new_board_id = db.scalar(
+        insert(Board).values(name=name or f"{board.name} (Copy)", project_id=board.project_id, created_at=now)
+        .returning(Board.id)
+    )
+    _create_id_maps(db)
+    tasks, comments = _copy_tasks(db, Task.board_id == board_id, board.project_id, literal(new_board_id), now,
+                                  include_comments)
+    copies = Task.board_id == new_board_id
+    _finish(db, copies)
+
+    for partition in _stream(db, select(*(getattr(Task, field) for field in events.TASK_EVENT_FIELDS)).where(copies)):
+        event_publisher.emit_many([
+            (events.TASK_CREATED, task.project_id, task.id, events.task_snapshot(task)) for task in partition
+        ])
+    http_cache.bump_project_versions([board.project_id])
+    # The project's counters are recounted on the next read instead of replaying every copy
+    stats_service.forget_project(board.project_id)
+    return {"board_id": new_board_id, "tasks": tasks, "comments": comments}
+
+def _create_id_maps(db: Session):
+    for table in (_BOARD_IDS, _TASK_IDS):
+        db.execute(CreateTable(table, if_not_exists=True))
+
+# Allocates a new id for every row of model matching where; returns the number of rows
+def _map_ids(db: Session, id_map: Table, model, where) -> int:
+    if db.get_bind().dialect.name == "postgresql":
+        new_id = func.nextval(func.pg_get_serial_sequence(model.__tablename__, "id"))
+    else:
+        # SQLite serializes writers and the copy already wrote, so no other insert can take these ids
+        new_id = select(func.coalesce(func.max(model.id), 0)).scalar_subquery() + func.row_number().over(order_by=model.id)
+    return db.execute(insert(id_map).from_select(["old_id", "new_id"], select(model.id, new_id).where(where))).rowcount
+
+def _copy_tasks(db: Session, where, project_id: int, board_id, now: datetime, include_comments: bool) -> tuple[int, int]:
+    tasks = _map_ids(db, _TASK_IDS, Task, where)
+    db.execute(insert(Task).from_select(
+        ["id", *_TASK_FIELDS, "project_id", "board_id", "created_at"],
+        select(_TASK_IDS.c.new_id, *(getattr(Task, field) for field in _TASK_FIELDS), literal(project_id), board_id,
+               literal(now, Task.created_at.type))
+        .select_from(Task).join(_TASK_IDS, _TASK_IDS.c.old_id == Task.id),
+    ))
+    comments = 0
+    if include_comments:
+        comments = db.execute(insert(TaskComment).from_select(
+            ["task_id", "user_id", "content", "created_at"],
+            select(_TASK_IDS.c.new_id, TaskComment.user_id, TaskComment.content, TaskComment.created_at)
+            .select_from(TaskComment).join(_TASK_IDS, _TASK_IDS.c.old_id == TaskComment.task_id),
+        )).rowcount
+    return tasks, comments
+
+# Indexes the copied tasks for search, commits and adds their reminders
+def _finish(db: Session, copies):
+    task_ids = db.scalars(select(_TASK_IDS.c.new_id)).all()
+    for start in range(0, len(task_ids), settings.PROJECT_TRANSFER_BATCH_SIZE):
+        search_service.index_tasks(db, task_ids[start:start + settings.PROJECT_TRANSFER_BATCH_SIZE])
+    db.execute(delete(_TASK_IDS))
+    db.execute(delete(_BOARD_IDS))
+    db.commit()
+
+    due = select(Task.id, Task.completed, Task.due_date, Task.reminder_sent_at).where(
+        copies, Task.completed == False, Task.due_date.is_not(None)
+    )
+    for partition in _stream(db, due):
+        reminders_service.schedule_task_reminders(partition)
+
+def _stream(db: Session, statement):
+    return db.execute(statement.execution_options(yield_per=settings.PROJECT_TRANSFER_BATCH_SIZE)).partitions()
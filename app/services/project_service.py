@@ -6,32 +6,47 @@
 from typing import Type
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
-from app.models.project_model import Project
+from app.models.project_model import Project, project_members
+from app.models.enums_model import ProjectRole
 from app.models.user_model import User
 from app.schemas.project_schema import ProjectCreate, ProjectMemberAdd
+from app.core.principal_cache import Principal, principal_cache
+from app.core import http_cache
+from app.services import permission_service
 
-def create_project(project: ProjectCreate, db: Session, user: User) -> Project:
+def create_project(project: ProjectCreate, db: Session, user: Principal) -> Project:
     db_project = Project(name=project.name, owner_id=user.id)
-    db_project.members.append(user)
     db.add(db_project)
+    db.flush()
+    db.execute(project_members.insert().values(user_id=user.id, project_id=db_project.id, role=ProjectRole.owner))
     db.commit()
     db.refresh(db_project)
+    http_cache.bump_project_versions([db_project.id])
+    principal_cache.invalidate_user(user.id)
     return db_project
 
 def get_all_projects(db: Session) -> list[Type[Project]]:
     return db.query(Project).all()
 
-# Adds a user to the project. Prevents duplicates and checks existence of user and project.
-def add_member(project_id: int, member: ProjectMemberAdd, db: Session, user: User):
-    project = db.query(Project).filter(Project.id == project_id).first()
-    target_user = db.query(User).filter(User.id == member.user_id).first()
+# Adds a user to the project with the given role (only the owner may do this).
+# Prevents duplicates and checks existence of user and project.
+def add_member(project_id: int, member: ProjectMemberAdd, db: Session, user: Principal):
+    project = db.get(Project, project_id)
+    target_user = db.get(User, member.user_id)
 
     if not project or not target_user:
         raise HTTPException(status_code=404, detail="Project or user not found")
 
-    if target_user in project.members:
+    permission_service.require_role(db, user, project_id, ProjectRole.owner, "Only the owner can add members")
+    if member.role == ProjectRole.owner:
+        raise HTTPException(status_code=400, detail="A project has exactly one owner")
+
+    if permission_service.project_role(db, target_user.id, project_id) is not None:
         return {"detail": "User already a member"}
 
-    project.members.append(target_user)
+    db.execute(project_members.insert().values(user_id=target_user.id, project_id=project_id, role=member.role))
     db.commit()
+    permission_service.forget(db)
+    http_cache.bump_project_versions([project_id])
+    principal_cache.invalidate_user(target_user.id)
     return {"detail": "User added to project"}
@@ -0,0 +1,303 @@
+# Streaming export and import of whole projects as NDJSON (format: app/schemas/transfer_schema.py).
+# Export reads tasks and comments through server-side cursors (yield_per) and merges the two
+# id-ordered streams, so every task is directly followed by its comments. Import parses the
+# request body line by line and writes PROJECT_TRANSFER_BATCH_SIZE lines per transaction.
+# Neither side holds more than one batch in memory, whatever the size of the project.
+
+from datetime import datetime, timezone
+from typing import AsyncIterator, Iterator
+
+import orjson
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.principal_cache import Principal, principal_cache
+from app.core import http_cache
+from app.db.database import SessionLocal
+from app.models import Board, Project, ProjectRole, User, project_members
+from app.models.task_model import Task, TaskComment
+from app.schemas.transfer_schema import (
+    EXPORT_FORMAT_VERSION, TRANSFER_LINE, BoardLine, CommentLine, MemberLine, ProjectLine, TaskLine,
+)
+from app.services import search_service, reminders_service, stats_service
+
+# A single line may not grow beyond this while the body is split into lines
+_MAX_LINE_BYTES = 1 << 20
+
+def _fields(line_schema) -> tuple[str, ...]:
+    return tuple(field for field in line_schema.model_fields if field != "type")
+
+_BOARD_FIELDS = _fields(BoardLine)
+_TASK_FIELDS = _fields(TaskLine)
+_COMMENT_FIELDS = _fields(CommentLine)
+
+def _line(line_type: str, fields: tuple[str, ...], row) -> bytes:
+    return orjson.dumps({"type": line_type, **dict(zip(fields, row))}) + b"\n"
+
+def _columns(model, fields: tuple[str, ...]) -> list:
+    return [getattr(model, field) for field in fields]
+
+# Generator for a StreamingResponse; access must be checked before. It opens its own session,
+# the request's session is already closed while the body is streamed.
+def export_project(project_id: int) -> Iterator[bytes]:
+    batch_size = settings.PROJECT_TRANSFER_BATCH_SIZE
+    with SessionLocal() as db:
+        project = db.get(Project, project_id)
+        chunk = [orjson.dumps({"type": "project", "version": EXPORT_FORMAT_VERSION, "name": project.name}) + b"\n"]
+        members = db.execute(
+            select(project_members.c.user_id, project_members.c.role)
+            .where(project_members.c.project_id == project_id)
+            .order_by(project_members.c.user_id)
+        )
+        chunk.extend(orjson.dumps({"type": "member", "user_id": user_id, "role": role.value}) + b"\n"
+                     for user_id, role in members)
+        boards = db.execute(select(*_columns(Board, _BOARD_FIELDS)).where(Board.project_id == project_id).order_by(Board.id))
+        chunk.extend(_line("board", _BOARD_FIELDS, row) for row in boards)
+
+        tasks = db.execute(
+            select(*_columns(Task, _TASK_FIELDS)).where(Task.project_id == project_id).order_by(Task.id)
+            .execution_options(yield_per=batch_size)
+        )
+        comments = db.execute(
+            select(*_columns(TaskComment, _COMMENT_FIELDS))
+            .where(TaskComment.task_id.in_(select(Task.id).where(Task.project_id == project_id)))
+            .order_by(TaskComment.task_id, TaskComment.id)
+            .execution_options(yield_per=batch_size)
+        )
+        comment = next(comments, None)
+        for task in tasks:
+            chunk.append(_line("task", _TASK_FIELDS, task))
+            while comment is not None and comment.task_id == task.id:
+                chunk.append(_line("comment", _COMMENT_FIELDS, comment))
+                comment = next(comments, None)
+            if len(chunk) >= batch_size:
+                yield b"".join(chunk)
+                chunk = []
+        yield b"".join(chunk)
+
+# Creates a new project owned by the caller from an NDJSON body (chunks of bytes).
+# Members, assignees and comment authors are matched by user id; unknown assignees are dropped
+# and comments of unknown users are attributed to the caller. The exporting owner becomes an editor.
+# If a line is invalid the request fails with 400 and everything imported so far is removed.
+async def import_project(chunks: AsyncIterator[bytes], user: Principal, name: str | None = None) -> dict:
+    importer = ProjectImport(user, name)
+    try:
+        async for line in _lines(chunks):
+            if importer.add(line):
+                await run_in_threadpool(importer.flush)
+        await run_in_threadpool(importer.finish)
+    except BaseException:
+        await run_in_threadpool(importer.discard)
+        raise
+    finally:
+        await run_in_threadpool(importer.close)
+    return importer.summary()
+
+async def _lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line
+        if len(buffer) > _MAX_LINE_BYTES:
+            raise HTTPException(status_code=413, detail=f"Lines are limited to {_MAX_LINE_BYTES} bytes")
+    if buffer:
+        yield buffer
+
+class ProjectImport:
+    def __init__(self, user: Principal, name: str | None):
+        # Written rows are not read back after each batch's commit
+        self.db: Session = SessionLocal(expire_on_commit=False)
+        self.user = user
+        self.name = name
+        self.project_id: int | None = None
+        self.line_number = 0
+        self.header: ProjectLine | None = None
+        # Lines waiting for the next flush
+        self.members: list[MemberLine] = []
+        self.boards: list[BoardLine] = []
+        self.tasks: list[TaskLine] = []
+        self.comments: list[CommentLine] = []
+        # Exported -> new ids. All boards are kept (a project has few); of the tasks only those of
+        # the current batch and the last one before, since comments directly follow their task.
+        self.board_ids: dict[int, int | None] = {}
+        self.task_ids: dict[int, int] = {}
+        self.current_task_id: int | None = None
+        self.added_members: set[int] = set()
+        self.counts = {"members": 0, "boards": 0, "tasks": 0, "comments": 0}
+
+    # Buffers one line; True when a batch is full and should be flushed
+    def add(self, raw: bytes) -> bool:
+        self.line_number += 1
+        if not raw.strip():
+            return False
+        try:
+            line = TRANSFER_LINE.validate_json(raw)
+        except ValidationError as e:
+            self._fail("; ".join(
+                f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+            ))
+
+        if isinstance(line, ProjectLine):
+            if self.header is not None:
+                self._fail("Duplicate project line")
+            if line.version > EXPORT_FORMAT_VERSION:
+                self._fail(f"Unsupported export version {line.version}")
+            self.header = line
+            return False
+        if self.header is None:
+            self._fail("The first line must be the project")
+
+        if isinstance(line, MemberLine):
+            self.members.append(line)
+        elif isinstance(line, BoardLine):
+            if line.id in self.board_ids:
+                self._fail(f"Duplicate board {line.id}")
+            self.board_ids[line.id] = None
+            self.boards.append(line)
+        elif isinstance(line, TaskLine):
+            if line.board_id is not None and line.board_id not in self.board_ids:
+                self._fail(f"Unknown board {line.board_id}")
+            self.current_task_id = line.id
+            self.tasks.append(line)
+        else:
+            if line.task_id != self.current_task_id:
+                self._fail("Comments must directly follow their task")
+            self.comments.append(line)
+        return len(self.members) + len(self.boards) + len(self.tasks) + len(self.comments) >= \
+            settings.PROJECT_TRANSFER_BATCH_SIZE
+
+    def _fail(self, detail: str):
+        raise HTTPException(status_code=400, detail=f"Line {self.line_number}: {detail}")
+
+    # Writes the buffered lines in one transaction
+    def flush(self):
+        db = self.db
+        if self.project_id is None:
+            project = Project(name=self.name or self.header.name, owner_id=self.user.id)
+            db.add(project)
+            db.flush()
+            self.project_id = project.id
+            db.execute(insert(project_members).values(user_id=self.user.id, project_id=project.id, role=ProjectRole.owner))
+            self.added_members.add(self.user.id)
+
+        self._write_members()
+        self._write_boards()
+        created = self._write_tasks()
+        self._write_comments()
+        search_service.index_tasks(db, list(self.task_ids.values()))
+        # Only the last task may still get comments in the next batch
+        self.task_ids = {self.current_task_id: self.task_ids[self.current_task_id]} if self.task_ids else {}
+        db.commit()
+        reminders_service.schedule_task_reminders(created)
+        stats_service.record((None, stats_service.snapshot(task)) for task in created)
+        # Nothing written so far is needed again, keep the identity map from growing
+        db.expunge_all()
+
+    def _existing_users(self, user_ids) -> set[int]:
+        user_ids = {user_id for user_id in user_ids if user_id is not None}
+        if not user_ids:
+            return set()
+        return set(self.db.scalars(select(User.id).where(User.id.in_(user_ids))))
+
+    def _write_members(self):
+        if not self.members:
+            return
+        existing = self._existing_users(member.user_id for member in self.members) - self.added_members
+        rows = {}
+        for member in self.members:
+            if member.user_id in existing:
+                role = ProjectRole.editor if member.role == ProjectRole.owner else member.role
+                rows[member.user_id] = {"user_id": member.user_id, "project_id": self.project_id, "role": role}
+        if rows:
+            self.db.execute(insert(project_members), list(rows.values()))
+            self.added_members.update(rows)
+            self.counts["members"] += len(rows)
+        self.members = []
+
+    def _write_boards(self):
+        if not self.boards:
+            return
+        rows = [
+            {"name": board.name, "project_id": self.project_id, "created_at": board.created_at or datetime.now(timezone.utc)}
+            for board in self.boards
+        ]
+        new_ids = self.db.scalars(insert(Board).returning(Board.id, sort_by_parameter_order=True), rows).all()
+        for board, new_id in zip(self.boards, new_ids):
+            self.board_ids[board.id] = new_id
+        self.counts["boards"] += len(new_ids)
+        self.boards = []
+
+    def _write_tasks(self) -> list[Task]:
+        if not self.tasks:
+            return []
+        rows = []
+        for task in self.tasks:
+            row = task.model_dump(exclude={"type", "id", "created_at"})
+            row["project_id"] = self.project_id
+            row["board_id"] = self.board_ids[task.board_id] if task.board_id is not None else None
+            # User ids come from the file: only members of the imported project may be assigned
+            if task.assigned_user_id not in self.added_members:
+                row["assigned_user_id"] = None
+            row["created_at"] = task.created_at or datetime.now(timezone.utc)
+            rows.append(row)
+        created = self.db.scalars(insert(Task).returning(Task, sort_by_parameter_order=True), rows).all()
+        self.task_ids.update((task.id, new.id) for task, new in zip(self.tasks, created))
+        self.counts["tasks"] += len(created)
+        self.tasks = []
+        return created
+
+    def _write_comments(self):
+        if not self.comments:
+            return
+        # Comments of users who didn't become members are attributed to the importing user
+        rows = [
+            {
+                "task_id": self.task_ids[comment.task_id],
+                "user_id": comment.user_id if comment.user_id in self.added_members else self.user.id,
+                "content": comment.content,
+                "created_at": comment.created_at or datetime.now(timezone.utc),
+            }
+            for comment in self.comments
+        ]
+        self.db.execute(insert(TaskComment), rows)
+        self.counts["comments"] += len(rows)
+        self.comments = []
+
+    def finish(self):
+        if self.header is None:
+            raise HTTPException(status_code=400, detail="Empty import, the first line must be the project")
+        self.flush()
+        http_cache.bump_project_versions([self.project_id])
+        principal_cache.invalidate_users(list(self.added_members))
+
+    # Removes a partially imported project
+    def discard(self):
+        db = self.db
+        db.rollback()
+        if self.project_id is None:
+            return
+        task_ids = select(Task.id).where(Task.project_id == self.project_id)
+        for partition in db.scalars(task_ids.execution_options(yield_per=settings.PROJECT_TRANSFER_BATCH_SIZE)).partitions():
+            reminders_service.unschedule_task_reminders(list(partition))
+            for task_id in partition:
+                search_service.remove_task(task_id)
+        db.execute(delete(TaskComment).where(TaskComment.task_id.in_(task_ids)))
+        db.execute(delete(Task).where(Task.project_id == self.project_id))
+        db.execute(delete(Board).where(Board.project_id == self.project_id))
+        db.execute(delete(project_members).where(project_members.c.project_id == self.project_id))
+        db.execute(delete(Project).where(Project.id == self.project_id))
+        db.commit()
+        stats_service.forget_project(self.project_id)
+        principal_cache.invalidate_users(list(self.added_members))
+
+    def close(self):
+        self.db.close()
+
+    def summary(self) -> dict:
+        return {"project_id": self.project_id, **self.counts}
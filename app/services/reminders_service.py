@@ -1,38 +1,223 @@
 # This task currently pushes Redis messages for due tasks only.
 # TODO: Extend to send email reminders or push notifications in future iterations.
+# Reminders are scheduled incrementally: open tasks with a due date live in a Redis sorted
+# set scored by due time, maintained by task_service on create/update/toggle/delete.
+# A frequent beat tick pops only the entries that became due, publishes them and stores
+# reminder_sent_at, so each task is reminded once per due date. rebuild_reminder_index
+# re-adds open, not yet reminded tasks from the database (e.g. after Redis data loss).
 
-from celery import Celery
+import logging
+import math
+import time
+from celery import shared_task
 from datetime import datetime, timezone
+from sqlalchemy import func, select, update
 from sqlalchemy.orm import Session
 from app.db.database import SessionLocal
+from app.models.project_model import Project
 from app.models.task_model import Task
 from app.core.config import settings
+from app.core import events
+from app.core.events import event_publisher
 import redis
 
-celery_app = Celery("reminder", broker=settings.REDIS_URL)
+logger = logging.getLogger(__name__)
 redis_client = redis.Redis.from_url(settings.REDIS_URL)
 
-@celery_app.task
-# Celery task to send daily reminders for overdue tasks via Redis Pub/Sub
-def send_reminders():
+REMINDER_INDEX_KEY = "reminders:due"
+
+# KEYS[1] = due index, ARGV[1] = now (unix time), ARGV[2] = max entries
+_POP_DUE_LUA = """
+local ids = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+if #ids > 0 then
+    redis.call('ZREM', KEYS[1], unpack(ids))
+end
+return ids
+"""
+_pop_due = redis_client.register_script(_POP_DUE_LUA)
+
+def _due_timestamp(due_date: datetime) -> float:
+    # Naive due dates are stored as UTC
+    if due_date.tzinfo is None:
+        due_date = due_date.replace(tzinfo=timezone.utc)
+    return due_date.timestamp()
+
+# Adds/updates or removes a task in the due index after it was created or changed
+def schedule_task_reminder(task: Task):
+    schedule_task_reminders([task])
+
+# Same for several tasks in one round trip (bulk endpoints)
+def schedule_task_reminders(tasks: list[Task]):
+    due, done = {}, []
+    for task in tasks:
+        if task.completed or task.due_date is None or task.reminder_sent_at is not None:
+            done.append(task.id)
+        else:
+            due[task.id] = _due_timestamp(task.due_date)
+    pipe = redis_client.pipeline(transaction=False)
+    if due:
+        pipe.zadd(REMINDER_INDEX_KEY, due)
+    if done:
+        pipe.zrem(REMINDER_INDEX_KEY, *done)
+    pipe.execute()
+
+def unschedule_task_reminder(task_id: int):
+    unschedule_task_reminders([task_id])
+
+def unschedule_task_reminders(task_ids: list[int]):
+    if task_ids:
+        redis_client.zrem(REMINDER_INDEX_KEY, *task_ids)
+
+@shared_task
+# Runs every REMINDER_TICK_SECONDS, work is proportional to the tasks that became due since the last tick
+def send_due_reminders():
+    started = time.perf_counter()
+    now = datetime.now(timezone.utc)
+    sent = popped = 0
+    # Reminders whose publishing failed, put back into the index for the next tick
+    retry: dict[int, float] = {}
+    db: Session = SessionLocal()
+    try:
+        while True:
+            task_ids = [int(task_id) for task_id in
+                        _pop_due(keys=[REMINDER_INDEX_KEY], args=[now.timestamp(), settings.REMINDER_BATCH_SIZE])]
+            if not task_ids:
+                break
+            popped += len(task_ids)
+            # The index can be stale (task completed or moved meanwhile), the database decides
+            rows = db.execute(
+                select(Task.id, Task.title, Task.due_date, Task.project_id).where(
+                    Task.id.in_(task_ids),
+                    Task.completed == False,
+                    Task.reminder_sent_at.is_(None),
+                    Task.due_date <= now,
+                )
+            ).all()
+            pending: dict[int, list[str]] = {}
+            for task_id, title, due_date, project_id in rows:
+                pending.setdefault(project_id, []).append(
+                    event_publisher.encode(events.TASK_REMINDER, project_id, task_id, {
+                        "title": title,
+                        "due_date": due_date,
+                    })
+                )
+            if pending:
+                published = event_publisher.publish_bodies(pending)
+                sent += sum(len(pending[project_id]) for project_id in published)
+                delivered = [row.id for row in rows if row.project_id in published]
+                if delivered:
+                    db.execute(update(Task).where(Task.id.in_(delivered)).values(reminder_sent_at=now))
+                    db.commit()
+                retry.update((row.id, _due_timestamp(row.due_date)) for row in rows if row.project_id not in published)
+            if len(task_ids) < settings.REMINDER_BATCH_SIZE:
+                break
+    finally:
+        db.close()
+        _requeue(retry)
+
+    stats = {"due": popped, "reminders": sent, "retried": len(retry), "seconds": round(time.perf_counter() - started, 3)}
+    if popped:
+        logger.info(f"Reminder tick finished: {stats}")
+    return stats
+
+# If this fails too the tasks are still unreminded in the database and rebuild_reminder_index re-adds them
+def _requeue(retry: dict[int, float]):
+    if not retry:
+        return
+    try:
+        redis_client.zadd(REMINDER_INDEX_KEY, retry)
+    except redis.RedisError as e:
+        logger.error(f"Re-adding {len(retry)} unsent reminders failed: {e}")
+    else:
+        logger.warning(f"Publishing {len(retry)} reminders failed, they are retried by the next tick")
+
+@shared_task
+# Repairs the due index from the database: every open task with a due date that hasn't been reminded yet
+def rebuild_reminder_index():
+    db: Session = SessionLocal()
+    added = 0
+    try:
+        stmt = select(Task.id, Task.due_date).where(
+            Task.completed == False,
+            Task.reminder_sent_at.is_(None),
+            Task.due_date.is_not(None),
+        )
+        result = db.execute(stmt.execution_options(yield_per=settings.REMINDER_BATCH_SIZE))
+        for rows in result.partitions():
+            redis_client.zadd(REMINDER_INDEX_KEY, {task_id: _due_timestamp(due_date) for task_id, due_date in rows})
+            added += len(rows)
+    finally:
+        db.close()
+    return {"indexed": added}
+
+@shared_task
+# Full-scan variant: sends reminders for every overdue open task via Redis Pub/Sub.
+# Superseded by send_due_reminders in the beat schedule, kept for manual runs.
+# Due tasks are streamed in batches of REMINDER_BATCH_SIZE (server-side cursor on PostgreSQL,
+# only the columns the reminder needs) and every batch is published in one pipelined round trip.
+# project_id_min/project_id_max (half-open range) restrict the run to one shard, see dispatch_reminders.
+def send_reminders(project_id_min: int | None = None, project_id_max: int | None = None):
+    started = time.perf_counter()
     db: Session = SessionLocal()
     today = datetime.now(timezone.utc)
-    due_tasks = db.query(Task).filter(Task.due_date <= today, Task.completed == False).all()
-
-    # Each due task is broadcasted via Redis to clients.
-    # Future version may trigger emails using an SMTP provider inside this task.
-    for task in due_tasks:
-        message = {
-            "type": "reminder",
-            "task_id": task.id,
-            "task_title": task.title,
-            "due_date": task.due_date.isoformat(),
-            "project_id": task.project_id
-        }
-        # Push reminder messages to Redis Pub/Sub so WebSocket clients get notified immediately.
-        # Can be extended to trigger email or push notifications.
-        redis_client.publish(f"task_updates:{task.project_id}", str(message))
-    # Each reminder is pushed to Redis so connected clients can get live notifications.
-
-    db.close()
-    return f"Sent {len(due_tasks)} reminders"
+    stmt = select(Task.id, Task.title, Task.due_date, Task.project_id).where(
+        Task.due_date <= today, Task.completed == False
+    )
+    if project_id_min is not None:
+        stmt = stmt.where(Task.project_id >= project_id_min)
+    if project_id_max is not None:
+        stmt = stmt.where(Task.project_id < project_id_max)
+
+    sent = batches = 0
+    try:
+        result = db.execute(stmt.execution_options(yield_per=settings.REMINDER_BATCH_SIZE))
+        # Each due task is broadcasted via Redis to clients.
+        # Future version may trigger emails using an SMTP provider inside this task.
+        for rows in result.partitions():
+            pending: dict[int, list[str]] = {}
+            for task_id, title, due_date, project_id in rows:
+                pending.setdefault(project_id, []).append(
+                    event_publisher.encode(events.TASK_REMINDER, project_id, task_id, {
+                        "title": title,
+                        "due_date": due_date,
+                    })
+                )
+            sent += sum(len(pending[project_id]) for project_id in event_publisher.publish_bodies(pending))
+            batches += 1
+    finally:
+        db.close()
+
+    seconds = time.perf_counter() - started
+    stats = {
+        "reminders": sent,
+        "batches": batches,
+        "seconds": round(seconds, 3),
+        "reminders_per_second": round(sent / seconds, 1) if seconds else 0.0,
+        "shard": [project_id_min, project_id_max],
+    }
+    logger.info(f"Reminder run finished: {stats}")
+    return stats
+
+@shared_task
+# Splits the reminder run into REMINDER_SHARDS subtasks by project id range,
+# so several workers can process a large table in parallel.
+def dispatch_reminders(shards: int | None = None):
+    shards = shards or settings.REMINDER_SHARDS
+    if shards <= 1:
+        send_reminders.delay()
+        return {"shards": 1}
+
+    db: Session = SessionLocal()
+    try:
+        lowest, highest = db.query(func.min(Project.id), func.max(Project.id)).one()
+    finally:
+        db.close()
+    if lowest is None:
+        return {"shards": 0}
+
+    step = max(1, math.ceil((highest - lowest + 1) / shards))
+    count = 0
+    for start in range(lowest, highest + 1, step):
+        send_reminders.delay(start, start + step)
+        count += 1
+    return {"shards": count}
@@ -0,0 +1,198 @@
+# Full-text search over task titles, descriptions and comments.
+# On PostgreSQL every task carries a weighted tsvector (title > description > comments)
+# backed by a GIN index, queried with prefix matching and ranked with ts_rank.
+# Other databases (SQLite in local tests) use an in-process inverted index instead,
+# built lazily from the database on the first search and kept up to date afterwards.
+# The index is refreshed inside the mutating transaction via index_task/remove_task.
+
+import bisect
+import re
+import threading
+
+from sqlalchemy import Select, bindparam, case, false, func, text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.database import engine
+from app.models.task_model import Task, TaskComment
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Field weights for the fallback index, mirroring the tsvector weights A/B/C
+_TITLE_WEIGHT = 1.0
+_DESCRIPTION_WEIGHT = 0.4
+_COMMENT_WEIGHT = 0.2
+
+# Weighted search document of a task row, used by both single-task reindex and backfill
+_DOCUMENT_SQL = """
+    setweight(to_tsvector(CAST(:config AS regconfig), coalesce(title, '')), 'A') ||
+    setweight(to_tsvector(CAST(:config AS regconfig), coalesce(description, '')), 'B') ||
+    setweight(to_tsvector(CAST(:config AS regconfig), coalesce(
+        (SELECT string_agg(content, ' ') FROM task_comments WHERE task_comments.task_id = tasks.id), ''
+    )), 'C')
+"""
+_REINDEX_MANY_SQL = text(f"UPDATE tasks SET search_vector = {_DOCUMENT_SQL} WHERE id IN :task_ids").bindparams(
+    bindparam("task_ids", expanding=True)
+)
+_BACKFILL_SQL = text(f"UPDATE tasks SET search_vector = {_DOCUMENT_SQL} WHERE search_vector IS NULL")
+
+
+def tokenize(value: str | None) -> list[str]:
+    return [token.lower() for token in _TOKEN_RE.findall(value or "")]
+
+
+def uses_postgres_search() -> bool:
+    return engine.dialect.name == "postgresql"
+
+
+class InMemoryTaskIndex:
+    def __init__(self):
+        # token -> {task_id: weight}
+        self._postings: dict[str, dict[int, float]] = {}
+        # task_id -> tokens, needed to remove a task's old postings on reindex
+        self._doc_tokens: dict[int, set[str]] = {}
+        # Sorted vocabulary for prefix lookups via bisect
+        self._vocabulary: list[str] = []
+        self._lock = threading.Lock()
+        self.loaded = False
+
+    def load(self, db: Session):
+        with self._lock:
+            if self.loaded:
+                return
+            comments: dict[int, list[str]] = {}
+            for task_id, content in db.query(TaskComment.task_id, TaskComment.content):
+                comments.setdefault(task_id, []).append(content or "")
+            for task_id, title, description in db.query(Task.id, Task.title, Task.description).yield_per(1000):
+                self._put(task_id, title, description, comments.get(task_id, []))
+            self.loaded = True
+
+    def put(self, task_id: int, title: str | None, description: str | None, comments: list[str]):
+        with self._lock:
+            self._put(task_id, title, description, comments)
+
+    def remove(self, task_id: int):
+        with self._lock:
+            self._remove(task_id)
+
+    def search(self, terms: list[str]) -> dict[int, float]:
+        # Every term must match (AND), each term matches as a prefix
+        with self._lock:
+            scores: dict[int, float] | None = None
+            for term in terms:
+                term_scores: dict[int, float] = {}
+                start = bisect.bisect_left(self._vocabulary, term)
+                for token in self._vocabulary[start:]:
+                    if not token.startswith(term):
+                        break
+                    for task_id, weight in self._postings[token].items():
+                        term_scores[task_id] = term_scores.get(task_id, 0.0) + weight
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {task_id: score + term_scores[task_id]
+                              for task_id, score in scores.items() if task_id in term_scores}
+                if not scores:
+                    return {}
+            return scores or {}
+
+    def _put(self, task_id, title, description, comments):
+        self._remove(task_id)
+        weights: dict[str, float] = {}
+        for token in tokenize(title):
+            weights[token] = weights.get(token, 0.0) + _TITLE_WEIGHT
+        for token in tokenize(description):
+            weights[token] = weights.get(token, 0.0) + _DESCRIPTION_WEIGHT
+        for comment in comments:
+            for token in tokenize(comment):
+                weights[token] = weights.get(token, 0.0) + _COMMENT_WEIGHT
+
+        for token, weight in weights.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                bisect.insort(self._vocabulary, token)
+            postings[task_id] = weight
+        self._doc_tokens[task_id] = set(weights)
+
+    def _remove(self, task_id):
+        for token in self._doc_tokens.pop(task_id, ()):
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            postings.pop(task_id, None)
+            if not postings:
+                del self._postings[token]
+                position = bisect.bisect_left(self._vocabulary, token)
+                if position < len(self._vocabulary) and self._vocabulary[position] == token:
+                    del self._vocabulary[position]
+
+
+fallback_index = InMemoryTaskIndex()
+
+
+# Refreshes the search document of a task. Call after flush and before commit.
+def index_task(db: Session, task_id: int):
+    index_tasks(db, [task_id])
+
+
+# Same for several tasks at once (one statement on PostgreSQL), used by the bulk endpoints
+def index_tasks(db: Session, task_ids: list[int]):
+    if not task_ids:
+        return
+    if uses_postgres_search():
+        db.execute(_REINDEX_MANY_SQL, {"config": settings.SEARCH_TEXT_CONFIG, "task_ids": list(task_ids)})
+        return
+    if not fallback_index.loaded:
+        return
+    comments: dict[int, list[str]] = {}
+    for task_id, content in db.query(TaskComment.task_id, TaskComment.content).filter(TaskComment.task_id.in_(task_ids)):
+        comments.setdefault(task_id, []).append(content or "")
+    found = set()
+    for task in db.query(Task).filter(Task.id.in_(task_ids)):
+        fallback_index.put(task.id, task.title, task.description, comments.get(task.id, []))
+        found.add(task.id)
+    for task_id in set(task_ids) - found:
+        fallback_index.remove(task_id)
+
+
+def backfill_search_vectors(conn):
+    # PostgreSQL only: fills documents of tasks that were never indexed
+    conn.execute(_BACKFILL_SQL, {"config": settings.SEARCH_TEXT_CONFIG})
+
+
+def remove_task(task_id: int):
+    # On PostgreSQL the document is deleted together with the row
+    if not uses_postgres_search():
+        fallback_index.remove(task_id)
+
+
+# Loads the fallback index if needed; async callers run this via AsyncSession.run_sync
+# before building a search statement
+def prepare_search(db: Session):
+    if not uses_postgres_search():
+        fallback_index.load(db)
+
+
+# Restricts a task statement to tasks matching `search`. With order_by_rank the
+# best matches come first, otherwise the caller's ordering is kept.
+def apply_search(query: Select, db: Session, search: str, order_by_rank: bool = False) -> Select:
+    terms = tokenize(search)
+    if not terms:
+        return query.filter(false())
+
+    if uses_postgres_search():
+        ts_query = func.to_tsquery(settings.SEARCH_TEXT_CONFIG, " & ".join(f"{term}:*" for term in terms))
+        query = query.filter(Task.search_vector.op("@@")(ts_query))
+        if order_by_rank:
+            query = query.order_by(func.ts_rank(Task.search_vector, ts_query).desc())
+        return query
+
+    prepare_search(db)
+    scores = fallback_index.search(terms)
+    if not scores:
+        return query.filter(false())
+    query = query.filter(Task.id.in_(scores.keys()))
+    if order_by_rank:
+        query = query.order_by(case(scores, value=Task.id).desc())
+    return query
@@ -0,0 +1,193 @@
+# Per-project task statistics for dashboards (GET /projects/{project_id}/stats).
+# Counters live in one Redis hash per project and are adjusted after every committed task
+# mutation (create, update, toggle, assign, move, duplicate, delete, bulk and import), so
+# reading them is one HGETALL whatever the size of the project:
+#   total, completed, board:<id>, priority:<name>, assignee:<id>  ("none" for NULL)
+# Overdue can't be counted ahead of time: open tasks with a due date are kept in a per-project
+# sorted set scored by due time and the overdue count is a ZCOUNT up to now.
+# Counters drift if a process dies between commit and update or Redis loses data.
+# reconcile_project_stats recomputes them with one GROUP BY per project (beat schedule), and a
+# project without counters (no "ready" field) is reconciled when its stats are read.
+
+import logging
+import time
+from collections import Counter, namedtuple
+from datetime import datetime, timezone
+
+import redis
+from celery import shared_task
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.models.project_model import Project
+from app.models.task_model import Task
+
+logger = logging.getLogger(__name__)
+redis_client = redis.Redis.from_url(settings.REDIS_URL)
+
+# The values a task contributes to the statistics
+TaskStats = namedtuple("TaskStats", "id project_id completed board_id priority assigned_user_id due_date")
+
+_READY_FIELD = "ready"
+_GROUPS = {"board": "by_board", "priority": "by_priority", "assignee": "by_assignee"}
+
+
+def counters_key(project_id: int) -> str:
+    return f"project_stats:{project_id}"
+
+
+def open_due_key(project_id: int) -> str:
+    return f"project_open_due:{project_id}"
+
+
+def snapshot(task) -> TaskStats:
+    return TaskStats(task.id, task.project_id, bool(task.completed), task.board_id, task.priority,
+                     task.assigned_user_id, task.due_date)
+
+
+def _name(value) -> str:
+    return "none" if value is None else str(value)
+
+
+def _fields(completed, board_id, priority, assigned_user_id) -> list[str]:
+    fields = ["total", f"board:{_name(board_id)}", f"priority:{_name(priority)}", f"assignee:{_name(assigned_user_id)}"]
+    if completed:
+        fields.append("completed")
+    return fields
+
+
+def _due_score(due_date) -> float:
+    if isinstance(due_date, str):
+        due_date = datetime.fromisoformat(due_date)
+    # Naive due dates are stored as UTC
+    if due_date.tzinfo is None:
+        due_date = due_date.replace(tzinfo=timezone.utc)
+    return due_date.timestamp()
+
+
+# Applies task changes to the counters in one round trip. Each change is a pair of snapshots
+# (before, after); before is None for created tasks, after is None for deleted ones.
+def record(changes):
+    deltas: Counter = Counter()
+    pipe = redis_client.pipeline(transaction=False)
+    for before, after in changes:
+        if before == after:
+            continue
+        if before is not None:
+            for field in _fields(before.completed, before.board_id, before.priority, before.assigned_user_id):
+                deltas[(before.project_id, field)] -= 1
+            pipe.zrem(open_due_key(before.project_id), before.id)
+        if after is not None:
+            for field in _fields(after.completed, after.board_id, after.priority, after.assigned_user_id):
+                deltas[(after.project_id, field)] += 1
+            if not after.completed and after.due_date is not None:
+                pipe.zadd(open_due_key(after.project_id), {after.id: _due_score(after.due_date)})
+    for (project_id, field), delta in deltas.items():
+        if delta:
+            pipe.hincrby(counters_key(project_id), field, delta)
+    try:
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.error(f"Updating project stats failed, they are repaired by the next reconcile: {e}")
+
+
+def forget_project(project_id: int):
+    try:
+        redis_client.delete(counters_key(project_id), open_due_key(project_id))
+    except redis.RedisError as e:
+        logger.warning(f"Removing project stats failed: {e}")
+
+
+def _count(db: Session, project_id: int) -> Counter:
+    counters: Counter = Counter()
+    rows = db.execute(
+        select(Task.completed, Task.board_id, Task.priority, Task.assigned_user_id, func.count())
+        .where(Task.project_id == project_id)
+        .group_by(Task.completed, Task.board_id, Task.priority, Task.assigned_user_id)
+    )
+    for completed, board_id, priority, assigned_user_id, count in rows:
+        for field in _fields(completed, board_id, priority, assigned_user_id):
+            counters[field] += count
+    return counters
+
+
+def _open_due(db: Session, project_id: int):
+    stmt = select(Task.id, Task.due_date).where(
+        Task.project_id == project_id, Task.completed == False, Task.due_date.is_not(None)
+    )
+    return db.execute(stmt.execution_options(yield_per=settings.REMINDER_BATCH_SIZE)).partitions()
+
+
+# Recomputes the counters and the due set of a project from the database.
+# The due set is built under a temporary key and swapped in together with the counters.
+def reconcile_project(db: Session, project_id: int) -> Counter:
+    counters = _count(db, project_id)
+    staging = open_due_key(project_id) + ":rebuild"
+    redis_client.delete(staging)
+    for rows in _open_due(db, project_id):
+        redis_client.zadd(staging, {task_id: _due_score(due_date) for task_id, due_date in rows})
+
+    pipe = redis_client.pipeline(transaction=True)
+    pipe.delete(counters_key(project_id), open_due_key(project_id))
+    pipe.hset(counters_key(project_id), mapping={**counters, _READY_FIELD: 1})
+    if redis_client.exists(staging):
+        pipe.rename(staging, open_due_key(project_id))
+    pipe.execute()
+    return counters
+
+
+def _overdue_from_db(db: Session, project_id: int) -> int:
+    return db.scalar(select(func.count()).select_from(Task).where(
+        Task.project_id == project_id, Task.completed == False, Task.due_date < datetime.now(timezone.utc)
+    ))
+
+
+def _response(counters, overdue: int) -> dict:
+    stats = {"total": 0, "completed": 0, "open": 0, "overdue": overdue,
+             "by_board": {}, "by_priority": {}, "by_assignee": {}}
+    for field, count in counters.items():
+        group, _, name = field.partition(":")
+        if group in _GROUPS:
+            if count:
+                stats[_GROUPS[group]][name] = count
+        elif group in ("total", "completed"):
+            stats[group] = count
+    stats["open"] = stats["total"] - stats["completed"]
+    return stats
+
+
+# Statistics of a project: counters from Redis (reconciled first if missing), the
+# overdue count from the due set. Without Redis they are computed from the database.
+def project_stats(db: Session, project_id: int) -> dict:
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.hgetall(counters_key(project_id))
+        pipe.zcount(open_due_key(project_id), "-inf", time.time())
+        values, overdue = pipe.execute()
+        if _READY_FIELD.encode() not in values:
+            reconcile_project(db, project_id)
+            values = redis_client.hgetall(counters_key(project_id))
+            overdue = redis_client.zcount(open_due_key(project_id), "-inf", time.time())
+    except redis.RedisError as e:
+        logger.warning(f"Reading project stats from Redis failed, counting in the database: {e}")
+        return _response(_count(db, project_id), _overdue_from_db(db, project_id))
+    return _response({field.decode(): int(count) for field, count in values.items()}, overdue)
+
+
+@shared_task
+# Repairs drifted counters of all (or the given) projects, see the module comment
+def reconcile_project_stats(project_ids: list[int] | None = None):
+    started = time.perf_counter()
+    db: Session = SessionLocal()
+    reconciled = 0
+    try:
+        for project_id in project_ids or db.scalars(select(Project.id)).all():
+            reconcile_project(db, project_id)
+            reconciled += 1
+    finally:
+        db.close()
+    stats = {"projects": reconciled, "seconds": round(time.perf_counter() - started, 3)}
+    logger.info(f"Project stats reconciled: {stats}")
+    return stats
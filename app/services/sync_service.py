@@ -0,0 +1,52 @@
+# Delta sync for offline and mobile clients (GET /projects/{project_id}/changes?since=<version>).
+# Tasks and comments carry a change version (app/db/change_versions.py) that every write
+# renews; deleting a task or moving it to another project leaves a tombstone in the project
+# it left. A sync reads only the rows with version >= since through the version indexes, so
+# its cost follows the number of changes, not the size of the project.
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+from app.db.change_versions import change_watermark, next_change_version
+from app.models.task_model import Task, TaskComment, TaskTombstone
+from app.schemas.sync_schema import TaskChange, TaskCommentChange
+
+TASK_CHANGE_COLUMNS = tuple(getattr(Task, field) for field in TaskChange.model_fields)
+COMMENT_CHANGE_COLUMNS = tuple(getattr(TaskComment, field) for field in TaskCommentChange.model_fields)
+
+# Tombstones of removed tasks: task id -> the project the task was removed from
+def record_removals(db: Session, removed: dict[int, int]):
+    if removed:
+        db.execute(insert(TaskTombstone), [
+            {"task_id": task_id, "project_id": project_id} for task_id, project_id in removed.items()
+        ])
+
+# Tasks whose project changed (task id -> previous project): the previous project gets a
+# tombstone, the comments a new version so they are synced into the new project
+def record_moves(db: Session, moved: dict[int, int]):
+    if not moved:
+        return
+    record_removals(db, moved)
+    db.execute(update(TaskComment).where(TaskComment.task_id.in_(list(moved))).values(version=next_change_version()))
+
+# Moves of a task from its snapshot before an update (see stats_service.snapshot)
+def moves(before, task) -> dict[int, int]:
+    return {task.id: before.project_id} if before.project_id != task.project_id else {}
+
+# Access must be checked before. The watermark is read first, rows committed while the
+# changes are read are then sent again by the next sync rather than missed.
+def project_changes(db: Session, project_id: int, since: int) -> dict:
+    version = db.scalar(select(change_watermark()))
+    tasks = db.execute(
+        select(*TASK_CHANGE_COLUMNS).where(Task.version >= since, Task.project_id == project_id)
+    ).all()
+    comments = db.execute(
+        select(*COMMENT_CHANGE_COLUMNS)
+        .join(Task, Task.id == TaskComment.task_id)
+        .where(TaskComment.version >= since, Task.project_id == project_id)
+    ).all()
+    deleted = db.scalars(
+        select(TaskTombstone.task_id).distinct()
+        .where(TaskTombstone.version >= since, TaskTombstone.project_id == project_id)
+    ).all()
+    return {"version": version, "tasks": tasks, "comments": comments, "deleted_task_ids": deleted}
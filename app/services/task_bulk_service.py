@@ -0,0 +1,224 @@
+# Bulk task mutations for imports and multi-select actions in the UI.
+# Every request resolves the caller's role for all distinct projects in one query, writes all rows with a single
+# multi-row statement, commits once and emits the change events of each project as one batch.
+# Invalid or forbidden items don't fail the request, they are reported per item.
+
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.principal_cache import Principal
+from app.models.board_model import Board
+from app.models.enums_model import ProjectRole
+from app.models.task_model import Task, TaskComment
+from app.schemas.task_schema import TaskCreate, TaskBulkUpdate, TaskBulkMove, TaskFieldsUpdate
+from app.core import events, http_cache
+from app.core.events import event_publisher
+from app.services import search_service, reminders_service, task_service, permission_service, stats_service, sync_service
+
+def create_tasks(items: list[dict], db: Session, user: Principal) -> dict:
+    _check_size(items)
+    results: list[dict | None] = [None] * len(items)
+    parsed = _validate(items, TaskCreate, results)
+
+    writable = _writable_projects(db, user, {task.project_id for _, task in parsed})
+    rows, indexes = [], []
+    for index, task in parsed:
+        if task.project_id not in writable:
+            results[index] = _failed(index, "No access to project")
+            continue
+        rows.append(task.model_dump())
+        indexes.append(index)
+
+    if rows:
+        created = db.scalars(insert(Task).returning(Task, sort_by_parameter_order=True), rows).all()
+        search_service.index_tasks(db, [task.id for task in created])
+        task_service.commit_detached(db, *created)
+        http_cache.bump_project_versions({task.project_id for task in created})
+        stats_service.record((None, stats_service.snapshot(task)) for task in created)
+        for index, task in zip(indexes, created):
+            results[index] = _succeeded(index, task.id)
+        event_publisher.emit_many([
+            (events.TASK_CREATED, task.project_id, task.id, events.task_snapshot(task)) for task in created
+        ])
+        reminders_service.schedule_task_reminders(created)
+    return _summary(results)
+
+def update_tasks(items: list[dict], db: Session, user: Principal) -> dict:
+    _check_size(items)
+    results: list[dict | None] = [None] * len(items)
+    parsed = _validate_fields(_validate(items, TaskBulkUpdate, results), results)
+    tasks = _load_tasks(db, {item.id for _, item in parsed})
+    previous_project_ids = {task.project_id for task in tasks.values()}
+    # Moving a task needs editor rights on its new project too, resolved with the same query
+    destinations = {item.fields["project_id"] for _, item in parsed if "project_id" in item.fields}
+    writable = _writable_projects(db, user, previous_project_ids | destinations)
+    before = {task.id: stats_service.snapshot(task) for task in tasks.values()}
+
+    # A task may appear in several items, its changes are merged into one event
+    changed: dict[int, set[str]] = {}
+    reindex = set()
+    for index, item in parsed:
+        task = tasks.get(item.id)
+        detail = _access_error(task, user, writable)
+        if not detail and item.fields.get("project_id", task.project_id) not in writable | {task.project_id}:
+            detail = "No access to target project"
+        if detail:
+            results[index] = _failed(index, detail, item.id)
+            continue
+        changed.setdefault(task.id, set()).update(task_service.apply_partial_update(task, item.fields))
+        if task_service.touches_search_document(item.fields):
+            reindex.add(task.id)
+        results[index] = _succeeded(index, task.id)
+
+    if changed:
+        # The unit of work sends the updates as executemany batches on flush
+        db.flush()
+        search_service.index_tasks(db, list(reindex))
+        sync_service.record_moves(db, {
+            task_id: before[task_id].project_id for task_id in changed
+            if before[task_id].project_id != tasks[task_id].project_id
+        })
+        task_service.commit_detached(db, *tasks.values())
+        http_cache.bump_project_versions(previous_project_ids | {task.project_id for task in tasks.values()})
+        stats_service.record((before[task_id], stats_service.snapshot(tasks[task_id])) for task_id in changed)
+        event_publisher.emit_many([
+            (events.TASK_UPDATED, tasks[task_id].project_id, task_id,
+             {field: getattr(tasks[task_id], field) for field in fields})
+            for task_id, fields in changed.items() if fields
+        ])
+        reminders_service.schedule_task_reminders([
+            tasks[task_id] for task_id, fields in changed.items() if {"due_date", "completed"} & fields
+        ])
+    return _summary(results)
+
+def delete_tasks(task_ids: list[int], db: Session, user: Principal) -> dict:
+    _check_size(task_ids)
+    results: list[dict | None] = [None] * len(task_ids)
+    tasks = _load_tasks(db, set(task_ids))
+    writable = _writable_projects(db, user, {task.project_id for task in tasks.values()})
+
+    deleted: dict[int, int] = {}  # task id -> project id
+    for index, task_id in enumerate(task_ids):
+        task = tasks.get(task_id)
+        detail = _access_error(task, user, writable)
+        if detail:
+            results[index] = _failed(index, detail, task_id)
+            continue
+        deleted[task_id] = task.project_id
+        results[index] = _succeeded(index, task_id)
+
+    if deleted:
+        ids = list(deleted)
+        removed = [stats_service.snapshot(tasks[task_id]) for task_id in ids]
+        db.execute(delete(TaskComment).where(TaskComment.task_id.in_(ids)))
+        db.execute(delete(Task).where(Task.id.in_(ids)), execution_options={"synchronize_session": False})
+        sync_service.record_removals(db, deleted)
+        db.commit()
+        http_cache.bump_project_versions(set(deleted.values()))
+        stats_service.record((snapshot, None) for snapshot in removed)
+        for task_id in ids:
+            search_service.remove_task(task_id)
+        event_publisher.emit_many([
+            (events.TASK_DELETED, project_id, task_id, None) for task_id, project_id in deleted.items()
+        ])
+        reminders_service.unschedule_task_reminders(ids)
+    return _summary(results)
+
+# Moves tasks to another board of their project (board_id None removes them from their board)
+def move_tasks(move: TaskBulkMove, db: Session, user: Principal) -> dict:
+    _check_size(move.task_ids)
+    board = None
+    if move.board_id is not None:
+        board = db.get(Board, move.board_id)
+        if not board:
+            raise HTTPException(status_code=404, detail="Board not found")
+
+    results: list[dict | None] = [None] * len(move.task_ids)
+    tasks = _load_tasks(db, set(move.task_ids))
+    writable = _writable_projects(db, user, {task.project_id for task in tasks.values()})
+
+    moved: dict[int, int] = {}  # task id -> project id
+    for index, task_id in enumerate(move.task_ids):
+        task = tasks.get(task_id)
+        detail = _access_error(task, user, writable)
+        if not detail and board is not None and board.project_id != task.project_id:
+            detail = "Board belongs to another project"
+        if detail:
+            results[index] = _failed(index, detail, task_id)
+            continue
+        if task.board_id != move.board_id:
+            moved[task_id] = task.project_id
+        results[index] = _succeeded(index, task_id)
+
+    if moved:
+        before = [stats_service.snapshot(tasks[task_id]) for task_id in moved]
+        db.execute(update(Task).where(Task.id.in_(list(moved))).values(board_id=move.board_id),
+                   execution_options={"synchronize_session": False})
+        db.commit()
+        http_cache.bump_project_versions(set(moved.values()))
+        stats_service.record((snapshot, snapshot._replace(board_id=move.board_id)) for snapshot in before)
+        event_publisher.emit_many([
+            (events.TASK_UPDATED, project_id, task_id, {"board_id": move.board_id})
+            for task_id, project_id in moved.items()
+        ])
+    return _summary(results)
+
+def _check_size(items: list):
+    if len(items) > settings.TASK_BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {settings.TASK_BULK_MAX_ITEMS} items per request")
+
+def _validate(items: list[dict], schema, results: list) -> list:
+    parsed = []
+    for index, item in enumerate(items):
+        try:
+            parsed.append((index, schema.model_validate(item)))
+        except ValidationError as e:
+            results[index] = _failed(index, _error_detail(e))
+    return parsed
+
+# Checks and converts the changed fields of each update item before anything touches the session
+def _validate_fields(parsed: list, results: list) -> list:
+    valid = []
+    for index, item in parsed:
+        try:
+            fields = TaskFieldsUpdate.model_validate(item.fields)
+        except ValidationError as e:
+            results[index] = _failed(index, _error_detail(e, "fields"), item.id)
+            continue
+        valid.append((index, item.model_copy(update={"fields": fields.model_dump(exclude_unset=True)})))
+    return valid
+
+def _error_detail(e: ValidationError, prefix: str | None = None) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in ([prefix] if prefix else []) + list(error['loc']))}: {error['msg']}"
+        for error in e.errors()
+    )
+
+def _load_tasks(db: Session, task_ids: set[int]) -> dict[int, Task]:
+    if not task_ids:
+        return {}
+    return {task.id: task for task in db.scalars(select(Task).where(Task.id.in_(task_ids)))}
+
+# Projects among project_ids the user may write to, resolved with one query
+def _writable_projects(db: Session, user: Principal, project_ids: set[int]) -> set[int]:
+    return permission_service.projects_with_role(db, user, project_ids, ProjectRole.editor)
+
+# Same rules as task_service.has_task_access
+def _access_error(task: Task | None, user: Principal, writable: set[int]) -> str | None:
+    if task is None:
+        return "Task not found"
+    if task.project_id not in writable and task.assigned_user_id != user.id:
+        return "No access to this task"
+    return None
+
+def _succeeded(index: int, task_id: int) -> dict:
+    return {"index": index, "id": task_id, "ok": True, "detail": None}
+
+def _failed(index: int, detail: str, task_id: int | None = None) -> dict:
+    return {"index": index, "id": task_id, "ok": False, "detail": detail}
+
+def _summary(results: list[dict]) -> dict:
+    failed = sum(1 for result in results if not result["ok"])
+    return {"succeeded": len(results) - failed, "failed": failed, "results": results}
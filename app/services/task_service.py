@@ -1,104 +1,440 @@
 from fastapi import HTTPException
-from sqlalchemy.orm import Session
-from app.models.user_model import User
+from sqlalchemy import Insert, Select, String, Update, and_, case, func, insert, literal, literal_column, or_, select, true, update
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy.sql.expression import ClauseElement, Executable
+from app.core.principal_cache import Principal
 from app.models.task_model import Task, TaskComment
-from app.models.project_model import Project
-from app.schemas.task_schema import TaskCreate
+from app.models.enums_model import ProjectRole
+from app.models.project_model import project_members
 from app.core.config import settings
-import redis
+from app.core.ttl_cache import TTLCache
+from app.core import http_cache
+from app.schemas.task_schema import TaskCreate, TaskOut
+from app.core import events
+from app.core.events import event_publisher
+from app.services import search_service, reminders_service, permission_service, stats_service, sync_service
+from datetime import datetime, timezone
+import base64
+import json
 
-redis_client = redis.Redis.from_url(settings.REDIS_URL)
+# Columns maintained by the service itself, never writable through PATCH
+_INTERNAL_FIELDS = {"search_vector", "reminder_sent_at", "updated_at", "version"}
+# Changing one of these requires refreshing the task's search document
+_SEARCHABLE_FIELDS = {"title", "description"}
+# Totals for X-Total-Count, keyed by the list filters
+_count_cache = TTLCache(settings.TASK_COUNT_CACHE_SECONDS, max_entries=4096)
+# TaskOut fields in schema order, selected as row tuples by the list endpoints' fast JSON path
+TASK_OUT_COLUMNS = tuple(getattr(Task, field) for field in TaskOut.model_fields)
 
-# Only users who are project members can create tasks in that project.
-# This enforces basic access control (RBAC planned for fine-grained permissions).
+# Only editors and owners of a project can create tasks in that project.
+# The role is checked by the INSERT itself (see the mutation section below).
 def create_task(task_data: TaskCreate, db: Session, user) -> Task:
-    project = db.query(Project).filter(Project.id == task_data.project_id).first()
-    if not project or (user not in project.members and user.id != project.owner_id):
+    db_task = db.scalar(insert_task_statement(task_data.model_dump(), user))
+    if db_task is None:
         raise HTTPException(status_code=403, detail="No access to project")
 
-    db_task = Task(**task_data.model_dump())
-    db.add(db_task)
-    db.commit()
-    db.refresh(db_task)
+    search_service.index_task(db, db_task.id)
+    commit_detached(db, db_task)
+    http_cache.bump_project_versions([db_task.project_id])
+    stats_service.record([(None, stats_service.snapshot(db_task))])
 
-    # This publish call enables instant WebSocket updates by notifying subscribed clients via Redis Pub/Sub.
+    # This event enables instant WebSocket updates by notifying subscribed clients via Redis Pub/Sub.
     # This is crucial for real-time collaboration across users.
-    redis_client.publish(f"task_updates:{db_task.project_id}", f"New task: {db_task.title}")
+    event_publisher.emit(events.TASK_CREATED, db_task.project_id, db_task.id, events.task_snapshot(db_task))
+    reminders_service.schedule_task_reminder(db_task)
     return db_task
 
 # Flexible task querying with multiple optional filters.
 # Useful for dashboard views with dynamic sorting and searching.
+# visible_to=<user id> limits the result to projects the user is a member of.
 def query_tasks(db: Session, completed=None, project_id=None, board_id=None, priority=None,
-                assigned_user_id=None, sort_by=None, sort_order="asc", limit=20, offset=0, search=None):
-    query = db.query(Task)
+                assigned_user_id=None, sort_by=None, sort_order="asc", limit=20, offset=0, search=None,
+                visible_to=None, as_rows=False):
+    stmt = query_tasks_statement(db, completed, project_id, board_id, priority, assigned_user_id,
+                                 sort_by, sort_order, limit, offset, search, visible_to)
+    if as_rows:
+        return db.execute(task_out_rows(stmt)).all()
+    return db.scalars(stmt).all()
+
+# Statement builders are shared with the async variants in task_service_async
+def query_tasks_statement(db, completed=None, project_id=None, board_id=None, priority=None,
+                          assigned_user_id=None, sort_by=None, sort_order="asc", limit=20, offset=0,
+                          search=None, visible_to=None) -> Select:
+    # Without an explicit sort, search results come back best match first
+    stmt = _filtered_task_query(db, completed, project_id, board_id, priority, assigned_user_id, search,
+                                visible_to, order_by_rank=not sort_by)
+
+    if sort_by:
+        sort_column = getattr(Task, sort_by)
+        sort_column = sort_column.desc() if sort_order == "desc" else sort_column.asc()
+        stmt = stmt.order_by(sort_column)
+
+    return stmt.offset(offset).limit(limit)
+
+# Keyset (cursor) pagination: instead of skipping `offset` rows, each page continues
+# right after the last row of the previous one, so deep pages cost the same as the first.
+# Rows are ordered by (sort_by, id); NULL sort values come last in both directions.
+# Returns the page and an opaque cursor for the next page (None on the last page).
+def query_tasks_page(db: Session, completed=None, project_id=None, board_id=None, priority=None,
+                     assigned_user_id=None, sort_by=None, sort_order="asc", limit=20, cursor=None,
+                     search=None, visible_to=None, as_rows=False) -> tuple[list[Task], str | None]:
+    stmt = query_tasks_page_statement(db, completed, project_id, board_id, priority, assigned_user_id,
+                                      sort_by, sort_order, limit, cursor, search, visible_to)
+    rows = db.execute(task_out_rows(stmt)).all() if as_rows else db.scalars(stmt).all()
+    return finish_task_page(rows, sort_by, sort_order, limit)
+
+def query_tasks_page_statement(db, completed=None, project_id=None, board_id=None, priority=None,
+                               assigned_user_id=None, sort_by=None, sort_order="asc", limit=20, cursor=None,
+                               search=None, visible_to=None) -> Select:
+    stmt = _filtered_task_query(db, completed, project_id, board_id, priority, assigned_user_id, search, visible_to)
+    descending = sort_order == "desc"
+    sort_column = getattr(Task, sort_by) if sort_by else None
+
+    if cursor:
+        last_value, last_id = _decode_cursor(cursor, sort_by, sort_order)
+        stmt = stmt.where(_after_cursor(sort_column, last_value, last_id, descending))
+
+    if sort_column is not None:
+        ordered = sort_column.desc() if descending else sort_column.asc()
+        stmt = stmt.order_by(ordered.nulls_last())
+    stmt = stmt.order_by(Task.id.desc() if descending else Task.id.asc())
+
+    # One extra row tells whether another page follows
+    return stmt.limit(limit + 1)
+
+# The same statement selecting only TASK_OUT_COLUMNS; filters, order and limit are kept.
+# Rows still expose the columns as attributes, so finish_task_page works on them too.
+def task_out_rows(stmt: Select) -> Select:
+    return stmt.with_only_columns(*TASK_OUT_COLUMNS)
+
+def finish_task_page(rows, sort_by, sort_order, limit) -> tuple[list[Task], str | None]:
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    last_value = getattr(last, sort_by) if sort_by else None
+    return rows, _encode_cursor(sort_by, sort_order, last_value, last.id)
+
+# User id for the visible_to filter of a list request: scope=all lists every task,
+# scope=mine only tasks of the caller's projects
+def visible_to(scope: str, user: Principal | None) -> int | None:
+    if scope == "all":
+        return None
+    if user is None:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    return user.id
+
+# Projects whose versions a task list depends on (None: any project, see http_cache.make_etag)
+def list_version_projects(project_id, visible_to, user: Principal | None):
+    if project_id:
+        return [project_id]
+    if visible_to is not None:
+        return user.project_ids
+    return None
+
+# Total number of tasks matching the filters (ignoring pagination), reused for
+# TASK_COUNT_CACHE_SECONDS. estimate=True takes the planner's row estimate on
+# PostgreSQL instead of counting, which stays cheap for very large results.
+def count_tasks(db: Session, completed=None, project_id=None, board_id=None, priority=None,
+                assigned_user_id=None, search=None, visible_to=None, estimate=False) -> int:
+    estimate = estimate and db.get_bind().dialect.name == "postgresql"
+    key = (completed, project_id, board_id, priority, assigned_user_id, search, visible_to, estimate)
+    total = _count_cache.get(key)
+    if total is not None:
+        return total
+
+    stmt = _filtered_task_query(db, completed, project_id, board_id, priority, assigned_user_id, search, visible_to)
+    if estimate:
+        total = _planner_estimate(db, stmt.with_only_columns(Task.id))
+    else:
+        total = db.scalar(select(func.count()).select_from(stmt.with_only_columns(Task.id).subquery()))
+    _count_cache.set(key, total)
+    return total
+
+def _planner_estimate(db: Session, stmt: Select) -> int:
+    plan = db.execute(_ExplainJson(stmt)).scalar()
+    # psycopg decodes the json column, asyncpg returns its text
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+# EXPLAIN (FORMAT JSON) <statement>, compiled and bound like the statement itself, so the
+# parameters use the paramstyle of whichever driver runs it (psycopg, asyncpg)
+class _ExplainJson(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, statement: Select):
+        self.statement = statement
+
+@compiles(_ExplainJson, "postgresql")
+def _compile_explain_json(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+def _filtered_task_query(db, completed, project_id, board_id, priority, assigned_user_id, search,
+                         visible_to=None, order_by_rank=False) -> Select:
+    stmt = select(Task)
 
     if completed is not None:
-        query = query.filter(Task.completed == completed)
+        stmt = stmt.where(Task.completed == completed)
     if project_id:
-        query = query.filter(Task.project_id == project_id)
+        stmt = stmt.where(Task.project_id == project_id)
     if board_id:
-        query = query.filter(Task.board_id == board_id)
+        stmt = stmt.where(Task.board_id == board_id)
     if priority:
-        query = query.filter(Task.priority == priority)
+        stmt = stmt.where(Task.priority == priority)
     if assigned_user_id:
-        query = query.filter(Task.assigned_user_id == assigned_user_id)
+        stmt = stmt.where(Task.assigned_user_id == assigned_user_id)
+    if visible_to is not None:
+        # Semi-join on the (user_id, project_id) index of project_members
+        stmt = stmt.where(Task.project_id.in_(
+            select(project_members.c.project_id).where(project_members.c.user_id == visible_to)
+        ))
     if search:
-        query = query.filter(Task.title.ilike(f"%{search}%"))
+        stmt = search_service.apply_search(stmt, db, search, order_by_rank)
+    return stmt
 
-    if sort_by:
-        sort_column = getattr(Task, sort_by)
-        sort_column = sort_column.desc() if sort_order == "desc" else sort_column.asc()
-        query = query.order_by(sort_column)
+def _after_cursor(sort_column, last_value, last_id: int, descending: bool):
+    id_after = Task.id < last_id if descending else Task.id > last_id
+    if sort_column is None:
+        return id_after
+    if last_value is None:
+        # Already inside the trailing NULL block, only the id tiebreaker is left
+        return and_(sort_column.is_(None), id_after)
+    value_after = sort_column < last_value if descending else sort_column > last_value
+    return or_(
+        value_after,
+        and_(sort_column == last_value, id_after),
+        sort_column.is_(None),
+    )
 
-    return query.offset(offset).limit(limit).all()
+def _encode_cursor(sort_by, sort_order, value, task_id: int) -> str:
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    payload = {"s": sort_by, "o": sort_order, "v": value, "i": task_id}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
 
-# Partial update (PATCH) allows frontend to modify individual fields
-# without re-sending the entire task object.
-def update_task_partial(task_id: int, fields: dict, db: Session, user: User):
-    task = db.query(Task).filter(Task.id == task_id).first()
-    if not task:
+def _decode_cursor(cursor: str, sort_by, sort_order):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        value, task_id = payload["v"], int(payload["i"])
+        if payload["s"] != sort_by or payload["o"] != sort_order:
+            raise ValueError("cursor does not match sort parameters")
+        if value is not None and sort_by in ("due_date", "created_at"):
+            value = datetime.fromisoformat(value)
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return value, task_id
+
+# Mutations. A write checks access in the statement itself (permission_service.task_access_clause
+# or project_access_clause in its WHERE clause) and returns the written row with RETURNING, so a
+# toggle is one UPDATE instead of loading the task, looking up the role, updating and reloading
+# it after the commit. Only when nothing was written does a second query tell a missing task (404)
+# from a denied one (403).
+# Updates that need the previous values (stats counters, the changed fields of the event) load
+# the row together with the access check in one locking SELECT and write it with the flush.
+# Written objects are expunged before the commit, which would otherwise expire them and the
+# response would reload them.
+
+def insert_task_statement(values: dict, user: Principal) -> Insert:
+    source = select(*(literal(value, Task.__table__.c[name].type) for name, value in values.items())).where(
+        permission_service.project_access_clause(user.id, values["project_id"], ProjectRole.editor)
+    )
+    return insert(Task).from_select(list(values), source).returning(Task)
+
+def toggle_statement(task_id: int, user: Principal) -> Update:
+    return (
+        update(Task)
+        .where(Task.id == task_id, permission_service.task_access_clause(user, Task))
+        # Reopening the task makes it eligible for another reminder (see _reset_reminder)
+        .values(completed=Task.completed.is_not(True),
+                reminder_sent_at=case((Task.completed == True, None), else_=Task.reminder_sent_at))
+        .returning(Task)
+        .execution_options(synchronize_session=False)
+    )
+
+def duplicate_task_statement(task_id: int, user: Principal) -> Insert:
+    copied = ("description", "due_date", "project_id", "board_id", "priority", "assigned_user_id")
+    source = select(Task.title + " (Copy)", *(getattr(Task, field) for field in copied)).where(
+        Task.id == task_id, permission_service.project_access_clause(user.id, Task.project_id, ProjectRole.editor)
+    )
+    return insert(Task).from_select(["title", *copied], source).returning(Task)
+
+# The new comment and the project of its task
+def insert_comment_statement(task_id: int, content: str, user: Principal) -> Insert:
+    source = select(Task.id, literal(user.id), literal(content, String)).where(
+        Task.id == task_id, permission_service.task_access_clause(user, Task)
+    )
+    # RETURNING clauses are not correlated by SQLAlchemy, the comment's column is referenced by name
+    task = aliased(Task)
+    project_id = select(task.project_id).where(task.id == literal_column("task_comments.task_id")).scalar_subquery()
+    return insert(TaskComment).from_select(["task_id", "user_id", "content"], source).returning(TaskComment, project_id)
+
+# The task with one boolean column per access check, locked until the commit
+def locked_task_statement(task_id: int, *checks) -> Select:
+    return select(Task, *checks).where(Task.id == task_id).with_for_update(of=Task)
+
+def editor_access(user: Principal):
+    return permission_service.task_access_clause(user, Task).label("allowed")
+
+# Moving a task (fields with a new project_id) also needs editor rights on the target project
+def move_access(user: Principal, fields: dict):
+    if "project_id" not in fields:
+        return true().label("move_allowed")
+    project_id = fields["project_id"]
+    return or_(
+        Task.project_id == project_id,
+        permission_service.project_access_clause(user.id, project_id, ProjectRole.editor),
+    ).label("move_allowed")
+
+# The task of a row of locked_task_statement(task_id, editor_access(...), move_access(...))
+def checked_move(row) -> Task:
+    task = checked_task(row)
+    if not row.move_allowed:
+        raise HTTPException(status_code=403, detail="No access to target project")
+    return task
+
+# The task of a locked_task_statement row whose first check passed
+def checked_task(row, detail: str = "No access to this task") -> Task:
+    if row is None:
         raise HTTPException(status_code=404, detail="Task not found")
+    if not row[1]:
+        raise HTTPException(status_code=403, detail=detail)
+    return row[0]
 
-    if not has_task_access(task, user, db):
-        raise HTTPException(status_code=403, detail="No access to this task")
+def task_write_error(found: bool, detail: str = "No access to this task") -> HTTPException:
+    if not found:
+        return HTTPException(status_code=404, detail="Task not found")
+    return HTTPException(status_code=403, detail=detail)
 
-    for key, value in fields.items():
-        if hasattr(task, key):
-            setattr(task, key, value)
+def _raise_write_error(db: Session, task_id: int, detail: str = "No access to this task"):
+    raise task_write_error(db.scalar(select(Task.id).where(Task.id == task_id)) is not None, detail)
 
+def commit_detached(db: Session, *objects):
+    db.flush()
+    for obj in objects:
+        db.expunge(obj)
     db.commit()
-    db.refresh(task)
+
+# Partial update (PATCH) allows frontend to modify individual fields
+# without re-sending the entire task object.
+def update_task_partial(task_id: int, fields: dict, db: Session, user: Principal):
+    task = checked_move(db.execute(
+        locked_task_statement(task_id, editor_access(user), move_access(user, fields))
+    ).first())
+
+    before = stats_service.snapshot(task)
+    changed = apply_partial_update(task, fields)
+    if touches_search_document(fields):
+        db.flush()
+        search_service.index_task(db, task.id)
+    sync_service.record_moves(db, sync_service.moves(before, task))
+    commit_detached(db, task)
+    http_cache.bump_project_versions([before.project_id, task.project_id])
+    stats_service.record([(before, stats_service.snapshot(task))])
+    _emit_task_updated(task, changed)
     return task
 
-def update_task(task_id: int, task_data: TaskCreate, db: Session, user: User):
-    task = db.query(Task).filter(Task.id == task_id).first()
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
+# Sets the given fields on the task (unknown and internal fields are ignored) and
+# returns the names of the fields whose value changed
+def apply_partial_update(task: Task, fields: dict) -> list[str]:
+    changed = []
+    for key, value in fields.items():
+        if hasattr(task, key) and key not in _INTERNAL_FIELDS:
+            if getattr(task, key) != value:
+                changed.append(key)
+            setattr(task, key, value)
+    _reset_reminder(task, changed)
+    return changed
 
-    if not has_task_access(task, user, db):
-        raise HTTPException(status_code=403, detail="No access to this task")
+# True if changing these fields requires refreshing the task's search document
+def touches_search_document(fields) -> bool:
+    return bool(_SEARCHABLE_FIELDS & set(fields))
+
+def update_task(task_id: int, task_data: TaskCreate, db: Session, user: Principal):
+    task = checked_move(db.execute(
+        locked_task_statement(task_id, editor_access(user), move_access(user, {"project_id": task_data.project_id}))
+    ).first())
 
+    before = stats_service.snapshot(task)
+    changed = []
     for field, value in task_data.model_dump().items():
+        if getattr(task, field) != value:
+            changed.append(field)
         setattr(task, field, value)
+    _reset_reminder(task, changed)
 
-    db.commit()
-    db.refresh(task)
+    db.flush()
+    search_service.index_task(db, task.id)
+    sync_service.record_moves(db, sync_service.moves(before, task))
+    commit_detached(db, task)
+    http_cache.bump_project_versions([before.project_id, task.project_id])
+    stats_service.record([(before, stats_service.snapshot(task))])
+    _emit_task_updated(task, changed)
     return task
 
+# A new due date or reopening the task makes it eligible for another reminder
+def _reset_reminder(task: Task, changed: list[str]):
+    if "due_date" in changed or ("completed" in changed and not task.completed):
+        task.reminder_sent_at = None
+
+def _emit_task_updated(task: Task, changed: list[str]):
+    if changed:
+        event_publisher.emit(events.TASK_UPDATED, task.project_id, task.id,
+                             {field: getattr(task, field) for field in changed})
+    if "due_date" in changed or "completed" in changed:
+        reminders_service.schedule_task_reminder(task)
+
 # This function helps users quickly mark tasks done/undone in UI, improving productivity tracking.
+# One UPDATE flips the flag, checks access and returns the task.
 def toggle_completion(task_id: int, db: Session, user):
-    task = db.query(Task).filter(Task.id == task_id).first()
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-
-    if not has_task_access(task, user, db):
-        raise HTTPException(status_code=403, detail="No access to this task")
+    task = db.scalar(toggle_statement(task_id, user))
+    if task is None:
+        _raise_write_error(db, task_id)
 
-    task.completed = not task.completed
-    db.commit()
-    db.refresh(task)
+    commit_detached(db, task)
+    after = stats_service.snapshot(task)
+    http_cache.bump_project_versions([task.project_id])
+    stats_service.record([(after._replace(completed=not after.completed), after)])
+    _emit_task_updated(task, ["completed"])
     return {"task_id": task.id, "completed": task.completed}
 
+# Assigns a task to a member of its project, the caller needs the editor role
+def assign_task(task_id: int, assignee_id: int, db: Session, user: Principal):
+    row = db.execute(locked_task_statement(
+        task_id,
+        permission_service.project_access_clause(user.id, Task.project_id, ProjectRole.editor).label("allowed"),
+        permission_service.project_access_clause(assignee_id, Task.project_id, ProjectRole.viewer).label("member"),
+    )).first()
+    task = checked_task(row, "No access to this project")
+    if not row.member:
+        raise HTTPException(status_code=400, detail="Target user is not a project member")
+
+    before = stats_service.snapshot(task)
+    task.assigned_user_id = assignee_id
+    commit_detached(db, task)
+    http_cache.bump_project_versions([task.project_id])
+    stats_service.record([(before, stats_service.snapshot(task))])
+    event_publisher.emit(events.TASK_UPDATED, task.project_id, task.id, {"assigned_user_id": assignee_id})
+    return task
+
+# Copies a task within its project, the caller needs the editor role
+def duplicate_task(task_id: int, db: Session, user: Principal) -> Task:
+    copy = db.scalar(duplicate_task_statement(task_id, user))
+    if copy is None:
+        _raise_write_error(db, task_id, "No access to task")
+
+    search_service.index_task(db, copy.id)
+    commit_detached(db, copy)
+    http_cache.bump_project_versions([copy.project_id])
+    stats_service.record([(None, stats_service.snapshot(copy))])
+    event_publisher.emit(events.TASK_CREATED, copy.project_id, copy.id, events.task_snapshot(copy))
+    reminders_service.schedule_task_reminder(copy)
+    return copy
 
 def delete_task(task_id: int, db: Session, user):
     task = db.query(Task).filter(Task.id == task_id).first()
@@ -108,17 +444,23 @@ def delete_task(task_id: int, db: Session, user):
     if not has_task_access(task, user, db):
         raise HTTPException(status_code=403, detail="No access to this task")
 
+    project_id = task.project_id
+    before = stats_service.snapshot(task)
     db.delete(task)
+    sync_service.record_removals(db, {task_id: project_id})
     db.commit()
+    http_cache.bump_project_versions([project_id])
+    stats_service.record([(before, None)])
+    search_service.remove_task(task_id)
+    event_publisher.emit(events.TASK_DELETED, project_id, task_id)
+    reminders_service.unschedule_task_reminder(task_id)
     return {"detail": "Task deleted"}
 
 
-from datetime import datetime, timezone
-
 # Returns all uncompleted tasks that are due today for the current user
 def get_tasks_due_today(db: Session, user):
     today = datetime.now(timezone.utc).date()
-    user_projects = [p.id for p in user.projects]
+    user_projects = list(user.project_ids)
 
     return db.query(Task).filter(
         Task.due_date >= datetime.combine(today, datetime.min.time()).astimezone(timezone.utc),
@@ -129,28 +471,23 @@ def get_tasks_due_today(db: Session, user):
 
 # Adds a new comment to the given task if the user has access
 def add_comment_to_task(task_id: int, content: str, db: Session, user):
-    task = db.query(Task).filter(Task.id == task_id).first()
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
+    row = db.execute(insert_comment_statement(task_id, content, user)).first()
+    if row is None:
+        _raise_write_error(db, task_id)
 
-    if not has_task_access(task, user, db):
-        raise HTTPException(status_code=403, detail="No access to this task")
-
-    comment = TaskComment(task_id=task.id, user_id=user.id, content=content)
-    db.add(comment)
-    db.commit()
-    db.refresh(comment)
+    comment, project_id = row
+    search_service.index_task(db, task_id)
+    commit_detached(db, comment)
+    http_cache.bump_project_versions([project_id])
+    event_publisher.emit(events.TASK_COMMENTED, project_id, task_id, {
+        "id": comment.id,
+        "user_id": comment.user_id,
+        "content": comment.content,
+        "created_at": comment.created_at,
+    })
     return comment
 
-def has_task_access(task: Task, user: User, db: Session) -> bool:
-    # project member access
-    project = db.query(Project).filter(Project.id == task.project_id).first()
-    if user in project.members:
-        return True
-    # project owner access
-    if project.owner_id == user.id:
-        return True
-    # assigned editor access
-    if task.assigned_user_id == user.id:
-        return True
-    return False
\ No newline at end of file
+# Editors and owners of the project (and the task's assignee) may change a task,
+# viewers may only read it
+def has_task_access(task: Task, user: Principal, db: Session, minimum: ProjectRole = ProjectRole.editor) -> bool:
+    return permission_service.can_access_task(db, user, task, minimum)
@@ -0,0 +1,146 @@
+# Async variants of the hot task_service functions, used by the routes in
+# task_api_async/project_api_async when DB_ASYNC is enabled.
+# Queries are built by the same statement builders as the sync service and executed on an
+# AsyncSession, so filtering, search and pagination behave identically in both modes.
+# Search index maintenance runs through AsyncSession.run_sync, Redis reminder scheduling
+# through the thread pool.
+
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from app.core.principal_cache import Principal
+from app.models.task_model import Task
+from app.models.enums_model import ProjectRole
+from app.schemas.task_schema import TaskCreate
+from app.core import events, http_cache
+from app.core.events import event_publisher
+from app.services import search_service, reminders_service, task_service, permission_service, stats_service, sync_service
+from datetime import datetime, timezone
+
+# Writes use the statements of task_service's mutation section. AsyncSession never expires
+# on commit, so the returned rows stay loaded without expunging them.
+async def create_task(task_data: TaskCreate, db: AsyncSession, user: Principal) -> Task:
+    db_task = await db.scalar(task_service.insert_task_statement(task_data.model_dump(), user))
+    if db_task is None:
+        raise HTTPException(status_code=403, detail="No access to project")
+
+    await db.run_sync(search_service.index_task, db_task.id)
+    await db.commit()
+    await run_in_threadpool(http_cache.bump_project_versions, [db_task.project_id])
+    await run_in_threadpool(stats_service.record, [(None, stats_service.snapshot(db_task))])
+
+    event_publisher.emit(events.TASK_CREATED, db_task.project_id, db_task.id, events.task_snapshot(db_task))
+    await run_in_threadpool(reminders_service.schedule_task_reminder, db_task)
+    return db_task
+
+async def query_tasks(db: AsyncSession, completed=None, project_id=None, board_id=None, priority=None,
+                      assigned_user_id=None, sort_by=None, sort_order="asc", limit=20, offset=0, search=None,
+                      visible_to=None, as_rows=False):
+    if search:
+        await db.run_sync(search_service.prepare_search)
+    stmt = task_service.query_tasks_statement(db, completed, project_id, board_id, priority, assigned_user_id,
+                                              sort_by, sort_order, limit, offset, search, visible_to)
+    if as_rows:
+        return (await db.execute(task_service.task_out_rows(stmt))).all()
+    return (await db.scalars(stmt)).all()
+
+async def query_tasks_page(db: AsyncSession, completed=None, project_id=None, board_id=None, priority=None,
+                           assigned_user_id=None, sort_by=None, sort_order="asc", limit=20, cursor=None,
+                           search=None, visible_to=None, as_rows=False) -> tuple[list[Task], str | None]:
+    if search:
+        await db.run_sync(search_service.prepare_search)
+    stmt = task_service.query_tasks_page_statement(db, completed, project_id, board_id, priority, assigned_user_id,
+                                                   sort_by, sort_order, limit, cursor, search, visible_to)
+    if as_rows:
+        rows = (await db.execute(task_service.task_out_rows(stmt))).all()
+    else:
+        rows = (await db.scalars(stmt)).all()
+    return task_service.finish_task_page(rows, sort_by, sort_order, limit)
+
+# Counting (and the planner estimate) reuse the sync implementation on the session's connection
+async def count_tasks(db: AsyncSession, completed=None, project_id=None, board_id=None, priority=None,
+                      assigned_user_id=None, search=None, visible_to=None, estimate=False) -> int:
+    return await db.run_sync(task_service.count_tasks, completed, project_id, board_id, priority,
+                             assigned_user_id, search, visible_to, estimate)
+
+# TaskOut row tuples of a board for the fast JSON path
+async def get_task_rows_by_board(board_id: int, db: AsyncSession):
+    return (await db.execute(select(*task_service.TASK_OUT_COLUMNS).where(Task.board_id == board_id))).all()
+
+async def update_task_partial(task_id: int, fields: dict, db: AsyncSession, user: Principal):
+    row = (await db.execute(task_service.locked_task_statement(
+        task_id, task_service.editor_access(user), task_service.move_access(user, fields)
+    ))).first()
+    task = task_service.checked_move(row)
+
+    before = stats_service.snapshot(task)
+    changed = task_service.apply_partial_update(task, fields)
+    if task_service.touches_search_document(fields):
+        await db.flush()
+        await db.run_sync(search_service.index_task, task.id)
+    await db.run_sync(sync_service.record_moves, sync_service.moves(before, task))
+    await db.commit()
+    await run_in_threadpool(http_cache.bump_project_versions, [before.project_id, task.project_id])
+    await run_in_threadpool(stats_service.record, [(before, stats_service.snapshot(task))])
+    await _emit_task_updated(task, changed)
+    return task
+
+async def toggle_completion(task_id: int, db: AsyncSession, user: Principal):
+    task = await db.scalar(task_service.toggle_statement(task_id, user))
+    if task is None:
+        found = await db.scalar(select(Task.id).where(Task.id == task_id)) is not None
+        raise task_service.task_write_error(found)
+
+    await db.commit()
+    after = stats_service.snapshot(task)
+    await run_in_threadpool(http_cache.bump_project_versions, [task.project_id])
+    await run_in_threadpool(stats_service.record, [(after._replace(completed=not after.completed), after)])
+    await _emit_task_updated(task, ["completed"])
+    return {"task_id": task.id, "completed": task.completed}
+
+async def delete_task(task_id: int, db: AsyncSession, user: Principal):
+    task = await _get_accessible_task(task_id, db, user)
+
+    project_id = task.project_id
+    before = stats_service.snapshot(task)
+    await db.delete(task)
+    await db.run_sync(sync_service.record_removals, {task_id: project_id})
+    await db.commit()
+    await run_in_threadpool(http_cache.bump_project_versions, [project_id])
+    await run_in_threadpool(stats_service.record, [(before, None)])
+    search_service.remove_task(task_id)
+    event_publisher.emit(events.TASK_DELETED, project_id, task_id)
+    await run_in_threadpool(reminders_service.unschedule_task_reminder, task_id)
+    return {"detail": "Task deleted"}
+
+async def get_tasks_due_today(db: AsyncSession, user: Principal):
+    today = datetime.now(timezone.utc).date()
+
+    stmt = select(Task).where(
+        Task.due_date >= datetime.combine(today, datetime.min.time()).astimezone(timezone.utc),
+        Task.due_date <= datetime.combine(today, datetime.max.time()).astimezone(timezone.utc),
+        Task.project_id.in_(list(user.project_ids)),
+        Task.completed == False
+    )
+    return (await db.scalars(stmt)).all()
+
+async def has_task_access(task: Task, user: Principal, db: AsyncSession,
+                          minimum: ProjectRole = ProjectRole.editor) -> bool:
+    return await permission_service.can_access_task_async(db, user, task, minimum)
+
+async def _get_accessible_task(task_id: int, db: AsyncSession, user: Principal) -> Task:
+    task = await db.get(Task, task_id)
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    if not await has_task_access(task, user, db):
+        raise HTTPException(status_code=403, detail="No access to this task")
+    return task
+
+async def _emit_task_updated(task: Task, changed: list[str]):
+    if changed:
+        event_publisher.emit(events.TASK_UPDATED, task.project_id, task.id,
+                             {field: getattr(task, field) for field in changed})
+    if "due_date" in changed or "completed" in changed:
+        await run_in_threadpool(reminders_service.schedule_task_reminder, task)
@@ -0,0 +1,12 @@
+# Benchmarks run against DATABASE_URL (an in-memory SQLite database if unset); the remaining
+# settings get throwaway defaults so no .env is needed.
+
+import os
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+for name, value in {
+    "POSTGRES_USER": "bench", "POSTGRES_PASSWORD": "bench", "POSTGRES_DB": "bench",
+    "REDIS_URL": "redis://localhost:6379/0", "SECRET_KEY": "bench",
+    "CELERY_BROKER_URL": "memory://", "CELERY_RESULT_BACKEND": "cache+memory://",
+}.items():
+    os.environ.setdefault(name, value)
@@ -0,0 +1,28 @@
+# In-process stand-ins for the benchmark scripts that drive the whole app. Import this module
+# before any app module: the app creates its engine and Redis clients at import time.
+#  - an in-memory SQLite database exists once per connection while the app runs on other
+#    threads, so it is replaced by a temporary file
+#  - Redis is an in-process fakeredis server, unless BENCHMARK_REDIS=real uses REDIS_URL
+
+import os
+import tempfile
+
+import redis
+import redis.asyncio
+
+import benchmarks  # noqa: F401 (environment defaults)
+
+if os.environ["DATABASE_URL"] in ("sqlite://", "sqlite:///:memory:"):
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='todo-bench-')}/bench.db"
+
+REAL_REDIS = os.environ.get("BENCHMARK_REDIS") == "real"
+
+if not REAL_REDIS:
+    import fakeredis
+
+    _fake_server = fakeredis.FakeServer()
+    redis.Redis.from_url = classmethod(lambda cls, url, **kwargs: fakeredis.FakeRedis(server=_fake_server, **kwargs))
+    redis.asyncio.Redis.from_url = classmethod(
+        lambda cls, url, **kwargs: fakeredis.FakeAsyncRedis(server=_fake_server, **kwargs)
+    )
+    redis.asyncio.from_url = lambda url, **kwargs: fakeredis.FakeAsyncRedis(server=_fake_server, **kwargs)
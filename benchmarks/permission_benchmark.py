@@ -0,0 +1,82 @@
+# Micro-benchmark for project authorization with large memberships:
+#   legacy - load the project and test `user in project.members` (loads every member row)
+#   role   - permission_service.project_role, one indexed lookup on project_members
+#   memo   - repeated checks within one request, answered from the per-request memo
+#
+#   python -m benchmarks.permission_benchmark --members 1000 10000 50000
+
+import argparse
+import time
+
+from sqlalchemy import delete, insert
+
+from app.db.database import SessionLocal, engine
+from app.db.migrations import run_migrations
+from app.models import Project, ProjectRole, User, project_members
+from app.services import permission_service
+
+
+def populate(members: int) -> tuple[int, int]:
+    with SessionLocal() as db:
+        db.execute(delete(project_members))
+        db.execute(delete(Project))
+        db.execute(delete(User))
+        db.execute(insert(User), [
+            {"id": i, "username": f"user{i}", "hashed_password": "x", "role": "user"} for i in range(1, members + 1)
+        ])
+        db.execute(insert(Project).values(id=1, name="bench", owner_id=1))
+        db.execute(insert(project_members), [
+            {"user_id": i, "project_id": 1, "role": ProjectRole.editor} for i in range(1, members + 1)
+        ])
+        db.commit()
+    # Check the last member, the worst case for a list scan
+    return members, 1
+
+
+def timed(check, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        check()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def run(members: int, iterations: int):
+    user_id, project_id = populate(members)
+
+    def legacy():
+        with SessionLocal() as db:
+            project = db.get(Project, project_id)
+            assert db.get(User, user_id) in project.members
+
+    def role():
+        with SessionLocal() as db:
+            assert permission_service.project_role(db, user_id, project_id) == ProjectRole.editor
+
+    memo_db = SessionLocal()
+    permission_service.project_role(memo_db, user_id, project_id)
+
+    def memo():
+        assert permission_service.project_role(memo_db, user_id, project_id) == ProjectRole.editor
+
+    results = {
+        "legacy": timed(legacy, max(1, iterations // 10)),
+        "role": timed(role, iterations),
+        "memo": timed(memo, iterations * 10),
+    }
+    memo_db.close()
+    print(f"{members:>8} members  " + "  ".join(f"{name} {us:10.1f} µs" for name, us in results.items()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--members", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    run_migrations(engine)
+    for members in args.members:
+        run(members, args.iterations)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+# Statement counts of the single-row write endpoints, checked against a budget.
+# Writes run as single statements that check access themselves (see the mutation section in
+# app/services/task_service.py); this check keeps it that way. Every endpoint is called once
+# with access and must stay within its budget of SQL statements (COMMIT not counted, principal
+# already cached). Denied and missing targets must still answer 403/404 (400 for assigning a
+# non-member). On PostgreSQL, writes that change a task's search document run one more
+# statement to reindex it.
+#
+#   python -m benchmarks.query_count_check
+#
+# Exits with 1 if an endpoint needs more statements than budgeted or answers with the wrong status.
+
+import sys
+import threading
+
+# Installs the in-process database and Redis, so it comes before the app modules
+from benchmarks import inprocess  # noqa: F401
+
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, event, insert
+from sqlalchemy.engine import Engine
+
+from app.core.security import create_access_token
+from app.db.database import Base, SessionLocal, engine
+from app.main import app
+from app.models import Board, Project, ProjectRole, User, project_members
+from app.models.task_model import Task
+
+MISSING = 10 ** 9
+
+
+class StatementLog:
+    def __init__(self):
+        self.statements: list[str] = []
+        self._lock = threading.Lock()
+        event.listen(Engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def _after_cursor_execute(self, conn, cursor, statement, *args):
+        with self._lock:
+            self.statements.append(" ".join(statement.split()))
+
+    def take(self) -> list[str]:
+        with self._lock:
+            statements, self.statements = self.statements, []
+        return statements
+
+
+log = StatementLog()
+
+
+def seed() -> dict:
+    with SessionLocal() as db:
+        for table in reversed(Base.metadata.sorted_tables):
+            db.execute(delete(table))
+        users = {
+            name: db.scalar(insert(User).values(username=name, hashed_password="x", role="user").returning(User.id))
+            for name in ("owner", "editor", "viewer", "outsider", "assignee")
+        }
+        project_id = db.scalar(insert(Project).values(name="Counted", owner_id=users["owner"]).returning(Project.id))
+        db.execute(insert(project_members), [
+            {"user_id": users["owner"], "project_id": project_id, "role": ProjectRole.owner},
+            {"user_id": users["editor"], "project_id": project_id, "role": ProjectRole.editor},
+            {"user_id": users["viewer"], "project_id": project_id, "role": ProjectRole.viewer},
+            {"user_id": users["assignee"], "project_id": project_id, "role": ProjectRole.viewer},
+        ])
+        board_id = db.scalar(insert(Board).values(name="Board", project_id=project_id).returning(Board.id))
+        db.commit()
+    return {"users": users, "project_id": project_id, "board_id": board_id}
+
+
+def main():
+    ids = seed()
+    users, project_id, board_id = ids["users"], ids["project_id"], ids["board_id"]
+    reindex = 1 if engine.dialect.name == "postgresql" else 0
+    failures = []
+
+    with TestClient(app) as client:
+        headers = {name: {"Authorization": f"Bearer {create_access_token({'sub': name})}"} for name in users}
+        # Fill the principal cache, token verification is not part of the budgets
+        for name in users:
+            client.get("/auth/users/me", headers=headers[name])
+        task = {"title": "Counted", "due_date": "2040-01-01T00:00:00", "project_id": project_id, "board_id": board_id}
+        task_id = client.post("/tasks/", json=task, headers=headers["editor"]).json()["id"]
+
+        # (name, method, path, json body, user, expected status, statement budget)
+        calls = [
+            ("create task", "POST", "/tasks/", task, "editor", 200, 1 + reindex),
+            ("create task, viewer", "POST", "/tasks/", task, "viewer", 403, None),
+            ("create task, missing project", "POST", "/tasks/", {**task, "project_id": MISSING}, "owner", 403, None),
+            ("toggle", "PUT", f"/tasks/{task_id}/toggle", None, "editor", 200, 1),
+            ("toggle, viewer", "PUT", f"/tasks/{task_id}/toggle", None, "viewer", 403, None),
+            ("toggle, outsider", "PUT", f"/tasks/{task_id}/toggle", None, "outsider", 403, None),
+            ("toggle, missing task", "PUT", f"/tasks/{MISSING}/toggle", None, "editor", 404, None),
+            ("patch", "PATCH", f"/tasks/{task_id}", {"priority": "high"}, "editor", 200, 2),
+            ("patch title", "PATCH", f"/tasks/{task_id}", {"title": "Renamed"}, "editor", 200, 2 + reindex),
+            ("patch, viewer", "PATCH", f"/tasks/{task_id}", {"priority": "low"}, "viewer", 403, None),
+            ("patch, missing task", "PATCH", f"/tasks/{MISSING}", {"priority": "low"}, "editor", 404, None),
+            ("update", "PUT", f"/tasks/{task_id}", {**task, "title": "Updated"}, "owner", 200, 2 + reindex),
+            ("update, outsider", "PUT", f"/tasks/{task_id}", task, "outsider", 403, None),
+            ("comment", "POST", f"/tasks/{task_id}/comments", "A comment", "editor", 200, 1 + reindex),
+            ("comment, viewer", "POST", f"/tasks/{task_id}/comments", "A comment", "viewer", 403, None),
+            ("comment, missing task", "POST", f"/tasks/{MISSING}/comments", "A comment", "editor", 404, None),
+            ("assign", "PUT", f"/tasks/{task_id}/assign/{users['assignee']}", None, "editor", 200, 2),
+            ("assign, non-member", "PUT", f"/tasks/{task_id}/assign/{users['outsider']}", None, "editor", 400, None),
+            ("assign, viewer", "PUT", f"/tasks/{task_id}/assign/{users['editor']}", None, "viewer", 403, None),
+            ("assign, missing task", "PUT", f"/tasks/{MISSING}/assign/{users['editor']}", None, "editor", 404, None),
+            ("duplicate", "POST", f"/tasks/{task_id}/duplicate", None, "editor", 200, 1 + reindex),
+            ("duplicate, viewer", "POST", f"/tasks/{task_id}/duplicate", None, "viewer", 403, None),
+            ("duplicate, missing task", "POST", f"/tasks/{MISSING}/duplicate", None, "editor", 404, None),
+            ("assignee toggles", "PUT", f"/tasks/{task_id}/toggle", None, "assignee", 200, 1),
+            ("create board", "POST", "/boards/", {"name": "New", "project_id": project_id}, "editor", 200, 1),
+            ("rename board", "PUT", f"/boards/{board_id}", {"name": "Renamed", "project_id": project_id}, "editor", 200, 1),
+            ("rename board, viewer", "PUT", f"/boards/{board_id}", {"name": "No", "project_id": project_id}, "viewer", 403, None),
+            ("rename board, missing", "PUT", f"/boards/{MISSING}", {"name": "No", "project_id": project_id}, "editor", 404, None),
+        ]
+        for name, method, path, body, user, status, budget in calls:
+            log.take()
+            response = client.request(method, path, json=body, headers=headers[user])
+            statements = log.take()
+            ok = response.status_code == status and (budget is None or len(statements) <= budget)
+            print(f"{'ok  ' if ok else 'FAIL'} {name:<30} {response.status_code}  {len(statements)} statements"
+                  f"{'' if budget is None else f' (budget {budget})'}")
+            if not ok:
+                failures.append(name)
+                for statement in statements:
+                    print(f"       {statement[:200]}")
+
+        with SessionLocal() as db:
+            toggled = db.get(Task, task_id)
+            # Toggled by the editor and back by the assignee, assigned, renamed by PUT
+            if toggled.completed or toggled.assigned_user_id != users["assignee"] or toggled.title != "Updated":
+                failures.append("final task state")
+                print(f"FAIL final task state: completed={toggled.completed} "
+                      f"assigned_user_id={toggled.assigned_user_id} title={toggled.title}")
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
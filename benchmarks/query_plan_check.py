@@ -0,0 +1,151 @@
+# Query plans of the indexed lookups, checked against the indexes added for them (migrations 2
+# and 5). Every lookup is run through the app as a client would trigger it; the SQL statements it
+# sends are captured and explained again (EXPLAIN QUERY PLAN on SQLite, EXPLAIN on PostgreSQL,
+# where sequential scans are disabled for the explain so the small seeded tables don't hide
+# a missing index). A lookup passes if one of its statements is planned with the expected index.
+#
+#   python -m benchmarks.query_plan_check
+#
+# Exits with 1 if a lookup doesn't use its index.
+
+import sys
+import threading
+from datetime import datetime, timedelta, timezone
+
+# Installs the in-process database and Redis, so it comes before the app modules
+from benchmarks import inprocess  # noqa: F401
+
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, event, insert, select, text
+from sqlalchemy.engine import Engine
+
+from app.core.security import create_access_token
+from app.db.database import Base, SessionLocal, engine
+from app.main import app
+from app.models import Board, Project, ProjectRole, User, project_members
+from app.models.task_model import Task, TaskComment
+from app.services import reminders_service
+
+PROJECTS = 20
+TASKS_PER_PROJECT = 100
+
+
+class StatementLog:
+    def __init__(self):
+        self.statements: list[tuple[str, object]] = []
+        self._lock = threading.Lock()
+        event.listen(Engine, "before_cursor_execute", self._before_cursor_execute)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith("SELECT"):
+            with self._lock:
+                self.statements.append((statement, parameters))
+
+    def take(self) -> list[tuple[str, object]]:
+        with self._lock:
+            statements, self.statements = self.statements, []
+        return statements
+
+
+log = StatementLog()
+
+
+def seed() -> dict:
+    now = datetime.now(timezone.utc)
+    with SessionLocal() as db:
+        for table in reversed(Base.metadata.sorted_tables):
+            db.execute(delete(table))
+        users = [
+            db.scalar(insert(User).values(username=f"planned{i}", hashed_password="x", role="user").returning(User.id))
+            for i in range(PROJECTS)
+        ]
+        projects, boards = [], []
+        for i, owner_id in enumerate(users):
+            project_id = db.scalar(insert(Project).values(name=f"Planned {i}", owner_id=owner_id).returning(Project.id))
+            projects.append(project_id)
+            boards.append(db.scalar(insert(Board).values(name="Board", project_id=project_id).returning(Board.id)))
+            db.execute(insert(project_members), [
+                {"user_id": user_id, "project_id": project_id,
+                 "role": ProjectRole.owner if user_id == owner_id else ProjectRole.viewer}
+                for user_id in users[i:i + 3]
+            ])
+        db.execute(insert(Task), [
+            {"title": f"Task {n}", "project_id": project_id, "board_id": board_id, "completed": n % 3 == 0,
+             "due_date": now + timedelta(hours=n - TASKS_PER_PROJECT // 2), "assigned_user_id": users[n % PROJECTS],
+             "priority": "medium"}
+            for project_id, board_id in zip(projects, boards) for n in range(TASKS_PER_PROJECT)
+        ])
+        task_ids = db.scalars(select(Task.id).limit(50)).all()
+        db.execute(insert(TaskComment), [
+            {"task_id": task_id, "user_id": users[0], "content": "Planned"} for task_id in task_ids for _ in range(3)
+        ])
+        db.commit()
+    if engine.dialect.name == "postgresql":
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("ANALYZE"))
+    return {"users": users, "project_id": projects[0], "board_id": boards[0], "task_id": task_ids[0]}
+
+
+def explain(statement: str, parameters) -> str:
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        if engine.dialect.name == "postgresql":
+            cursor.execute("SET enable_seqscan = off")
+            cursor.execute(f"EXPLAIN {statement}", parameters)
+            return "\n".join(row[0] for row in cursor.fetchall())
+        cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        return "\n".join(row[-1] for row in cursor.fetchall())
+    finally:
+        connection.rollback()
+        connection.close()
+
+
+def main():
+    ids = seed()
+    user_id, project_id, board_id, task_id = ids["users"][0], ids["project_id"], ids["board_id"], ids["task_id"]
+    failures = []
+
+    with TestClient(app) as client:
+        headers = {"Authorization": f"Bearer {create_access_token({'sub': 'planned0'})}"}
+        client.get("/auth/users/me", headers=headers)
+
+        def get(path: str):
+            return lambda: client.get(path, headers=headers).raise_for_status()
+
+        # (name, lookup, expected index)
+        checks = [
+            ("query_tasks by project, open, by due date",
+             get(f"/tasks/?project_id={project_id}&completed=false&sort_by=due_date"), "ix_tasks_project_completed_due"),
+            ("query_tasks by project, newest first",
+             get(f"/tasks/?project_id={project_id}&sort_by=created_at&sort_order=desc"), "ix_tasks_project_created"),
+            ("query_tasks by board", get(f"/tasks/?board_id={board_id}"), "ix_tasks_board_id"),
+            ("query_tasks by assignee, open",
+             get(f"/tasks/?assigned_user_id={user_id}&completed=false"), "ix_tasks_assigned_completed"),
+            ("query_tasks of my projects", get("/tasks/?scope=mine"), "ix_project_members_user_project"),
+            ("reminder scan", reminders_service.send_reminders, "ix_tasks_open_due_date"),
+            ("reminder index rebuild", reminders_service.rebuild_reminder_index, "ix_tasks_open_due_date"),
+            ("comments of a task", get(f"/tasks/{task_id}/comments"), "ix_task_comments_task_id"),
+            ("members of a project", get(f"/projects/{project_id}/members"), "ix_project_members_project_user"),
+            # Bulk writes resolve the caller's roles in all projects of the items with one query
+            ("roles of a member",
+             lambda: client.patch("/tasks/bulk", json=[{"id": task_id, "fields": {}}], headers=headers).raise_for_status(),
+             "ix_project_members_"),
+        ]
+        for name, lookup, index in checks:
+            log.take()
+            lookup()
+            plans = [explain(statement, parameters) for statement, parameters in log.take()]
+            ok = any(index in plan for plan in plans)
+            print(f"{'ok  ' if ok else 'FAIL'} {name:<45} {index}")
+            if not ok:
+                failures.append(name)
+                for plan in plans:
+                    print("       " + plan.replace("\n", "\n       "))
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
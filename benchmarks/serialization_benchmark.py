@@ -0,0 +1,92 @@
+# Micro-benchmark for serializing task list pages:
+#   model - select Task objects, validate them against TaskOut (from_attributes) and dump_json
+#   rows  - select the TaskOut columns as row tuples and encode them with RowEncoder (orjson)
+# Both are timed with the query (end to end) and on pre-fetched results (serialization only).
+# Each page is checked to be byte-identical between the two paths.
+#
+#   python -m benchmarks.serialization_benchmark --page-sizes 20 100 --tasks 10000
+
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+
+from pydantic import TypeAdapter
+from sqlalchemy import delete, insert, select
+
+from app.core.row_json import RowEncoder
+from app.db.database import SessionLocal, engine
+from app.db.migrations import run_migrations
+from app.models import Project, Task, User
+from app.schemas.task_schema import TaskOut
+from app.services.task_service import TASK_OUT_COLUMNS
+
+TASK_LIST = TypeAdapter(list[TaskOut])
+TASK_ROWS = RowEncoder(TaskOut)
+
+
+def populate(tasks: int):
+    started = datetime(2030, 1, 1, tzinfo=timezone.utc)
+    with SessionLocal() as db:
+        db.execute(delete(Task))
+        db.execute(delete(Project))
+        db.execute(delete(User))
+        db.execute(insert(User).values(id=1, username="bench", hashed_password="x", role="user"))
+        db.execute(insert(Project).values(id=1, name="bench", owner_id=1))
+        db.execute(insert(Task), [
+            {
+                "title": f"Task {i} – ünïcode", "description": None if i % 3 else f"Description of task {i}",
+                "due_date": started + timedelta(minutes=i, microseconds=i % 1000), "completed": i % 2 == 0,
+                "project_id": 1, "board_id": None, "priority": ("low", "medium", "high")[i % 3],
+                "assigned_user_id": 1 if i % 4 else None, "created_at": started,
+            }
+            for i in range(tasks)
+        ])
+        db.commit()
+
+
+def timed(serialize, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        serialize()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def run(page_size: int, iterations: int):
+    with SessionLocal() as db:
+        def model():
+            tasks = db.scalars(select(Task).order_by(Task.id).limit(page_size)).all()
+            db.expunge_all()
+            return TASK_LIST.dump_json(TASK_LIST.validate_python(tasks, from_attributes=True))
+
+        def rows():
+            return TASK_ROWS.encode(db.execute(select(*TASK_OUT_COLUMNS).order_by(Task.id).limit(page_size)).all())
+
+        assert model() == rows(), "fast path output differs"
+        tasks = db.scalars(select(Task).order_by(Task.id).limit(page_size)).all()
+        fetched = db.execute(select(*TASK_OUT_COLUMNS).order_by(Task.id).limit(page_size)).all()
+        results = {
+            "model": timed(model, iterations),
+            "rows": timed(rows, iterations),
+            "model serialize": timed(lambda: TASK_LIST.dump_json(TASK_LIST.validate_python(tasks, from_attributes=True)),
+                                     iterations),
+            "rows serialize": timed(lambda: TASK_ROWS.encode(fetched), iterations),
+        }
+    for name, us in results.items():
+        print(f"{page_size:>6} rows  {name:<16} {us:9.1f} µs/page {us / page_size:6.2f} µs/row")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--page-sizes", type=int, nargs="+", default=[20, 100])
+    parser.add_argument("--tasks", type=int, default=1000)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    run_migrations(engine)
+    populate(max(args.tasks, max(args.page_sizes)))
+    for page_size in args.page_sizes:
+        run(page_size, args.iterations)
+
+
+if __name__ == "__main__":
+    main()